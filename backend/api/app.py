@@ -3,12 +3,14 @@ API REST V2.1 - Con soporte para dudas post-diagnóstico
 CORREGIDO: sesion_id en procesar_mensaje
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 import sys
 import os
+import time
+import threading
+import contextvars
 from datetime import datetime
-import traceback
 
 def handle_options():
     """Manejar peticiones OPTIONS (CORS preflight)"""
@@ -21,16 +23,137 @@ def handle_options():
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 
+from config.settings import Config
 from backend.core.session_manager import SessionManager
+from backend.core.almacen_sesiones import obtener_almacen_sesiones
 from backend.database.database_manager import DatabaseManager
+from backend.database.catalogo_manager import obtener_catalogo
+from backend.core.cache_respuestas import obtener_cache_respuestas
+from backend.core.cache_diagnosticos import obtener_cache_diagnosticos
+from backend.database.escritura_diferida import obtener_escritura_diferida
+from backend.core.consumo_ia import obtener_consumo_ia
+from backend.core.gobernador_ia import obtener_gobernador_ia
+from backend.core.metricas import registro, iniciar_traza, terminar_traza, finalizar_traza, traza_actual
+from backend.core.logger import obtener_logger, obtener_estadisticas as estadisticas_logs
+
+logger = obtener_logger(__name__)
 
 app = Flask(__name__)
 CORS(app)
 
-# Managers globales
-sessions = {}
+# Managers globales (estado de sesiones en backend memoria/SQLite, con TTL y máximo LRU)
+sesiones = obtener_almacen_sesiones()
 db = DatabaseManager()
 
+# Catálogo compartido: se carga una vez al iniciar el proceso
+catalogo = obtener_catalogo()
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# APAGADO ORDENADO (peticiones en curso)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_en_curso = 0
+_en_curso_lock = threading.Lock()
+_aceptando = threading.Event()
+_aceptando.set()
+
+
+@app.before_request
+def _registrar_entrada():
+    global _en_curso
+    if not _aceptando.is_set():
+        return jsonify({'success': False, 'error': 'Servidor reiniciándose, intenta de nuevo'}), 503
+    
+    with _en_curso_lock:
+        _en_curso += 1
+    g.en_curso = True
+
+
+@app.teardown_request
+def _registrar_salida(_error=None):
+    # Con stream_with_context se ejecuta al terminar el stream, no al devolver la respuesta
+    global _en_curso
+    if g.pop('en_curso', False):
+        with _en_curso_lock:
+            _en_curso -= 1
+
+
+def peticiones_en_curso() -> int:
+    with _en_curso_lock:
+        return _en_curso
+
+
+def dejar_de_aceptar(timeout: float = None) -> bool:
+    """
+    Rechazar peticiones nuevas (503) y esperar a que terminen las que están en curso
+    
+    Returns:
+        bool: True si no quedó ninguna en curso
+    """
+    _aceptando.clear()
+    limite = time.monotonic() + (timeout if timeout is not None else Config.API_APAGADO_TIMEOUT)
+    
+    while peticiones_en_curso() and time.monotonic() < limite:
+        time.sleep(0.1)
+    
+    return peticiones_en_curso() == 0
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# TRAZAS POR PETICIÓN
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+@app.before_request
+def _iniciar_traza():
+    datos = request.get_json(silent=True) if request.method == 'POST' else None
+    sesion_id = datos.get('sesion_id') if isinstance(datos, dict) else None
+    g.traza_token = iniciar_traza(request.endpoint or request.path, sesion_id=sesion_id)
+
+
+@app.after_request
+def _terminar_traza(response):
+    token = g.pop('traza_token', None)
+    if token is not None:
+        # En streaming la traza sigue abierta en el contexto del generador (_stream_con_traza)
+        traza = terminar_traza(token, finalizar=not g.pop('traza_en_stream', False))
+        if traza is not None and traza.duracion is not None:
+            _observar_peticion(traza, request.endpoint, response.status_code)
+    return response
+
+
+def _observar_peticion(traza, endpoint: str, estado: int):
+    registro.observar('kairos_peticion_segundos', traza.duracion,
+                      endpoint=endpoint or 'desconocido', estado=str(estado))
+
+
+def _stream_con_traza(generador):
+    """
+    Iterar un generador SSE dentro del contexto de la petición (traza y etapa)
+
+    after_request corre antes que el cuerpo del generador: la traza se
+    cierra aquí, al terminar el stream, y mide la petición completa.
+    """
+    contexto = contextvars.copy_context()
+    traza = traza_actual()
+    endpoint = request.endpoint
+    g.traza_en_stream = traza is not None
+
+    def iterar():
+        try:
+            while True:
+                try:
+                    evento = contexto.run(next, generador)
+                except StopIteration:
+                    break
+                yield evento
+        finally:
+            contexto.run(generador.close)
+            if traza is not None:
+                _observar_peticion(finalizar_traza(traza), endpoint, 200)
+
+    return stream_with_context(iterar())
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # ENDPOINTS - SESIONES
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -50,7 +173,7 @@ def crear_sesion():
         exito, sesion_id, info = manager.nueva_sesion()
         
         if exito:
-            sessions[sesion_id] = manager
+            sesiones.guardar(sesion_id, manager)
             
             return jsonify({
                 'success': True,
@@ -61,9 +184,7 @@ def crear_sesion():
             return jsonify({'success': False, 'error': 'No se pudo crear sesión'}), 500
             
     except Exception as e:
-        print(f"❌ Error crear sesión: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error crear sesión: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -74,16 +195,16 @@ def capturar_datos():
         data = request.get_json()
         sesion_id = data.get('sesion_id')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         exito, info = manager.capturar_datos_paciente(
             data['nombre'],
             data['dni'],
             data.get('edad')
         )
+        sesiones.guardar(sesion_id, manager)
         
         return jsonify({
             'success': exito,
@@ -91,9 +212,7 @@ def capturar_datos():
         })
         
     except Exception as e:
-        print(f"❌ Error capturar datos: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error capturar datos: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -108,39 +227,94 @@ def procesar_mensaje():
         sesion_id = data.get('sesion_id')
         mensaje = data.get('mensaje')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         # Procesar mensaje
         resultado = manager.procesar_mensaje(mensaje)
+        sesiones.guardar(sesion_id, manager)
         
-        # ⭐ CAMBIO: Si ya incluye diagnóstico, NO llamar nuevamente
-        if resultado.get('tipo') == 'diagnostico_completo':
-            # Ya viene con todo, devolver directo
-            return jsonify({
-                'success': True,
-                'resultado': {
-                    'respuesta': resultado['respuesta'],
-                    'tipo': resultado['tipo'],
-                    'listo_diagnostico': True,
-                    'diagnostico': resultado['diagnostico']  # ⭐ Ya está incluido
-                }
-            })
-        
-        # ⭐ Flujo normal (preguntando)
         return jsonify({
             'success': True,
-            'resultado': resultado
+            'resultado': _formatear_resultado_mensaje(resultado)
         })
     
     except Exception as e:
-        print(f"❌ Error procesar mensaje: {e}")
-        traceback.print_exc()
+        logger.exception("❌ Error procesar mensaje: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/sesion/mensaje/stream', methods=['POST', 'OPTIONS'])
+def procesar_mensaje_stream():
+    """
+    Procesar mensaje con respuesta en streaming (Server-Sent Events)
+    
+    Eventos: fragmento (texto parcial), diagnosticando, fin (resultado completo), error
+    """
+    if request.method == 'OPTIONS':
+        return handle_options()
+    
+    data = request.json or {}
+    sesion_id = data.get('sesion_id')
+    mensaje = data.get('mensaje')
+    
+    manager = sesiones.obtener(sesion_id)
+    if manager is None:
+        return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
+    
+    def eventos():
+        try:
+            for evento in manager.procesar_mensaje_stream(mensaje):
+                tipo = evento.pop('evento')
+                
+                if tipo == 'fin':
+                    # Guardar antes de avisar: el siguiente turno puede llegar a otro worker
+                    sesiones.guardar(sesion_id, manager)
+                    evento = {
+                        'success': True,
+                        'resultado': _formatear_resultado_mensaje(evento['resultado'])
+                    }
+                
+                yield _evento_sse(tipo, evento)
+        
+        except Exception as e:
+            logger.exception("❌ Error procesar mensaje (stream): %s", e)
+            yield _evento_sse('error', {'success': False, 'error': str(e)})
+    
+    return Response(
+        _stream_con_traza(eventos()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Evitar buffer en proxies (nginx)
+        }
+    )
+
+
+def _formatear_resultado_mensaje(resultado: dict) -> dict:
+    """Resultado de un turno tal como lo espera el frontend"""
+    
+    # ⭐ CAMBIO: Si ya incluye diagnóstico, NO llamar nuevamente
+    if resultado.get('tipo') == 'diagnostico_completo':
+        # Ya viene con todo, devolver directo
+        return {
+            'respuesta': resultado['respuesta'],
+            'tipo': resultado['tipo'],
+            'listo_diagnostico': True,
+            'diagnostico': resultado['diagnostico']  # ⭐ Ya está incluido
+        }
+    
+    # ⭐ Flujo normal (preguntando)
+    return resultado
+
+
+def _evento_sse(tipo: str, datos: dict) -> str:
+    """Serializar un evento SSE"""
+    # app.json serializa igual que jsonify (Decimal, fechas)
+    return f"event: {tipo}\ndata: {app.json.dumps(datos)}\n\n"
+
+
 @app.route('/api/sesion/diagnostico', methods=['POST'])
 def generar_diagnostico():
     """Generar diagnóstico y receta"""
@@ -148,13 +322,13 @@ def generar_diagnostico():
         data = request.get_json()
         sesion_id = data.get('sesion_id')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         # Generar diagnóstico
         exito, resultado = manager.generar_diagnostico_y_receta()
+        sesiones.guardar(sesion_id, manager)
         
         if not exito:
             return jsonify({'success': False, 'error': 'Error generando diagnóstico'}), 500
@@ -165,9 +339,7 @@ def generar_diagnostico():
         })
         
     except Exception as e:
-        print(f"❌ Error diagnóstico: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error diagnóstico: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -181,13 +353,13 @@ def responder_duda():
         sesion_id = data.get('sesion_id')
         pregunta = data.get('pregunta')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         # Procesar duda
         resultado = manager._procesar_duda_post_diagnostico(pregunta)
+        sesiones.guardar(sesion_id, manager)
         
         return jsonify({
             'success': True,
@@ -195,9 +367,7 @@ def responder_duda():
         })
         
     except Exception as e:
-        print(f"❌ Error respondiendo duda: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error respondiendo duda: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -208,11 +378,10 @@ def imprimir_receta():
         data = request.get_json()
         sesion_id = data.get('sesion_id')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         exito, info = manager.imprimir_receta()
         
         return jsonify({
@@ -221,9 +390,7 @@ def imprimir_receta():
         })
         
     except Exception as e:
-        print(f"❌ Error imprimir: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error imprimir: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -234,16 +401,15 @@ def finalizar_sesion():
         data = request.get_json()
         sesion_id = data.get('sesion_id')
         
-        if sesion_id not in sessions:
+        manager = sesiones.obtener(sesion_id)
+        if manager is None:
             return jsonify({'success': False, 'error': 'Sesión no encontrada'}), 404
         
-        manager = sessions[sesion_id]
-        
         # Finalizar
         resumen = manager.finalizar_sesion()
         
-        # Limpiar sesión
-        del sessions[sesion_id]
+        # Liberar memoria de la sesión
+        sesiones.liberar(sesion_id)
         
         return jsonify({
             'success': True,
@@ -251,9 +417,7 @@ def finalizar_sesion():
         })
         
     except Exception as e:
-        print(f"❌ Error finalizar: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error finalizar: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -280,13 +444,22 @@ def estadisticas():
 def health_check():
     """Health check del sistema"""
     try:
-        mysql_ok = db.conexion and db.conexion.is_connected()
+        mysql_ok = db.esta_conectado()
         
         return jsonify({
             'success': True,
             'status': 'healthy',
             'mysql': mysql_ok,
-            'sesiones_activas': len(sessions),
+            'pool_mysql': db.obtener_estadisticas_pool(),
+            'sesiones': sesiones.obtener_estadisticas(),
+            'catalogo': catalogo.obtener_estadisticas(),
+            'cache_respuestas': obtener_cache_respuestas().obtener_estadisticas(),
+            'cache_diagnosticos': obtener_cache_diagnosticos().obtener_estadisticas(),
+            'escritura_diferida': obtener_escritura_diferida().obtener_estadisticas(),
+            'consumo_ia': obtener_consumo_ia().obtener_estadisticas(),
+            'gobernador_ia': obtener_gobernador_ia().obtener_estadisticas(),
+            'latencias': registro.obtener_resumen(),
+            'logs': estadisticas_logs(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -294,6 +467,22 @@ def health_check():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metricas():
+    """Métricas en formato Prometheus (histogramas por etapa, tokens, cachés)"""
+    pool = db.obtener_estadisticas_pool()
+    registro.fijar('kairos_pool_mysql_conexiones', pool['en_uso'], estado='en_uso')
+    registro.fijar('kairos_pool_mysql_conexiones', pool['libres'], estado='libres')
+    estado_sesiones = sesiones.obtener_estadisticas()
+    registro.fijar('kairos_sesiones_activas', estado_sesiones['activas'])
+    registro.fijar('kairos_sesiones_estado_bytes', estado_sesiones['estado_bytes'])
+    registro.fijar('kairos_escritura_pendiente', obtener_escritura_diferida().pendientes())
+    obtener_gobernador_ia().publicar_metricas()
+    
+    return Response(registro.exportar_prometheus(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/api/config', methods=['GET'])
 def obtener_config():
     """Obtener configuración"""
@@ -301,7 +490,7 @@ def obtener_config():
         config = {
             'sistema': 'Kairos V2.1',
             'gpt_activo': True,
-            'sesiones_activas': len(sessions)
+            'sesiones_activas': len(sesiones)
         }
         
         return jsonify({'success': True, 'config': config})
@@ -315,10 +504,11 @@ def obtener_config():
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 if __name__ == '__main__':
+    # Solo desarrollo; en producción: gunicorn -c gunicorn.conf.py wsgi:app (o python wsgi.py)
     print("="*70)
     print("🚀 KAIROS API REST V2.1")
     print("="*70)
-    print("Puerto: 5000")
+    print(f"Puerto: {Config.API_PORT}")
     print("Características:")
     print("  ✅ Conversación GPT natural")
     print("  ✅ Diagnóstico con causas")
@@ -327,7 +517,7 @@ if __name__ == '__main__':
     print("="*70 + "\n")
     
     app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=True
+        host=Config.API_HOST,
+        port=Config.API_PORT,
+        debug=Config.DEBUG
     )
\ No newline at end of file
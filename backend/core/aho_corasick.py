@@ -0,0 +1,116 @@
+"""
+Autómata Aho-Corasick para búsqueda de muchos patrones a la vez
+✅ Se construye una sola vez con todas las palabras clave
+✅ Una pasada sobre el texto devuelve todas las coincidencias
+✅ Cada coincidencia trae posición, patrón y etiqueta (intención / síntoma)
+✅ Filtro opcional de palabra completa por patrón
+"""
+
+from collections import deque
+from typing import Any, Dict, List, NamedTuple
+
+
+class Coincidencia(NamedTuple):
+    """Patrón encontrado en el texto"""
+    inicio: int
+    fin: int            # exclusivo
+    patron: str
+    etiqueta: Any
+
+
+class AutomataPatrones:
+    """
+    Uso:
+        automata = AutomataPatrones()
+        automata.agregar('me duele', 'sintoma')
+        automata.agregar('hola', 'saludo', palabra_completa=True)
+        automata.construir()
+        automata.buscar('hola, me duele la cabeza')
+    """
+
+    def __init__(self):
+        # Nodo = índice; transiciones, enlace de fallo y salidas por nodo
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallo: List[int] = [0]
+        self._salidas: List[List[tuple]] = [[]]
+        self._construido = False
+
+    def agregar(self, patron: str, etiqueta: Any, palabra_completa: bool = False):
+        """
+        Agregar patrón
+
+        Args:
+            patron: Texto a buscar (ya normalizado)
+            etiqueta: Dato asociado (p. ej. nombre de intención)
+            palabra_completa: Si True, solo cuenta si no está dentro de otra palabra;
+                              si False, basta con que empiece al inicio de una palabra
+        """
+        if not patron:
+            return
+
+        nodo = 0
+        for caracter in patron:
+            siguiente = self._transiciones[nodo].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+                self._transiciones[nodo][caracter] = siguiente
+            nodo = siguiente
+
+        self._salidas[nodo].append((patron, etiqueta, palabra_completa))
+        self._construido = False
+
+    def construir(self):
+        """Calcular enlaces de fallo (BFS)"""
+        cola = deque()
+
+        for nodo in self._transiciones[0].values():
+            self._fallo[nodo] = 0
+            cola.append(nodo)
+
+        while cola:
+            actual = cola.popleft()
+
+            for caracter, siguiente in self._transiciones[actual].items():
+                cola.append(siguiente)
+
+                fallo = self._fallo[actual]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+
+                # Heredar salidas del sufijo más largo
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallo[siguiente]]
+
+        self._construido = True
+
+    def buscar(self, texto: str) -> List[Coincidencia]:
+        """Todas las coincidencias en orden de aparición (por posición final)"""
+        if not self._construido:
+            self.construir()
+
+        coincidencias = []
+        transiciones, fallo, salidas = self._transiciones, self._fallo, self._salidas
+        nodo = 0
+
+        for posicion, caracter in enumerate(texto):
+            while nodo and caracter not in transiciones[nodo]:
+                nodo = fallo[nodo]
+            nodo = transiciones[nodo].get(caracter, 0)
+
+            for patron, etiqueta, palabra_completa in salidas[nodo]:
+                fin = posicion + 1
+                inicio = fin - len(patron)
+
+                if inicio > 0 and texto[inicio - 1].isalnum():
+                    continue
+                if palabra_completa and fin < len(texto) and texto[fin].isalnum():
+                    continue
+
+                coincidencias.append(Coincidencia(inicio, fin, patron, etiqueta))
+
+        return coincidencias
@@ -0,0 +1,301 @@
+"""
+Almacén de sesiones
+✅ Estado serializado (JSON): cualquier worker puede atender cualquier turno
+✅ Backends intercambiables: memoria (un proceso) o SQLite (varios workers en el mismo equipo)
+✅ Expiración por inactividad (TTL)
+✅ Máximo de sesiones con expulsión LRU (la menos usada sale primero)
+✅ Liberación explícita al finalizar la sesión
+✅ Tamaño del estado por sesión
+"""
+
+import sys
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.metricas import registro
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Cada cuánto se buscan sesiones expiradas (segundos)
+INTERVALO_PURGA = 30
+
+
+def _a_json(valor):
+    """Tipos que llegan de MySQL dentro del diagnóstico y los datos del paciente"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BACKENDS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class BackendMemoria:
+    """Estado en un OrderedDict del proceso (solo sirve con un worker)"""
+
+    nombre = 'memoria'
+
+    def __init__(self):
+        # sesion_id -> (estado JSON, último acceso); el primero es el menos usado
+        self._sesiones: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+
+    def leer(self, sesion_id: str, ahora: float, limite: float) -> Optional[str]:
+        entrada = self._sesiones.get(sesion_id)
+        if entrada is None or entrada[1] < limite:
+            return None
+        self._sesiones[sesion_id] = (entrada[0], ahora)
+        self._sesiones.move_to_end(sesion_id)
+        return entrada[0]
+
+    def escribir(self, sesion_id: str, estado: str, ahora: float):
+        self._sesiones[sesion_id] = (estado, ahora)
+        self._sesiones.move_to_end(sesion_id)
+
+    def borrar(self, sesion_id: str) -> bool:
+        return self._sesiones.pop(sesion_id, None) is not None
+
+    def purgar(self, limite: float) -> int:
+        """Las expiradas están al inicio del orden LRU: se corta en la primera vigente"""
+        eliminadas = 0
+        while self._sesiones:
+            sesion_id, (_, ultimo_acceso) = next(iter(self._sesiones.items()))
+            if ultimo_acceso >= limite:
+                break
+            del self._sesiones[sesion_id]
+            eliminadas += 1
+        return eliminadas
+
+    def recortar(self, maximo: int) -> List[str]:
+        expulsadas = []
+        while len(self._sesiones) > maximo:
+            sesion_id, _ = self._sesiones.popitem(last=False)
+            expulsadas.append(sesion_id)
+        return expulsadas
+
+    def contar(self) -> int:
+        return len(self._sesiones)
+
+    def tamanos(self) -> List[Tuple[str, int]]:
+        return [(sesion_id, sys.getsizeof(estado)) for sesion_id, (estado, _) in self._sesiones.items()]
+
+
+class BackendSQLite:
+    """Estado en un archivo SQLite (WAL) compartido por los workers del equipo"""
+
+    nombre = 'sqlite'
+
+    def __init__(self, ruta: str = None):
+        self.ruta = ruta or Config.SESIONES_SQLITE
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+
+        self._sqlite = sqlite3.connect(self.ruta, timeout=5, check_same_thread=False)
+        self._sqlite.execute("PRAGMA journal_mode=WAL")
+        self._sqlite.execute("PRAGMA synchronous=NORMAL")
+        self._sqlite.execute("""
+        CREATE TABLE IF NOT EXISTS sesiones_estado (
+            sesion_id TEXT PRIMARY KEY,
+            estado TEXT NOT NULL,
+            ultimo_acceso REAL NOT NULL
+        )
+        """)
+        self._sqlite.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sesiones_acceso ON sesiones_estado (ultimo_acceso)"
+        )
+        self._sqlite.commit()
+
+    def leer(self, sesion_id: str, ahora: float, limite: float) -> Optional[str]:
+        fila = self._sqlite.execute(
+            "SELECT estado FROM sesiones_estado WHERE sesion_id = ? AND ultimo_acceso >= ?",
+            (sesion_id, limite)
+        ).fetchone()
+        if fila is None:
+            return None
+        self._sqlite.execute("UPDATE sesiones_estado SET ultimo_acceso = ? WHERE sesion_id = ?",
+                             (ahora, sesion_id))
+        self._sqlite.commit()
+        return fila[0]
+
+    def escribir(self, sesion_id: str, estado: str, ahora: float):
+        self._sqlite.execute(
+            "INSERT OR REPLACE INTO sesiones_estado (sesion_id, estado, ultimo_acceso) VALUES (?, ?, ?)",
+            (sesion_id, estado, ahora)
+        )
+        self._sqlite.commit()
+
+    def borrar(self, sesion_id: str) -> bool:
+        cursor = self._sqlite.execute("DELETE FROM sesiones_estado WHERE sesion_id = ?", (sesion_id,))
+        self._sqlite.commit()
+        return cursor.rowcount > 0
+
+    def purgar(self, limite: float) -> int:
+        cursor = self._sqlite.execute("DELETE FROM sesiones_estado WHERE ultimo_acceso < ?", (limite,))
+        self._sqlite.commit()
+        return cursor.rowcount
+
+    def recortar(self, maximo: int) -> List[str]:
+        sobrantes = self.contar() - maximo
+        if sobrantes <= 0:
+            return []
+        expulsadas = [fila[0] for fila in self._sqlite.execute(
+            "SELECT sesion_id FROM sesiones_estado ORDER BY ultimo_acceso ASC LIMIT ?", (sobrantes,)
+        )]
+        self._sqlite.executemany("DELETE FROM sesiones_estado WHERE sesion_id = ?",
+                                 [(sesion_id,) for sesion_id in expulsadas])
+        self._sqlite.commit()
+        return expulsadas
+
+    def contar(self) -> int:
+        return self._sqlite.execute("SELECT COUNT(*) FROM sesiones_estado").fetchone()[0]
+
+    def tamanos(self) -> List[Tuple[str, int]]:
+        return [tuple(fila) for fila in self._sqlite.execute(
+            "SELECT sesion_id, LENGTH(CAST(estado AS BLOB)) FROM sesiones_estado"
+        )]
+
+
+BACKENDS = {
+    'memoria': BackendMemoria,
+    'sqlite': BackendSQLite
+}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ALMACÉN
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class AlmacenSesiones:
+    """
+    Sesiones activas, guardadas como estado JSON en un backend
+
+    Las sesiones deben exponer a_dict(); restaurar(dict) reconstruye el objeto
+    """
+
+    def __init__(self, restaurar: Callable[[Dict], object], backend=None,
+                 ttl: int = None, maximo: int = None):
+        self.restaurar = restaurar
+        self.backend = backend or BACKENDS[Config.SESIONES_BACKEND]()
+        self.ttl = ttl if ttl is not None else Config.SESIONES_TTL
+        self.maximo = maximo if maximo is not None else Config.SESIONES_MAX
+
+        self._lock = threading.Lock()
+        self._proxima_purga = 0.0
+
+        self.expiradas = 0
+        self.expulsadas = 0
+        self.liberadas = 0
+
+    def guardar(self, sesion_id: str, sesion):
+        """Guardar el estado de la sesión (tras cada turno); expulsa las menos usadas si sobran"""
+        estado = json.dumps(sesion.a_dict(), ensure_ascii=False, default=_a_json)
+        ahora = time.time()
+
+        with self._lock:
+            self._purgar_expiradas(ahora)
+            self.backend.escribir(sesion_id, estado, ahora)
+
+            for expulsada in self.backend.recortar(self.maximo):
+                self.expulsadas += 1
+                registro.contar('kairos_sesiones_descartadas_total', motivo='lru')
+                logger.info("🧹 Sesión %s expulsada (máximo %d sesiones)", expulsada, self.maximo)
+
+    def obtener(self, sesion_id: str):
+        """Sesión reconstruida o None si no existe / expiró (renueva el último acceso)"""
+        if not sesion_id:
+            return None
+
+        ahora = time.time()
+        with self._lock:
+            self._purgar_expiradas(ahora)
+            estado = self.backend.leer(sesion_id, ahora, ahora - self.ttl)
+
+        if estado is None:
+            return None
+
+        return self.restaurar(json.loads(estado))
+
+    def liberar(self, sesion_id: str) -> bool:
+        """Quitar sesión (al finalizar)"""
+        with self._lock:
+            if not self.backend.borrar(sesion_id):
+                return False
+            self.liberadas += 1
+            return True
+
+    def purgar(self) -> int:
+        """Eliminar sesiones inactivas; devuelve cuántas se eliminaron"""
+        with self._lock:
+            self._proxima_purga = 0.0
+            return self._purgar_expiradas(time.time())
+
+    def _purgar_expiradas(self, ahora: float) -> int:
+        if ahora < self._proxima_purga:
+            return 0
+        self._proxima_purga = ahora + INTERVALO_PURGA
+
+        eliminadas = self.backend.purgar(ahora - self.ttl)
+        if eliminadas:
+            self.expiradas += eliminadas
+            registro.contar('kairos_sesiones_descartadas_total', eliminadas, motivo='ttl')
+            logger.info("🧹 %d sesiones expiradas por inactividad", eliminadas)
+
+        return eliminadas
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.backend.contar()
+
+    def tamano_por_sesion(self) -> List[Dict]:
+        """Bytes del estado de cada sesión activa (más pesadas primero)"""
+        with self._lock:
+            tamanos = self.backend.tamanos()
+
+        tamanos = [{'sesion_id': sesion_id, 'bytes': tamano} for sesion_id, tamano in tamanos]
+        tamanos.sort(key=lambda t: t['bytes'], reverse=True)
+        return tamanos
+
+    def obtener_estadisticas(self) -> Dict:
+        tamanos = self.tamano_por_sesion()
+        total = sum(t['bytes'] for t in tamanos)
+
+        return {
+            'backend': self.backend.nombre,
+            'activas': len(tamanos),
+            'maximo': self.maximo,
+            'ttl_segundos': self.ttl,
+            'expiradas': self.expiradas,
+            'expulsadas': self.expulsadas,
+            'liberadas': self.liberadas,
+            'estado_bytes': total,
+            'estado_promedio_bytes': total // len(tamanos) if tamanos else 0,
+            'mas_pesadas': tamanos[:5]
+        }
+
+
+# Singleton
+_almacen = None
+_almacen_lock = threading.Lock()
+
+def obtener_almacen_sesiones() -> AlmacenSesiones:
+    """Obtener almacén de sesiones compartido del proceso"""
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                from backend.core.session_manager import SessionManager
+                _almacen = AlmacenSesiones(SessionManager.desde_dict)
+                logger.info("🗂️ Almacén de sesiones: %s (TTL %ss, máximo %d)",
+                            _almacen.backend.nombre, _almacen.ttl, _almacen.maximo)
+    return _almacen
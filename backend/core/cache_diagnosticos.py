@@ -0,0 +1,330 @@
+"""
+Caché de diagnósticos sobre conocimientos_completos
+✅ Firma de síntomas = mensajes del paciente, normalizados
+✅ Solo se reutiliza para el mismo perfil de paciente (edad, sexo, embarazo)
+✅ Similitud por solapamiento de términos (índice invertido en memoria)
+✅ Sobre el umbral se reutiliza diagnóstico + receta + advertencias (sin llamar a GPT)
+✅ Métricas: tasa de aciertos y segundos ahorrados
+"""
+
+import sys
+import os
+import json
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.cache_respuestas import normalizar_turno
+from backend.database.database_manager import DatabaseManager
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Palabras que no aportan a la firma de síntomas
+PALABRAS_VACIAS = {
+    'hola', 'buenas', 'buenos', 'dias', 'tardes', 'noches', 'gracias', 'doctor',
+    'que', 'los', 'las', 'del', 'con', 'por', 'para', 'una', 'uno', 'unos', 'unas',
+    'como', 'pero', 'mas', 'muy', 'tengo', 'tiene', 'estoy', 'esta', 'hace',
+    'desde', 'solo', 'eso', 'esto', 'ese', 'esa', 'cuando', 'siento', 'mucho', 'poco',
+    'algo', 'nada', 'tambien', 'bien', 'mal', 'asi', 'veces', 'siempre'
+}
+
+# Columnas que conocimientos_completos necesita para reutilizar un diagnóstico
+# completo (se agregan al cargar si faltan; las filas anteriores sin ellas no se usan)
+COLUMNAS_CACHE = {
+    'explicacion_causas': 'TEXT NULL',
+    'advertencias': 'TEXT NULL',
+    'cuando_ver_medico': 'TEXT NULL',
+    'perfil_paciente': 'VARCHAR(60) NULL'
+}
+
+TERMINOS_EMBARAZO = ('embaraz', 'gestant', 'gestacion', 'lactan', 'amamant', 'dando de lactar')
+
+
+def perfil_paciente(contexto: Dict) -> str:
+    """
+    Perfil que debe coincidir para reutilizar un diagnóstico
+
+    Grupo de edad, sexo (si se conoce) y embarazo/lactancia mencionados
+    en la conversación.
+    """
+    usuario = contexto.get('usuario') or {}
+
+    try:
+        edad = int(usuario.get('edad'))
+    except (TypeError, ValueError):
+        edad = None
+
+    if edad is None:
+        grupo = 'edad?'
+    elif edad < 12:
+        grupo = 'nino'
+    elif edad < 18:
+        grupo = 'adolescente'
+    elif edad < 60:
+        grupo = 'adulto'
+    else:
+        grupo = 'mayor'
+
+    sexo = str(usuario.get('sexo') or usuario.get('genero') or '?').strip().lower()[:1] or '?'
+
+    texto = normalizar_turno(' '.join(
+        str(m.get('content', '')) for m in contexto.get('mensajes', []) if m.get('role') == 'user'
+    ))
+    embarazo = 'embarazo' if any(t in texto for t in TERMINOS_EMBARAZO) else '-'
+
+    return f"{grupo}|{sexo}|{embarazo}"
+
+
+class CacheDiagnosticos:
+    """Índice de diagnósticos ya generados, buscados por similitud de síntomas"""
+
+    def __init__(self, db: DatabaseManager = None, umbral: float = None,
+                 confianza_minima: float = None, max_filas: int = None):
+        """
+        Inicializar caché
+
+        Args:
+            db: Gestor de MySQL
+            umbral: Similitud mínima (0-1) para reutilizar un diagnóstico
+            confianza_minima: Confianza mínima del diagnóstico guardado
+            max_filas: Conocimientos más recientes que se indexan
+        """
+        self.db = db or DatabaseManager()
+        self.umbral = umbral if umbral is not None else Config.CACHE_DIAGNOSTICO_UMBRAL
+        self.confianza_minima = (confianza_minima if confianza_minima is not None
+                                 else Config.CACHE_DIAGNOSTICO_CONFIANZA)
+        self.max_filas = max_filas or Config.CACHE_DIAGNOSTICO_MAX_FILAS
+
+        self._entradas = []                 # [{'terminos': set, 'perfil': str, 'datos': dict}]
+        self._indice = defaultdict(set)     # termino -> posiciones en _entradas
+        self._cargado = False
+        self._esquema = False               # True cuando existen COLUMNAS_CACHE
+        self._lock = threading.RLock()
+
+        # Métricas
+        self.consultas = 0
+        self.aciertos = 0
+        self.segundos_ahorrados = 0.0
+        self._duracion_promedio = None      # de diagnósticos completos con GPT
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CARGA E ÍNDICE
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def asegurar_esquema(self) -> bool:
+        """Agregar a conocimientos_completos las columnas de la caché (hasta lograrlo una vez)"""
+        if not self._esquema:
+            self._esquema = self.db.asegurar_columnas('conocimientos_completos', COLUMNAS_CACHE)
+            if not self._esquema:
+                logger.warning("⚠️ conocimientos_completos sin columnas de advertencias: caché desactivada")
+        return self._esquema
+
+    def cargar(self):
+        """Indexar conocimientos_completos desde MySQL"""
+        query = """
+        SELECT id, sintomas_usuario, diagnostico, confianza, causas, explicacion_causas,
+               productos_recomendados, plantas_recomendadas, remedios_recomendados,
+               consejos_dieta, consejos_habitos, advertencias, cuando_ver_medico, perfil_paciente
+        FROM conocimientos_completos
+        WHERE confianza >= %s
+          AND advertencias IS NOT NULL
+          AND cuando_ver_medico IS NOT NULL
+          AND perfil_paciente IS NOT NULL
+        ORDER BY id DESC
+        LIMIT %s
+        """
+
+        # Sin las columnas de seguridad no se reutiliza nada
+        filas = []
+        if self.asegurar_esquema():
+            filas = self.db.ejecutar_query(query, (self.confianza_minima, self.max_filas)) or []
+
+        with self._lock:
+            self._entradas = []
+            self._indice = defaultdict(set)
+
+            # Más antiguas primero: ante empate gana la más reciente
+            for fila in reversed(filas):
+                self._indexar(fila.get('sintomas_usuario') or '', fila['perfil_paciente'], {
+                    'diagnostico': fila.get('diagnostico'),
+                    'confianza': float(fila.get('confianza') or 0),
+                    'causas': self._leer_json(fila.get('causas')),
+                    'explicacion_causas': fila.get('explicacion_causas') or '',
+                    'productos': self._leer_ids(fila.get('productos_recomendados')),
+                    'plantas': self._leer_ids(fila.get('plantas_recomendadas')),
+                    'remedios': self._leer_ids(fila.get('remedios_recomendados')),
+                    'consejos_dieta': self._leer_json(fila.get('consejos_dieta')),
+                    'consejos_habitos': self._leer_json(fila.get('consejos_habitos')),
+                    'advertencias': self._leer_json(fila.get('advertencias')),
+                    'cuando_ver_medico': fila.get('cuando_ver_medico')
+                })
+
+            self._cargado = True
+
+        logger.info("🗂️ Caché de diagnósticos: %s conocimientos indexados", len(self._entradas))
+
+    def agregar(self, sintomas: str, perfil: str, resultado: Dict):
+        """Indexar un diagnóstico recién generado"""
+        if float(resultado.get('confianza') or 0) < self.confianza_minima:
+            return
+
+        with self._lock:
+            if not self._cargado or not self._esquema:
+                return
+
+            self._indexar(sintomas, perfil, {
+                'diagnostico': resultado['diagnostico'],
+                'confianza': float(resultado.get('confianza') or 0),
+                'causas': resultado.get('causas', []),
+                'explicacion_causas': resultado.get('explicacion_causas') or '',
+                'productos': [p['id'] for p in resultado.get('productos', [])],
+                'plantas': [p['id'] for p in resultado.get('plantas', [])],
+                'remedios': [r['id'] for r in resultado.get('remedios', [])],
+                'consejos_dieta': resultado.get('consejos_dieta', []),
+                'consejos_habitos': resultado.get('consejos_habitos', []),
+                'advertencias': resultado.get('advertencias') or [],
+                'cuando_ver_medico': resultado.get('cuando_ver_medico') or ''
+            })
+
+    def _indexar(self, sintomas: str, perfil: str, datos: Dict):
+        terminos = self.terminos(sintomas)
+        if not terminos or not datos.get('diagnostico'):
+            return
+
+        posicion = len(self._entradas)
+        self._entradas.append({'terminos': terminos, 'perfil': perfil, 'datos': datos})
+
+        for termino in terminos:
+            self._indice[termino].add(posicion)
+
+        # Mantener el tope: reconstruir sin las más antiguas
+        if len(self._entradas) > self.max_filas * 1.2:
+            recientes = self._entradas[-self.max_filas:]
+            self._entradas = []
+            self._indice = defaultdict(set)
+            for entrada in recientes:
+                posicion = len(self._entradas)
+                self._entradas.append(entrada)
+                for termino in entrada['terminos']:
+                    self._indice[termino].add(posicion)
+
+    @staticmethod
+    def terminos(sintomas: str) -> Set[str]:
+        """Términos significativos de la firma de síntomas"""
+        return {
+            t for t in normalizar_turno(sintomas).split()
+            if len(t) > 2 and t not in PALABRAS_VACIAS and not t.isdigit()
+        }
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # BÚSQUEDA
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def buscar(self, sintomas: str, perfil: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Buscar el diagnóstico guardado más parecido para el mismo perfil de paciente
+
+        Returns:
+            (datos, similitud) si supera el umbral, si no None
+        """
+        if not self._cargado:
+            try:
+                self.cargar()
+            except Exception as e:
+                logger.warning("⚠️ No se pudo cargar caché de diagnósticos: %s", e)
+                return None
+
+        terminos = self.terminos(sintomas)
+
+        with self._lock:
+            self.consultas += 1
+
+            if not terminos:
+                return None
+
+            # Solo candidatos que comparten al menos un término
+            comunes = defaultdict(int)
+            for termino in terminos:
+                for posicion in self._indice.get(termino, ()):
+                    comunes[posicion] += 1
+
+            mejor, mejor_similitud = None, 0.0
+            for posicion in sorted(comunes):
+                entrada = self._entradas[posicion]
+                if entrada['perfil'] != perfil:
+                    continue
+                compartidos = comunes[posicion]
+                # Jaccard (ante empate gana la más reciente)
+                similitud = compartidos / (len(terminos) + len(entrada['terminos']) - compartidos)
+                if similitud >= mejor_similitud:
+                    mejor, mejor_similitud = entrada, similitud
+
+            if mejor is None or mejor_similitud < self.umbral:
+                return None
+
+            return mejor['datos'], mejor_similitud
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # MÉTRICAS
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def registrar_generacion(self, segundos: float):
+        """Duración de un diagnóstico completo con GPT (promedio móvil)"""
+        with self._lock:
+            if self._duracion_promedio is None:
+                self._duracion_promedio = segundos
+            else:
+                self._duracion_promedio = 0.8 * self._duracion_promedio + 0.2 * segundos
+
+    def registrar_acierto(self, segundos: float):
+        """Diagnóstico servido desde caché"""
+        with self._lock:
+            self.aciertos += 1
+            if self._duracion_promedio is not None:
+                self.segundos_ahorrados += max(0.0, self._duracion_promedio - segundos)
+
+    def obtener_estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                'conocimientos': len(self._entradas),
+                'consultas': self.consultas,
+                'aciertos': self.aciertos,
+                'tasa_aciertos': round(self.aciertos / self.consultas, 3) if self.consultas else 0.0,
+                'segundos_ahorrados': round(self.segundos_ahorrados, 1),
+                'duracion_promedio_gpt': round(self._duracion_promedio or 0.0, 1),
+                'umbral': self.umbral
+            }
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # UTILIDADES
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    @staticmethod
+    def _leer_ids(texto) -> List[int]:
+        return [int(x) for x in str(texto or '').split(',') if x.strip().isdigit()]
+
+    @staticmethod
+    def _leer_json(texto) -> List:
+        if isinstance(texto, list):
+            return texto
+        try:
+            return json.loads(texto) if texto else []
+        except (TypeError, ValueError):
+            return []
+
+
+# Singleton
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_diagnosticos() -> CacheDiagnosticos:
+    """Obtener caché de diagnósticos compartida del proceso"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheDiagnosticos()
+    return _cache
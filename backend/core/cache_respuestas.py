@@ -0,0 +1,252 @@
+"""
+Caché de respuestas GPT de Kairos
+✅ Clave = turnos recientes normalizados (backend.core.normalizacion)
+✅ Expulsión LRU + TTL
+✅ Respaldo opcional en SQLite (sobrevive reinicios)
+✅ Métricas de aciertos / fallos por tipo
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.normalizacion import normalizar, limpiar_puntuacion
+from backend.core.metricas import contar_cache
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Marcador que reemplaza el nombre del paciente en textos cacheados
+MARCADOR_NOMBRE = '{nombre}'
+
+
+class CacheRespuestas:
+    """Caché LRU + TTL thread-safe con respaldo opcional en SQLite"""
+
+    def __init__(self, max_items: int = None, ttl_segundos: int = None,
+                 ruta_sqlite: str = None):
+        """
+        Inicializar caché
+
+        Args:
+            max_items: Máximo de entradas en memoria
+            ttl_segundos: Vida de cada entrada
+            ruta_sqlite: Archivo SQLite de respaldo ('' o None = solo memoria)
+        """
+        self.max_items = max_items or Config.CACHE_RESPUESTAS_MAX
+        self.ttl_segundos = ttl_segundos or Config.CACHE_RESPUESTAS_TTL
+        ruta_sqlite = ruta_sqlite if ruta_sqlite is not None else Config.CACHE_RESPUESTAS_SQLITE
+
+        self._datos = OrderedDict()     # clave -> (valor, expira)
+        self._lock = threading.Lock()
+
+        self._sqlite = None
+        if ruta_sqlite:
+            self._abrir_sqlite(ruta_sqlite)
+
+        # Métricas por tipo: {'decision': {'aciertos': n, 'fallos': n}, ...}
+        self._metricas = {}
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # OPERACIONES
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener(self, clave: str, tipo: str = 'general') -> Optional[Any]:
+        """Obtener valor vigente (None si no existe o expiró)"""
+        ahora = time.time()
+
+        with self._lock:
+            entrada = self._datos.get(clave)
+
+            if entrada and entrada[1] > ahora:
+                self._datos.move_to_end(clave)
+                self._contar(tipo, True)
+                return entrada[0]
+
+            if entrada:
+                del self._datos[clave]
+
+            # Segundo nivel: SQLite
+            valor = self._leer_sqlite(clave, ahora)
+            if valor is not None:
+                self._guardar_memoria(clave, valor[0], valor[1])
+                self._contar(tipo, True)
+                return valor[0]
+
+            self._contar(tipo, False)
+            return None
+
+    def guardar(self, clave: str, valor: Any):
+        """Guardar valor (debe ser serializable a JSON si hay SQLite)"""
+        expira = time.time() + self.ttl_segundos
+
+        with self._lock:
+            self._guardar_memoria(clave, valor, expira)
+            self._escribir_sqlite(clave, valor, expira)
+
+    def limpiar(self):
+        """Vaciar caché (memoria y SQLite)"""
+        with self._lock:
+            self._datos.clear()
+            if self._sqlite:
+                self._sqlite.execute("DELETE FROM cache_respuestas")
+                self._sqlite.commit()
+
+    def _guardar_memoria(self, clave: str, valor: Any, expira: float):
+        self._datos[clave] = (valor, expira)
+        self._datos.move_to_end(clave)
+
+        while len(self._datos) > self.max_items:
+            self._datos.popitem(last=False)
+
+    def _contar(self, tipo: str, acierto: bool):
+        contar_cache(f"respuestas.{tipo}", acierto)
+        metricas = self._metricas.setdefault(tipo, {'aciertos': 0, 'fallos': 0})
+        metricas['aciertos' if acierto else 'fallos'] += 1
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # RESPALDO SQLITE
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _abrir_sqlite(self, ruta: str):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            self._sqlite = sqlite3.connect(ruta, check_same_thread=False)
+            self._sqlite.execute("""
+            CREATE TABLE IF NOT EXISTS cache_respuestas (
+                clave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                expira REAL NOT NULL
+            )
+            """)
+            self._sqlite.execute("DELETE FROM cache_respuestas WHERE expira < ?", (time.time(),))
+            self._sqlite.commit()
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Caché de respuestas sin SQLite: %s", e)
+            self._sqlite = None
+
+    def _leer_sqlite(self, clave: str, ahora: float):
+        if not self._sqlite:
+            return None
+        try:
+            fila = self._sqlite.execute(
+                "SELECT valor, expira FROM cache_respuestas WHERE clave = ? AND expira > ?",
+                (clave, ahora)
+            ).fetchone()
+            return (json.loads(fila[0]), fila[1]) if fila else None
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def _escribir_sqlite(self, clave: str, valor: Any, expira: float):
+        if not self._sqlite:
+            return
+        try:
+            self._sqlite.execute(
+                "INSERT OR REPLACE INTO cache_respuestas (clave, valor, expira) VALUES (?, ?, ?)",
+                (clave, json.dumps(valor, ensure_ascii=False), expira)
+            )
+            self._sqlite.commit()
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning("⚠️ Error guardando en caché SQLite: %s", e)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # MÉTRICAS
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener_estadisticas(self) -> Dict:
+        """Aciertos, fallos y tasa por tipo"""
+        with self._lock:
+            por_tipo = {}
+            for tipo, m in self._metricas.items():
+                total = m['aciertos'] + m['fallos']
+                por_tipo[tipo] = dict(m, tasa_aciertos=round(m['aciertos'] / total, 3) if total else 0.0)
+
+            return {
+                'items': len(self._datos),
+                'max_items': self.max_items,
+                'ttl_segundos': self.ttl_segundos,
+                'sqlite': self._sqlite is not None,
+                'por_tipo': por_tipo
+            }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLAVES Y PLANTILLAS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def construir_clave(tipo: str, mensajes: List[Dict], usuario: Dict = None,
+                    extra: str = '') -> Optional[str]:
+    """
+    Clave de caché para el estado de la conversación
+
+    Solo aplica a los primeros turnos (Config.CACHE_RESPUESTAS_TURNOS):
+    más adelante cada conversación es única y no vale la pena cachear.
+
+    Returns:
+        Clave (hash) o None si no se debe cachear
+    """
+    if not Config.CACHE_RESPUESTAS_ACTIVO:
+        return None
+
+    turnos_usuario = sum(1 for m in mensajes if m.get('role') == 'user')
+    if turnos_usuario == 0 or turnos_usuario > Config.CACHE_RESPUESTAS_TURNOS:
+        return None
+
+    nombre = (usuario or {}).get('nombre', '')
+
+    partes = [tipo, extra]
+    for m in mensajes:
+        texto = plantillar(m.get('content', ''), nombre)
+        partes.append(f"{m.get('role')}:{normalizar_turno(texto)}")
+
+    return hashlib.sha1('\n'.join(partes).encode('utf-8')).hexdigest()
+
+def normalizar_turno(texto: str) -> str:
+    """Normalización compartida, sin puntuación ni espacios repetidos"""
+    return limpiar_puntuacion(normalizar(texto))
+
+def _patrones_nombre(nombre: str) -> List[str]:
+    """Nombre completo y primer nombre (GPT suele usar solo el primero)"""
+    nombre = (nombre or '').strip()
+    if not nombre:
+        return []
+
+    patrones = [nombre]
+    primero = nombre.split()[0]
+    if primero != nombre and len(primero) > 2:
+        patrones.append(primero)
+    return patrones
+
+def plantillar(texto: str, nombre: str) -> str:
+    """Reemplazar el nombre del paciente por {nombre}"""
+    for patron in _patrones_nombre(nombre):
+        texto = re.sub(rf'\b{re.escape(patron)}\b', MARCADOR_NOMBRE, texto, flags=re.IGNORECASE)
+    return texto
+
+def rellenar(texto: str, nombre: str) -> str:
+    """Reponer el nombre del paciente actual en un texto cacheado"""
+    primero = (nombre or '').split()[0] if (nombre or '').strip() else ''
+    return texto.replace(MARCADOR_NOMBRE, primero)
+
+
+# Singleton
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_respuestas() -> CacheRespuestas:
+    """Obtener caché compartida del proceso"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheRespuestas()
+    return _cache
@@ -1,17 +1,19 @@
 """
 Clasificador de Intenciones con Machine Learning
 Versión simplificada para Kairos 
+(numpy y sklearn se importan al crear el clasificador, no al importar el módulo)
 """
 
 import pickle
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import SVC
-from sklearn.preprocessing import LabelEncoder
 from typing import Tuple, List, Dict, Optional
 import os
-import re
-from unidecode import unidecode
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.core.normalizacion import normalizar_basico, limpiar_puntuacion
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class IntentClassifier:
     """
@@ -33,6 +35,11 @@ class IntentClassifier:
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
             self.model_path = os.path.join(base_dir, 'backend', 'data', 'models', 'classifier.pkl')
         
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.svm import SVC
+        from sklearn.preprocessing import LabelEncoder
+        
         # Componentes del modelo
         self.vectorizer = TfidfVectorizer(
             max_features=500,           # Reducido para feria (más rápido)
@@ -55,6 +62,9 @@ class IntentClassifier:
         # Lista de intenciones
         self.intenciones = []
         
+        # Nombre de intención por columna de predict_proba (evita inverse_transform por clase)
+        self._nombres_columnas = np.array([], dtype=object)
+        
         # Estado
         self.esta_entrenado = False
         
@@ -71,19 +81,12 @@ class IntentClassifier:
         Returns:
             str: Texto limpio
         """
-        # Convertir a minúsculas
-        texto = texto.lower().strip()
-        
-        # Normalizar acentos (á → a)
-        texto = unidecode(texto)
+        # Minúsculas y sin acentos (á → a). Sin las correcciones ortográficas:
+        # classifier.pkl se entrenó así; agregarlas aquí exige reentrenar con train.py
+        texto = normalizar_basico(texto)
         
-        # Eliminar caracteres especiales excepto letras, números y espacios
-        texto = re.sub(r'[^\w\s]', ' ', texto)
-        
-        # Eliminar espacios múltiples
-        texto = ' '.join(texto.split())
-        
-        return texto
+        # Eliminar caracteres especiales y espacios múltiples
+        return limpiar_puntuacion(texto)
     
     def entrenar(self, textos: List[str], intenciones: List[str]) -> Dict[str, float]:
         """
@@ -96,47 +99,48 @@ class IntentClassifier:
         Returns:
             Dict con métricas de entrenamiento
         """
-        print("🎓 Iniciando entrenamiento del clasificador...")
+        logger.debug("🎓 Iniciando entrenamiento del clasificador...")
         
         # Validar datos
         if len(textos) != len(intenciones):
             raise ValueError("Textos e intenciones deben tener la misma longitud")
         
         if len(textos) < 10:
-            print("⚠️ ADVERTENCIA: Pocos ejemplos de entrenamiento (< 10)")
+            logger.warning("⚠️ ADVERTENCIA: Pocos ejemplos de entrenamiento (< 10)")
         
         # Preprocesar textos
-        print("   📝 Preprocesando textos...")
+        logger.debug("📝 Preprocesando textos...")
         textos_limpios = [self.preprocesar_texto(texto) for texto in textos]
         
         # Codificar intenciones
-        print("   🏷️ Codificando intenciones...")
+        logger.debug("🏷️ Codificando intenciones...")
         intenciones_numericas = self.label_encoder.fit_transform(intenciones)
         self.intenciones = list(self.label_encoder.classes_)
         
-        print(f"   ✅ Intenciones detectadas: {len(self.intenciones)}")
+        logger.debug("✅ Intenciones detectadas: %s", len(self.intenciones))
         for i, intencion in enumerate(self.intenciones):
             count = list(intenciones).count(intencion)
-            print(f"      {i+1}. {intencion}: {count} ejemplos")
+            logger.debug("%s. %s: %s ejemplos", i + 1, intencion, count)
         
         # Vectorizar textos (TF-IDF)
-        print("   🔢 Vectorizando textos...")
+        logger.debug("🔢 Vectorizando textos...")
         X = self.vectorizer.fit_transform(textos_limpios)
         
-        print(f"   ✅ Vocabulario: {len(self.vectorizer.vocabulary_)} palabras")
+        logger.debug("✅ Vocabulario: %s palabras", len(self.vectorizer.vocabulary_))
         
         # Entrenar clasificador SVM
-        print("   🧠 Entrenando modelo SVM...")
+        logger.debug("🧠 Entrenando modelo SVM...")
         self.classifier.fit(X, intenciones_numericas)
         
         # Calcular precisión en datos de entrenamiento
         predicciones = self.classifier.predict(X)
-        precision = np.mean(predicciones == intenciones_numericas)
+        precision = float((predicciones == intenciones_numericas).mean())
         
-        print(f"\n   ✅ Modelo entrenado exitosamente!")
-        print(f"   📊 Precisión en entrenamiento: {precision:.2%}")
+        logger.info("✅ Modelo entrenado exitosamente!")
+        logger.debug("📊 Precisión en entrenamiento: %.2f%%", precision * 100)
         
         self.esta_entrenado = True
+        self._preparar_clases()
         
         # Guardar modelo automáticamente
         self.guardar_modelo()
@@ -158,32 +162,48 @@ class IntentClassifier:
         Returns:
             Tupla (intencion, confianza, probabilidades_todas)
         """
+        return self.predecir_lote([texto])[0]
+    
+    def predecir_lote(self, textos: List[str]) -> List[Tuple[str, float, Dict[str, float]]]:
+        """
+        Predecir intenciones de muchos textos a la vez
+        
+        Una sola vectorización y una sola pasada del SVM sobre la matriz
+        completa (mucho más rápido que llamar predecir() en un bucle).
+        
+        Args:
+            textos: Textos a clasificar
+            
+        Returns:
+            Lista de tuplas (intencion, confianza, probabilidades_todas),
+            en el mismo orden que textos
+        """
         if not self.esta_entrenado:
             raise ValueError("El modelo no está entrenado")
         
-        # Preprocesar
-        texto_limpio = self.preprocesar_texto(texto)
+        if not textos:
+            return []
         
-        # Vectorizar
-        X = self.vectorizer.transform([texto_limpio])
+        # Preprocesar y vectorizar todo junto
+        X = self.vectorizer.transform([self.preprocesar_texto(t) for t in textos])
         
         # Predecir
-        prediccion_numerica = self.classifier.predict(X)[0]
-        intencion = self.label_encoder.inverse_transform([prediccion_numerica])[0]
+        intenciones = self.label_encoder.classes_[self.classifier.predict(X)]
+        probabilidades_matriz = self.classifier.predict_proba(X)
         
-        # Obtener probabilidades
-        probabilidades_array = self.classifier.predict_proba(X)[0]
+        # Confianza es la probabilidad máxima de cada fila
+        confianzas = probabilidades_matriz.max(axis=1)
         
-        # Crear diccionario de probabilidades
-        probabilidades = {}
-        for i, prob in enumerate(probabilidades_array):
-            intent_name = self.label_encoder.inverse_transform([i])[0]
-            probabilidades[intent_name] = float(prob)
+        nombres = self._nombres_columnas.tolist()
         
-        # Confianza es la probabilidad máxima
-        confianza = float(max(probabilidades_array))
-        
-        return intencion, confianza, probabilidades
+        return [
+            (str(intencion), float(confianza), dict(zip(nombres, fila.tolist())))
+            for intencion, confianza, fila in zip(intenciones, confianzas, probabilidades_matriz)
+        ]
+    
+    def _preparar_clases(self):
+        """Tabla columna de predict_proba -> nombre de intención"""
+        self._nombres_columnas = self.label_encoder.classes_[self.classifier.classes_]
     
     def predecir_con_umbral(self, texto: str, umbral: float = 0.6) -> Tuple[str, float]:
         """
@@ -288,11 +308,11 @@ class IntentClassifier:
             with open(self.model_path, 'wb') as f:
                 pickle.dump(modelo_completo, f)
             
-            print(f"💾 Modelo guardado en: {self.model_path}")
+            logger.info("💾 Modelo guardado en: %s", self.model_path)
             return True
             
         except Exception as e:
-            print(f"❌ Error al guardar modelo: {e}")
+            logger.error("❌ Error al guardar modelo: %s", e)
             return False
     
     def cargar_modelo(self) -> bool:
@@ -303,8 +323,8 @@ class IntentClassifier:
             bool: True si cargó correctamente
         """
         if not os.path.exists(self.model_path):
-            print(f"ℹ️ No hay modelo guardado en: {self.model_path}")
-            print("   Necesitas entrenar primero con train.py")
+            logger.info("ℹ️ No hay modelo guardado en: %s", self.model_path)
+            logger.debug("Necesitas entrenar primero con train.py")
             return False
         
         try:
@@ -318,14 +338,15 @@ class IntentClassifier:
             self.intenciones = modelo_completo['intenciones']
             
             self.esta_entrenado = True
+            self._preparar_clases()
             
-            print(f"✅ Modelo cargado desde: {self.model_path}")
-            print(f"   Intenciones: {', '.join(self.intenciones)}")
+            logger.info("✅ Modelo cargado desde: %s", self.model_path)
+            logger.debug("Intenciones: %s", ', '.join(self.intenciones))
             
             return True
             
         except Exception as e:
-            print(f"❌ Error al cargar modelo: {e}")
+            logger.error("❌ Error al cargar modelo: %s", e)
             return False
     
     def obtener_estadisticas(self) -> Dict:
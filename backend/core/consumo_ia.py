@@ -0,0 +1,205 @@
+"""
+Consumo real de IA (tokens y costo)
+✅ Se alimenta del 'usage' de cada respuesta de chat (ClienteLLM)
+✅ Costo según la tabla de precios por modelo (openai_usage_checker)
+✅ Acumulado en memoria por sesión, etapa y modelo
+✅ Vaciado en lote a log_consultas_ia y configuracion_ia (escritura diferida)
+✅ log_consultas_ia: columnas etapa y detalle (se agregan si faltan)
+✅ Totales del proceso para el control de presupuesto (IAConfigManager)
+"""
+
+import sys
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.openai_usage_checker import calcular_costo
+from backend.core.metricas import registro
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Columnas propias del consumo (migración en caliente de log_consultas_ia)
+COLUMNAS_CONSUMO = {
+    'etapa': 'VARCHAR(60) NULL',
+    'detalle': 'TEXT NULL'
+}
+
+COLUMNAS_LOG = ('sesion_id', 'etapa', 'detalle', 'tokens_usados', 'tiempo_respuesta_ms',
+                'proveedor', 'modelo', 'costo_estimado', 'exitosa')
+
+# Sin permiso para ALTER TABLE: etapa va en 'sintoma' y el detalle JSON en 'contexto_enviado'
+COLUMNAS_LOG_ANTERIOR = ('sesion_id', 'sintoma', 'contexto_enviado', 'tokens_usados', 'tiempo_respuesta_ms',
+                         'proveedor', 'modelo', 'costo_estimado', 'exitosa')
+
+
+class ConsumoIA:
+    """
+    Uso:
+        consumo = obtener_consumo_ia()
+        consumo.registrar('gpt-4o-mini', data['usage'], etapa='gpt.diagnostico', sesion_id=sesion_id)
+    """
+
+    def __init__(self, intervalo: float = None, tipo_cambio: float = None):
+        self.intervalo = intervalo if intervalo is not None else Config.CONSUMO_IA_INTERVALO
+        self.tipo_cambio = tipo_cambio if tipo_cambio is not None else Config.TIPO_CAMBIO_USD_PEN
+
+        # Fila activa de configuracion_ia (la fija IAConfigManager al cargar)
+        self.configuracion_id = None
+        self._esquema = False               # True cuando existen COLUMNAS_CONSUMO
+
+        # (sesion_id, etapa, modelo) -> [llamadas, entrada, salida, costo USD, milisegundos]
+        self._pendientes: Dict[Tuple[Optional[str], str, str], list] = {}
+        self._lock = threading.Lock()
+        self._proximo_vaciado = time.monotonic() + self.intervalo
+
+        # Totales del proceso
+        self.llamadas = 0
+        self.tokens_entrada = 0
+        self.tokens_salida = 0
+        self.costo_usd = 0.0
+        self._por_etapa: Dict[str, list] = {}
+        self._por_modelo: Dict[str, list] = {}
+
+    def registrar(self, modelo: str, uso: Optional[Dict], etapa: str = None,
+                  sesion_id: str = None, segundos: float = 0.0) -> float:
+        """Sumar una llamada; devuelve su costo en USD (sesion_id None = sin sesión)"""
+        if not uso:
+            return 0.0
+
+        entrada = uso.get('prompt_tokens') or 0
+        salida = uso.get('completion_tokens') or 0
+        costo = calcular_costo(entrada, salida, modelo)
+        etapa = etapa or 'gpt'
+
+        with self._lock:
+            for acumulado in (self._pendientes.setdefault((sesion_id, etapa, modelo), [0, 0, 0, 0.0, 0.0]),
+                              self._por_etapa.setdefault(etapa, [0, 0, 0, 0.0, 0.0]),
+                              self._por_modelo.setdefault(modelo, [0, 0, 0, 0.0, 0.0])):
+                acumulado[0] += 1
+                acumulado[1] += entrada
+                acumulado[2] += salida
+                acumulado[3] += costo
+                acumulado[4] += segundos * 1000
+
+            self.llamadas += 1
+            self.tokens_entrada += entrada
+            self.tokens_salida += salida
+            self.costo_usd += costo
+
+            vaciar = time.monotonic() >= self._proximo_vaciado
+
+        registro.contar('kairos_costo_usd_total', costo, modelo=modelo, etapa=etapa)
+
+        if vaciar:
+            self.vaciar()
+
+        return costo
+
+    def totales(self) -> Tuple[int, float]:
+        """(llamadas, gasto en soles) del proceso desde que arrancó"""
+        with self._lock:
+            return self.llamadas, self.costo_usd * self.tipo_cambio
+
+    def vaciar(self) -> Tuple[int, float]:
+        """
+        Enviar lo acumulado a la escritura diferida
+
+        Returns:
+            (llamadas, gasto en soles) del proceso hasta este vaciado, tomados
+            junto con lo pendiente: lo registrado después no está incluido
+        """
+        from backend.database.escritura_diferida import obtener_escritura_diferida, ahora_sql
+
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+            self._proximo_vaciado = time.monotonic() + self.intervalo
+            configuracion_id = self.configuracion_id
+            totales = self.llamadas, self.costo_usd * self.tipo_cambio
+
+        if not pendientes:
+            return totales
+
+        escritura = obtener_escritura_diferida()
+        columnas = COLUMNAS_LOG if self._asegurar_esquema(escritura.db) else COLUMNAS_LOG_ANTERIOR
+        llamadas = 0
+        costo_total = 0.0
+
+        for (sesion_id, etapa, modelo), (n, entrada, salida, costo, ms) in pendientes.items():
+            detalle = json.dumps({'llamadas': n, 'tokens_entrada': entrada, 'tokens_salida': salida,
+                                  'hasta': ahora_sql()})
+            escritura.insertar('log_consultas_ia', columnas, (
+                sesion_id, etapa, detalle, entrada + salida, int(ms / n),
+                'openai', modelo, round(costo, 6), True
+            ))
+            llamadas += n
+            costo_total += costo
+
+        # Gasto de configuracion_ia en soles (igual que presupuesto_mensual)
+        if configuracion_id is not None:
+            escritura.incrementar('configuracion_ia', configuracion_id, {
+                'consultas_realizadas_hoy': llamadas,
+                'gasto_mes_actual': round(costo_total * self.tipo_cambio, 6)
+            })
+        else:
+            logger.debug("Sin configuración IA activa: gasto no acumulado en configuracion_ia")
+
+        logger.debug("💰 Consumo IA: %d llamadas, $%.6f (%d filas)", llamadas, costo_total, len(pendientes))
+        return totales
+
+    def _asegurar_esquema(self, db) -> bool:
+        """Agregar etapa y detalle a log_consultas_ia (se reintenta en cada vaciado hasta lograrlo)"""
+        if not self._esquema:
+            self._esquema = db.asegurar_columnas('log_consultas_ia', COLUMNAS_CONSUMO)
+            if not self._esquema:
+                logger.warning("⚠️ log_consultas_ia sin columnas etapa/detalle: se usan sintoma y contexto_enviado")
+        return self._esquema
+
+    def cerrar(self):
+        """Vaciar lo pendiente (al apagar, antes de cerrar la escritura diferida)"""
+        self.vaciar()
+
+    @staticmethod
+    def _resumen(acumulados: Dict[str, list]) -> Dict:
+        return {
+            clave: {'llamadas': n, 'tokens_entrada': entrada, 'tokens_salida': salida,
+                    'costo_usd': round(costo, 6)}
+            for clave, (n, entrada, salida, costo, _) in
+            sorted(acumulados.items(), key=lambda item: item[1][3], reverse=True)
+        }
+
+    def obtener_estadisticas(self) -> Dict:
+        """Totales del proceso; etapas y modelos ordenados por costo"""
+        with self._lock:
+            return {
+                'llamadas': self.llamadas,
+                'tokens_entrada': self.tokens_entrada,
+                'tokens_salida': self.tokens_salida,
+                'costo_usd': round(self.costo_usd, 6),
+                'costo_soles': round(self.costo_usd * self.tipo_cambio, 4),
+                'pendientes': len(self._pendientes),
+                'por_etapa': self._resumen(self._por_etapa),
+                'por_modelo': self._resumen(self._por_modelo)
+            }
+
+
+# Singleton
+_consumo = None
+_consumo_lock = threading.Lock()
+
+def obtener_consumo_ia() -> ConsumoIA:
+    """Obtener acumulador de consumo compartido del proceso"""
+    global _consumo
+    if _consumo is None:
+        with _consumo_lock:
+            if _consumo is None:
+                from backend.database.escritura_diferida import obtener_escritura_diferida
+                obtener_escritura_diferida()  # su atexit queda antes: se vacía el consumo primero
+                _consumo = ConsumoIA()
+                atexit.register(_consumo.cerrar)
+    return _consumo
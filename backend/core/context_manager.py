@@ -6,6 +6,9 @@ Mantiene y gestiona toda la información del paciente durante la conversación
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import json
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class ContextManager:
     """
@@ -85,7 +88,7 @@ class ContextManager:
             'nivel_completitud': 0.0
         }
         
-        print("🧠 Context Manager inicializado")
+        logger.debug("🧠 Context Manager inicializado")
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # ACTUALIZACIÓN DE CONTEXTO
@@ -111,7 +114,7 @@ class ContextManager:
             self.contexto['medico']['sintoma_principal'] = sintoma
             self.estado['fase'] = 'recopilando'
             self._incrementar_info_clave()
-            print(f"   ✅ Síntoma principal: {sintoma}")
+            logger.debug("✅ Síntoma principal: %s", sintoma)
     
     def agregar_sintoma_adicional(self, sintoma: str):
         """Agregar síntoma secundario"""
@@ -146,7 +149,7 @@ class ContextManager:
             cambios.append(f"momento: {entidades['momento_dia']}")
         
         if cambios:
-            print(f"   📝 Contexto actualizado: {', '.join(cambios)}")
+            logger.debug("📝 Contexto actualizado: %s", ', '.join(cambios))
     
     def agregar_pregunta_respuesta(self, pregunta: str, respuesta: str):
         """Registrar pregunta y respuesta"""
@@ -208,7 +211,7 @@ class ContextManager:
         if listo and not self.estado['listo_para_diagnostico']:
             self.estado['listo_para_diagnostico'] = True
             self.estado['fase'] = 'analizando'
-            print("   ✅ Información suficiente para diagnóstico")
+            logger.debug("✅ Información suficiente para diagnóstico")
         
         return listo
     
@@ -413,7 +416,7 @@ INFO QUE AÚN FALTA: {', '.join(self.obtener_info_faltante()) if self.obtener_in
         """Reiniciar contexto para nuevo paciente"""
         
         self.__init__()
-        print("🔄 Contexto reiniciado")
+        logger.info("🔄 Contexto reiniciado")
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
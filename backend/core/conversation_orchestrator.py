@@ -22,6 +22,9 @@ from backend.core.personality_config import (
     obtener_system_prompt,
     IDENTIDAD
 )
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class ConversationOrchestrator:
     """
@@ -52,15 +55,13 @@ class ConversationOrchestrator:
             'total_mensajes': 0
         }
         
-        print("🎭 Conversation Orchestrator inicializado")
-        print(f"   Kairos v1.0 - Creado por {IDENTIDAD['creador']}")
+        logger.info("🎭 Conversation Orchestrator inicializado")
+        logger.debug("Kairos v1.0 - Creado por %s", IDENTIDAD['creador'])
     
     def procesar_mensaje(self, mensaje: str, usuario_info: Dict = None) -> Dict:
         """Procesar mensaje completo"""
         
-        print(f"\n{'='*70}")
-        print(f"📨 Mensaje #{self.estado['total_mensajes'] + 1}")
-        print(f"{'='*70}")
+        logger.debug("📨 Mensaje #%s", self.estado['total_mensajes'] + 1)
         
         # Actualizar info del paciente
         if usuario_info:
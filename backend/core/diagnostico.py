@@ -14,9 +14,14 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.insert(0, BASE_DIR)
 
 from backend.database.database_manager import DatabaseManager
+from backend.database.catalogo_manager import obtener_catalogo
+from backend.database.escritura_diferida import obtener_escritura_diferida
 from backend.database.productos_manager import ProductosManager
 from backend.database.plantas_medicinales_manager import PlantasMedicinalesManager
 from backend.database.remedios_caseros_manager import RemediosCaserosManager
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class DiagnosticoEngine:
     """Motor de diagnóstico integrado completo"""
@@ -26,8 +31,9 @@ class DiagnosticoEngine:
         self.productos = ProductosManager()
         self.plantas = PlantasMedicinalesManager()
         self.remedios = RemediosCaserosManager()
+        self.catalogo = obtener_catalogo()
         
-        print("🧠 Motor de Diagnóstico V2.0 inicializado")
+        logger.info("🧠 Motor de Diagnóstico V2.0 inicializado")
     
     def generar_receta_completa(self, diagnostico_gpt: Dict, usuario_id: int = None) -> Dict:
         """
@@ -40,9 +46,7 @@ class DiagnosticoEngine:
         Returns:
             Dict con receta completa formateada
         """
-        print(f"\n{'='*70}")
-        print("📋 GENERANDO RECETA COMPLETA")
-        print(f"{'='*70}\n")
+        logger.debug("📋 GENERANDO RECETA COMPLETA")
         
         # PASO 1: Obtener productos por ID
         productos_receta = []
@@ -51,7 +55,7 @@ class DiagnosticoEngine:
             if producto:
                 productos_receta.append(producto)
                 self._incrementar_recomendacion_producto(prod_id)
-                print(f"   ✅ Producto: {producto['nombre']}")
+                logger.debug("✅ Producto: %s", producto['nombre'])
         
         # PASO 2: Obtener plantas por ID
         plantas_receta = []
@@ -60,7 +64,7 @@ class DiagnosticoEngine:
             if planta:
                 plantas_receta.append(planta)
                 self.plantas.incrementar_uso(planta_id)
-                print(f"   ✅ Planta: {planta['nombre_comun']}")
+                logger.debug("✅ Planta: %s", planta['nombre_comun'])
         
         # PASO 3: Obtener remedios por ID
         remedios_receta = []
@@ -69,10 +73,10 @@ class DiagnosticoEngine:
             if remedio:
                 remedios_receta.append(remedio)
                 self.remedios.incrementar_uso(remedio_id)
-                print(f"   ✅ Remedio: {remedio['nombre']}")
+                logger.debug("✅ Remedio: %s", remedio['nombre'])
         
         # PASO 4: Verificar combinaciones
-        print("\n   🔍 Verificando combinaciones...")
+        logger.debug("🔍 Verificando combinaciones...")
         combinaciones = self._verificar_combinaciones_seguras(
             productos_receta,
             plantas_receta,
@@ -105,94 +109,55 @@ class DiagnosticoEngine:
         # PASO 7: Formatear para ticket
         receta['texto_ticket'] = self._formatear_ticket(receta)
         
-        print(f"\n{'='*70}")
-        print("✅ RECETA COMPLETA GENERADA")
-        print(f"{'='*70}\n")
+        logger.debug("✅ RECETA COMPLETA GENERADA")
         
         return receta
     
     def _obtener_producto_por_id(self, prod_id: int) -> Optional[Dict]:
-        """Obtener producto directamente de BD por ID"""
-        query = "SELECT * FROM productos_naturales WHERE id = %s AND activo = TRUE"
-        resultado = self.db.ejecutar_query(query, (prod_id,))
-        
-        if resultado:
-            return resultado[0]
-        return None
+        """Obtener producto activo por ID (catálogo compartido)"""
+        return self.productos.obtener_por_id(prod_id)
     
     def _incrementar_recomendacion_producto(self, prod_id: int):
-        """Incrementar contador de recomendaciones del producto"""
-        query = """
-        UPDATE productos_naturales 
-        SET veces_recomendado = veces_recomendado + 1 
-        WHERE id = %s
-        """
-        self.db.ejecutar_comando(query, (prod_id,))
+        """Incrementar contador de recomendaciones del producto (diferido)"""
+        obtener_escritura_diferida().incrementar('productos_naturales', prod_id, {'veces_recomendado': 1})
     
     def _verificar_combinaciones_seguras(self, productos: List[Dict],
                                         plantas: List[Dict],
                                         remedios: List[Dict]) -> List[Dict]:
-        """Verificar si las combinaciones son seguras"""
+        """
+        Verificar si las combinaciones son seguras
+        
+        Consulta el índice de pares del catálogo compartido (sin ir a BD).
+        """
         
         combinaciones_encontradas = []
         
-        # Verificar productos + plantas
-        for prod in productos:
-            for planta in plantas:
-                # Buscar en tabla combinaciones_recomendadas
-                query = """
-                SELECT * FROM combinaciones_recomendadas
-                WHERE activo = 1
-                  AND tipo_combinacion = 'producto_planta'
-                  AND (
-                      (item_1_tipo = 'producto' AND item_1_id = %s AND item_2_tipo = 'planta' AND item_2_id = %s)
-                      OR
-                      (item_1_tipo = 'planta' AND item_1_id = %s AND item_2_tipo = 'producto' AND item_2_id = %s)
-                  )
-                """
-                
-                resultado = self.db.ejecutar_query(query, (prod['id'], planta['id'], planta['id'], prod['id']))
-                
-                if resultado:
-                    combi = resultado[0]
-                    combinaciones_encontradas.append({
-                        'item1': prod['nombre'],
-                        'item2': planta['nombre_comun'],
-                        'sinergia': combi['sinergia'],
-                        'explicacion': combi['explicacion'],
-                        'instrucciones': combi['instrucciones']
-                    })
-                    
-                    print(f"      ✓ Combinación validada: {prod['nombre']} + {planta['nombre_comun']}")
-        
-        # Verificar plantas entre sí
-        for i in range(len(plantas)):
-            for j in range(i + 1, len(plantas)):
-                query = """
-                SELECT * FROM combinaciones_recomendadas
-                WHERE activo = 1
-                  AND tipo_combinacion = 'planta_planta'
-                  AND (
-                      (item_1_id = %s AND item_2_id = %s)
-                      OR
-                      (item_1_id = %s AND item_2_id = %s)
-                  )
-                """
-                
-                resultado = self.db.ejecutar_query(
-                    query,
-                    (plantas[i]['id'], plantas[j]['id'], plantas[j]['id'], plantas[i]['id'])
-                )
+        # Pares a revisar: productos + plantas y plantas entre sí
+        pares = [
+            ('producto_planta', 'producto', prod['id'], prod['nombre'],
+             'planta', planta['id'], planta['nombre_comun'])
+            for prod in productos for planta in plantas
+        ]
+        pares += [
+            ('planta_planta', 'planta', plantas[i]['id'], plantas[i]['nombre_comun'],
+             'planta', plantas[j]['id'], plantas[j]['nombre_comun'])
+            for i in range(len(plantas)) for j in range(i + 1, len(plantas))
+        ]
+        
+        for tipo_combinacion, tipo_1, id_1, nombre_1, tipo_2, id_2, nombre_2 in pares:
+            combi = self.catalogo.obtener_combinacion(tipo_combinacion, tipo_1, id_1, tipo_2, id_2)
+            
+            if combi:
+                combinaciones_encontradas.append({
+                    'item1': nombre_1,
+                    'item2': nombre_2,
+                    'sinergia': combi['sinergia'],
+                    'explicacion': combi['explicacion'],
+                    'instrucciones': combi['instrucciones']
+                })
                 
-                if resultado:
-                    combi = resultado[0]
-                    combinaciones_encontradas.append({
-                        'item1': plantas[i]['nombre_comun'],
-                        'item2': plantas[j]['nombre_comun'],
-                        'sinergia': combi['sinergia'],
-                        'explicacion': combi['explicacion'],
-                        'instrucciones': combi['instrucciones']
-                    })
+                if tipo_1 == 'producto':
+                    logger.debug("✓ Combinación validada: %s + %s", nombre_1, nombre_2)
         
         return combinaciones_encontradas
     
@@ -0,0 +1,132 @@
+"""
+Ejecutor compartido de tareas en paralelo
+✅ Un solo ThreadPoolExecutor por proceso
+✅ Espera con timeout por etapa y deadline total
+✅ Tareas en segundo plano (guardar en BD después de responder)
+✅ Las etapas heredan el contexto del llamador (traza de métricas)
+"""
+
+import sys
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FuturoTimeout
+from typing import Any, Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+
+class Ejecutor:
+    """Pool de hilos para etapas independientes (llamadas GPT, escrituras BD)"""
+
+    def __init__(self, max_hilos: int = None):
+        self.max_hilos = max_hilos or Config.DIAGNOSTICO_HILOS
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_hilos,
+            thread_name_prefix='kairos'
+        )
+
+        # Tareas en segundo plano aún sin terminar
+        self._pendientes = set()
+        self._lock = threading.Lock()
+
+    def enviar(self, funcion: Callable, *args, **kwargs) -> Future:
+        """Ejecutar función en el pool (con el contexto del llamador)"""
+        contexto = contextvars.copy_context()
+        return self._pool.submit(contexto.run, funcion, *args, **kwargs)
+
+    def en_segundo_plano(self, funcion: Callable, *args, **kwargs) -> Future:
+        """
+        Ejecutar sin esperar resultado (errores se registran, no se propagan)
+        """
+        def tarea():
+            try:
+                return funcion(*args, **kwargs)
+            except Exception as e:
+                logger.error("❌ Error en tarea de fondo %s: %s", getattr(funcion, '__name__', funcion), e)
+
+        futuro = self._pool.submit(tarea)
+
+        with self._lock:
+            self._pendientes.add(futuro)
+        futuro.add_done_callback(self._terminar_pendiente)
+
+        return futuro
+
+    def _terminar_pendiente(self, futuro: Future):
+        with self._lock:
+            self._pendientes.discard(futuro)
+
+    def esperar(self, futuro: Future, etapa: str, deadline: float = None,
+                timeout: float = None, por_defecto: Any = None) -> Any:
+        """
+        Esperar resultado de una etapa
+
+        Args:
+            futuro: Futuro de la etapa
+            etapa: Nombre para logs
+            deadline: time.monotonic() límite del proceso completo
+            timeout: Máximo para esta etapa
+            por_defecto: Valor si vence el tiempo o falla
+
+        Returns:
+            Resultado de la etapa o por_defecto
+        """
+        timeout = timeout if timeout is not None else Config.DIAGNOSTICO_TIMEOUT_ETAPA
+
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+
+        try:
+            return futuro.result(timeout=timeout)
+
+        except FuturoTimeout:
+            # El hilo sigue en curso; su resultado se descarta
+            logger.warning("⏱️ Etapa '%s' superó %.1fs, se continúa sin ella", etapa, timeout)
+            return por_defecto
+
+        except Exception as e:
+            logger.error("❌ Error en etapa '%s': %s", etapa, e)
+            return por_defecto
+
+    def pendientes(self) -> int:
+        """Número de tareas en segundo plano sin terminar"""
+        with self._lock:
+            return len(self._pendientes)
+
+    def drenar(self, timeout: float = None) -> bool:
+        """
+        Esperar a que terminen las tareas en segundo plano
+
+        Returns:
+            bool: True si no quedó nada pendiente
+        """
+        limite = time.monotonic() + (timeout if timeout is not None else 30)
+
+        while self.pendientes() and time.monotonic() < limite:
+            time.sleep(0.1)
+
+        return self.pendientes() == 0
+
+    def cerrar(self, esperar: bool = True):
+        """Apagar el pool"""
+        self._pool.shutdown(wait=esperar)
+
+
+# Singleton
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+def obtener_ejecutor() -> Ejecutor:
+    """Obtener ejecutor compartido del proceso"""
+    global _ejecutor
+    if _ejecutor is None:
+        with _ejecutor_lock:
+            if _ejecutor is None:
+                _ejecutor = Ejecutor()
+    return _ejecutor
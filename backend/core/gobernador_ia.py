@@ -0,0 +1,322 @@
+"""
+Gobernador de IA (presupuesto y ritmo de llamadas GPT por proceso)
+✅ Configuración IA compartida en memoria (sin SELECT por instancia de IAConfigManager)
+✅ Contadores atómicos: consultas del día, gasto del día y del mes
+✅ Límite de llamadas por minuto con cubo de tokens
+✅ Topes diario y mensual aplicados antes de cada llamada
+✅ Sincronización periódica con configuracion_ia / log_consultas_ia en un hilo de fondo
+✅ Holgura actual (consultas y presupuesto restantes)
+"""
+
+import sys
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.consumo_ia import obtener_consumo_ia
+from backend.core.metricas import registro
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+
+class CuboTokens:
+    """Límite de ritmo: `por_minuto` llamadas, con ráfagas de hasta el mismo número"""
+
+    def __init__(self, por_minuto: int):
+        self.capacidad = float(por_minuto)
+        self.tasa = por_minuto / 60.0
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rellenar(self, ahora: float):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def tomar(self, timeout: float = 0.0) -> bool:
+        """Tomar un token esperando como máximo `timeout` segundos"""
+        limite = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._rellenar(ahora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                espera = (1 - self._tokens) / self.tasa
+
+            if ahora + espera > limite:
+                return False
+            time.sleep(espera)
+
+    def disponibles(self) -> float:
+        with self._lock:
+            self._rellenar(time.monotonic())
+            return self._tokens
+
+
+class GobernadorIA:
+    """
+    Uso:
+        gobernador = obtener_gobernador_ia()
+        permitido, razon = gobernador.autorizar(timeout=5)
+    """
+
+    def __init__(self, db=None, limite_rpm: int = None, presupuesto_diario: float = None,
+                 intervalo: float = None):
+        """
+        Args:
+            db: DatabaseManager (por defecto uno nuevo sobre el pool compartido, al sincronizar)
+            limite_rpm: Llamadas GPT por minuto en este proceso (0 = sin límite)
+            presupuesto_diario: Tope de gasto diario en soles (0 = sin tope)
+            intervalo: Segundos entre sincronizaciones con MySQL
+        """
+        self.db = db
+        self.limite_rpm = limite_rpm if limite_rpm is not None else Config.IA_LIMITE_RPM
+        self.presupuesto_diario = (presupuesto_diario if presupuesto_diario is not None
+                                   else Config.IA_PRESUPUESTO_DIARIO)
+        self.intervalo = intervalo if intervalo is not None else Config.IA_SINCRONIZACION
+
+        self.consumo = obtener_consumo_ia()
+        self.cubo = CuboTokens(self.limite_rpm) if self.limite_rpm > 0 else None
+
+        # Última fila leída de configuracion_ia (None = sin configuración activa)
+        self.config: Optional[Dict] = None
+        self.sincronizado = False
+        self.ultima_sincronizacion: Optional[datetime] = None
+
+        # Valores de MySQL en la última sincronización + lo de este proceso desde entonces
+        self._consultas_base = 0
+        self._gasto_dia_base = 0.0
+        self._gasto_mes_base = 0.0
+        self._consultas_locales = 0
+        self._gasto_local_base = 0.0
+
+        self._lock = threading.Lock()
+        self._primera_lock = threading.Lock()
+        self._sincronizacion_lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+        # Métricas
+        self.autorizadas = 0
+        self.rechazadas: Dict[str, int] = {}
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # SINCRONIZACIÓN CON MYSQL
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def asegurar_sincronizado(self):
+        """Primera lectura de la configuración (una vez por proceso) y arranque del hilo"""
+        if not self.sincronizado:
+            with self._primera_lock:
+                if not self.sincronizado:
+                    self.sincronizar()
+
+        if self._hilo is None and self.intervalo > 0:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._bucle, name='kairos-gobernador-ia',
+                                                  daemon=True)
+                    self._hilo.start()
+
+    def sincronizar(self) -> bool:
+        """
+        Vaciar el consumo pendiente y releer contadores y topes de MySQL
+
+        Returns:
+            True si hay configuración IA activa
+        """
+        from backend.database.escritura_diferida import obtener_escritura_diferida
+
+        with self._sincronizacion_lock:
+            if self.db is None:
+                from backend.database.database_manager import DatabaseManager
+                self.db = DatabaseManager()
+
+            # Lo gastado hasta aquí queda en MySQL antes de leer; el gasto local
+            # se toma en el mismo vaciado (lo registrado después sigue siendo local)
+            consultas_locales = self._consultas_locales
+            _, gasto_local = self.consumo.vaciar()
+            obtener_escritura_diferida().vaciar()
+
+            filas = self.db.ejecutar_query("""
+            SELECT * FROM configuracion_ia
+            WHERE activo = TRUE
+            ORDER BY id DESC
+            LIMIT 1
+            """)
+            gasto_dia = self.db.ejecutar_query("""
+            SELECT COALESCE(SUM(costo_estimado), 0) AS gasto
+            FROM log_consultas_ia
+            WHERE DATE(fecha_consulta) = CURDATE()
+            """)
+
+            if filas is None:
+                # MySQL no responde: seguir con los últimos valores y contadores locales
+                logger.warning("⚠️ Gobernador IA: sin MySQL, se mantienen los últimos topes")
+                self.sincronizado = True
+                return self.config is not None
+
+            config = filas[0] if filas else None
+            primera = self.ultima_sincronizacion is None
+
+            with self._lock:
+                self.config = config
+                self._consultas_base = int(config['consultas_realizadas_hoy'] or 0) if config else 0
+                self._gasto_mes_base = float(config['gasto_mes_actual'] or 0) if config else 0.0
+                # log_consultas_ia guarda USD
+                self._gasto_dia_base = (float(gasto_dia[0]['gasto'] or 0) * self.consumo.tipo_cambio
+                                        if gasto_dia else 0.0)
+                self._consultas_locales -= consultas_locales
+                self._gasto_local_base = gasto_local
+                self.sincronizado = True
+                self.ultima_sincronizacion = datetime.now()
+
+            self.consumo.configuracion_id = config['id'] if config else None
+
+        if config is None:
+            logger.warning("⚠️ No hay configuración de IA activa")
+        elif primera:
+            logger.info("✅ Config IA cargada: %s (%s)", config['proveedor'], config['modelo_gpt'])
+        else:
+            logger.debug("🔄 Gobernador IA sincronizado: %s", self.obtener_holgura())
+
+        self.publicar_metricas()
+        return config is not None
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.sincronizar()
+            except Exception as e:
+                logger.error("❌ Gobernador IA: %s", e)
+
+    def detener(self):
+        """Detener el hilo de sincronización (al apagar)"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+            self._hilo = None
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CONTROL
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _contadores(self) -> Tuple[int, float, float]:
+        """(consultas hoy, gasto hoy, gasto del mes) en soles, incluido lo no sincronizado"""
+        _, gasto_local = self.consumo.totales()
+        with self._lock:
+            gasto = gasto_local - self._gasto_local_base
+            return (self._consultas_base + self._consultas_locales,
+                    self._gasto_dia_base + gasto,
+                    self._gasto_mes_base + gasto)
+
+    def verificar(self) -> Tuple[bool, str]:
+        """Topes diario y mensual (sin consumir cupo de ritmo)"""
+        self.asegurar_sincronizado()
+
+        config = self.config
+        if config is None:
+            return True, "OK"   # sin configuración no hay topes (esta_activo() ya lo impide)
+
+        consultas_hoy, gasto_dia, gasto_mes = self._contadores()
+
+        if consultas_hoy >= config['limite_diario_consultas']:
+            return False, f"Límite diario alcanzado ({config['limite_diario_consultas']})"
+
+        if self.presupuesto_diario > 0 and gasto_dia >= self.presupuesto_diario:
+            return False, f"Presupuesto diario agotado (S/. {self.presupuesto_diario:.2f})"
+
+        if gasto_mes >= float(config['presupuesto_mensual']):
+            return False, f"Presupuesto mensual agotado (S/. {config['presupuesto_mensual']})"
+
+        return True, "OK"
+
+    def autorizar(self, timeout: float = 0.0) -> Tuple[bool, str]:
+        """
+        Permiso para una llamada GPT: topes + cupo por minuto (espera hasta `timeout`)
+
+        Returns:
+            (permitido, razon)
+        """
+        permitido, razon = self.verificar()
+
+        if permitido and self.cubo is not None and not self.cubo.tomar(timeout):
+            permitido, razon = False, f"Límite de {self.limite_rpm} llamadas por minuto"
+
+        with self._lock:
+            if permitido:
+                self._consultas_locales += 1
+                self.autorizadas += 1
+            else:
+                motivo = razon.split(' (')[0]
+                self.rechazadas[motivo] = self.rechazadas.get(motivo, 0) + 1
+
+        if not permitido:
+            registro.contar('kairos_ia_rechazos_total', motivo=razon.split(' (')[0])
+
+        return permitido, razon
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # ESTADO
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener_holgura(self) -> Dict:
+        """Cuánto queda antes de cada tope"""
+        config = self.config
+        consultas_hoy, gasto_dia, gasto_mes = self._contadores()
+
+        holgura = {
+            'consultas_hoy': consultas_hoy,
+            'gasto_dia_soles': round(gasto_dia, 4),
+            'gasto_mes_soles': round(gasto_mes, 4),
+            'llamadas_minuto_disponibles': int(self.cubo.disponibles()) if self.cubo else None
+        }
+
+        if config is not None:
+            holgura['consultas_restantes_hoy'] = max(config['limite_diario_consultas'] - consultas_hoy, 0)
+            holgura['presupuesto_restante_mes'] = round(max(float(config['presupuesto_mensual']) - gasto_mes, 0), 4)
+        if self.presupuesto_diario > 0:
+            holgura['presupuesto_restante_dia'] = round(max(self.presupuesto_diario - gasto_dia, 0), 4)
+
+        return holgura
+
+    def publicar_metricas(self):
+        holgura = self.obtener_holgura()
+        if 'consultas_restantes_hoy' in holgura:
+            registro.fijar('kairos_ia_holgura', holgura['consultas_restantes_hoy'], tope='consultas_dia')
+            registro.fijar('kairos_ia_holgura', holgura['presupuesto_restante_mes'], tope='soles_mes')
+        if 'presupuesto_restante_dia' in holgura:
+            registro.fijar('kairos_ia_holgura', holgura['presupuesto_restante_dia'], tope='soles_dia')
+
+    def obtener_estadisticas(self) -> Dict:
+        return {
+            'configurado': self.config is not None,
+            'limite_rpm': self.limite_rpm,
+            'presupuesto_diario': self.presupuesto_diario,
+            'ultima_sincronizacion': (self.ultima_sincronizacion.isoformat()
+                                      if self.ultima_sincronizacion else None),
+            'autorizadas': self.autorizadas,
+            'rechazadas': dict(self.rechazadas),
+            'holgura': self.obtener_holgura()
+        }
+
+
+# Singleton
+_gobernador = None
+_gobernador_lock = threading.Lock()
+
+def obtener_gobernador_ia() -> GobernadorIA:
+    """Obtener gobernador de IA compartido del proceso"""
+    global _gobernador
+    if _gobernador is None:
+        with _gobernador_lock:
+            if _gobernador is None:
+                _gobernador = GobernadorIA()
+    return _gobernador
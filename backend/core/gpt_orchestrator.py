@@ -12,16 +12,25 @@ GPT Orchestrator V4.1 - ANÁLISIS DE COMPOSICIÓN + CONFIGURACIÓN DINÁMICA
 import sys
 import os
 import json
-import requests
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterator, List, Optional
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 
+from config.settings import Config
 from backend.core.ia_config_manager import IAConfigManager
+from backend.core.llm_client import obtener_cliente_llm
+from backend.core.cache_respuestas import obtener_cache_respuestas, construir_clave, plantillar, rellenar
+from backend.core.metricas import medir
+from backend.core.presupuesto_prompt import ensamblar_conversacion, serializar_datos
 from backend.database.productos_manager import ProductosManager
 from backend.database.plantas_medicinales_manager import PlantasMedicinalesManager
 from backend.database.remedios_caseros_manager import RemediosCaserosManager
+from backend.database.catalogo_manager import obtener_catalogo, registrar_formato
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 # ⭐ Importar WebSearcher
 try:
@@ -29,19 +38,164 @@ try:
     WEB_SEARCH_DISPONIBLE = True
 except:
     WEB_SEARCH_DISPONIBLE = False
-    print("⚠️ WebSearcher no disponible")
+    logger.warning("⚠️ WebSearcher no disponible")
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# PROMPTS FIJOS Y FRAGMENTOS DEL CATÁLOGO
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# Igual en todas las decisiones preguntar/diagnosticar
+INSTRUCCIONES_DECISION = """Analiza la conversación médica y decide la mejor acción.
+
+DECIDE:
+- PREGUNTAR: Si necesitas más información para un diagnóstico responsable
+- DIAGNOSTICAR: Si ya tienes suficiente información (síntoma + contexto básico)
+
+CRITERIOS PARA DIAGNOSTICAR:
+✅ Tienes: síntoma principal + duración aprox + intensidad + algo sobre qué lo mejora/empeora
+✅ El paciente ya dio suficientes detalles
+✅ Han conversado lo suficiente (no necesitas 20 preguntas, con 4-6 buenas preguntas basta)
+
+NO DIAGNOSTIQUES SI:
+❌ Solo sabes el síntoma sin contexto
+❌ El paciente solo saludó o dijo algo confuso
+❌ Falta información crítica (ejemplo: dice "me duele" pero no dónde ni desde cuándo)
+
+Responde SOLO JSON:
+{
+  "accion": "preguntar" o "diagnosticar",
+  "razon": "Explicación breve de por qué"
+}
+
+Si decides PREGUNTAR y detectaste mensaje repetido, el siguiente paso será responder con empatía.
+Si decides DIAGNOSTICAR, el paciente ya dio suficiente información."""
+
+# Respuesta al paciente cuando se decidió preguntar / diagnosticar
+INSTRUCCIONES_PREGUNTA = """INSTRUCCIONES:
+
+1. Si detectaste mensaje repetido:
+   - Responde con EMPATÍA: "Ya te escuché. Tranquilo, cuéntame con confianza..."
+   - NO repitas la misma pregunta
+   - Reformula de forma más clara y amable
+
+2. Si el paciente solo saludó sin mencionar síntomas:
+   - Responde natural: "Hola [nombre], ¿qué te trae por aquí hoy?"
+   - NO digas: "¿Podrías contarme más sobre tus síntomas?" (muy robótico)
+
+3. Si el paciente ya mencionó un síntoma:
+   - NO repitas el síntoma obvio
+   - Pregunta lo que falta: duración, intensidad, momento del día, qué lo mejora/empeora
+   - Ejemplo: Si dijo "gastritis", pregunta "¿Desde cuándo la tienes?" NO "cuéntame sobre tu gastritis"
+
+4. Sé CONVERSACIONAL:
+   - Máximo 2-3 líneas
+   - Usa el nombre del paciente naturalmente
+   - Haz UNA pregunta clara y específica
+   - Si necesitas, da contexto primero: "Entiendo que es molesto. ¿Desde hace cuánto lo tienes?"
+
+5. Reconoce lo que ya dijeron:
+   - Si dijo "me duele la cabeza" NO preguntes "¿qué te duele?"
+   - Pregunta lo siguiente lógico: "¿Desde hace cuánto?" o "¿Qué tan fuerte del 1 al 10?"
+
+Responde de forma natural y empática. SOLO el texto que le dirías al paciente."""
+
+INSTRUCCIONES_TRANSICION = """Ya tienes suficiente información para diagnosticar.
+
+Responde de forma natural:
+- Agradece al paciente por la información
+- Dile que ya puedes ayudarle
+- Mantén 2-3 líneas máximo
+- Usa su nombre si lo tienes
+
+Ejemplo: "Perfecto [nombre], ya tengo toda la información necesaria. Déjame analizar tu caso..."
+
+SOLO el texto natural, sin explicaciones extras."""
+
+SISTEMA_RECETA = 'Eres médico que analiza composición química de productos naturales.'
+
+# Igual en todas las recetas: va al inicio del prompt (caché de prefijo del proveedor)
+INSTRUCCIONES_RECETA = """Eres médico naturista experto. Analiza CIENTÍFICAMENTE qué producto es más efectivo.
+
+INSTRUCCIONES:
+1. SIEMPRE recomienda AL MENOS 1 producto
+2. Analiza la COMPOSICIÓN de cada producto
+3. Elige el que tenga ingredientes activos MÁS efectivos para este caso
+4. Explica POR QUÉ ese producto (basado en su composición)
+
+CRITERIOS DE SELECCIÓN:
+- Para INSOMNIO: busca triptófano, magnesio, valeriana, pasiflora
+- Para ESTRÉS: busca ashwagandha, magnesio, vitamina B
+- Para CANSANCIO: busca hierro, vitamina B12, ginseng, maca
+- Para DOLOR: busca omega-3, cúrcuma, jengibre, MSM
+
+REGLAS:
+- Casos SIMPLES: 1 producto + 1-2 plantas + 1 remedio
+- Casos COMPLEJOS: 1-2 productos + 1-2 plantas + 1 remedio
+- PRIORIZA productos con ingredientes activos específicos para el caso
+- Si ningún producto tiene ingredientes específicos, elige el más completo
+
+Responde SOLO JSON:
+{
+  "productos": [1],
+  "plantas": [1, 2],
+  "remedios": [1],
+  "razon_producto": "Este producto contiene X que ayuda con Y porque Z"
+}"""
+
+
+def _fragmento_producto_composicion(p: Dict) -> str:
+    precio = float(p.get('precio') or 0)
+    
+    lineas = [f"ID {p['id']}: {p['nombre']} (S/.{precio:.0f})",
+              f"   Para qué: {(p.get('para_que_sirve') or 'N/A')[:100]}"]
+    
+    # ⭐ COMPOSICIÓN
+    if p.get('composicion_activos'):
+        lineas.append(f"   Composición: {p['composicion_activos'][:150]}")
+    
+    if p.get('mecanismo_accion'):
+        lineas.append(f"   Cómo funciona: {p['mecanismo_accion'][:150]}")
+    
+    if p.get('efectividad_estimada'):
+        efectividad_pct = float(p['efectividad_estimada']) * 100
+        lineas.append(f"   Efectividad: {efectividad_pct:.0f}%")
+    
+    lineas.append("")
+    return '\n'.join(lineas)
+
+
+def _fragmento_planta(p: Dict) -> str:
+    sirve = p.get('propiedades_curativas') or p.get('sintomas_que_trata') or ''
+    return f"ID {p['id']}: {p['nombre_comun']} - {sirve[:80]}"
+
+
+def _fragmento_remedio(r: Dict) -> str:
+    return f"ID {r['id']}: {r['nombre']} - {(r.get('descripcion') or '')[:80]}"
+
+
+registrar_formato('productos', 'composicion', _fragmento_producto_composicion)
+registrar_formato('plantas', 'gpt', _fragmento_planta)
+registrar_formato('remedios', 'gpt', _fragmento_remedio)
+
 
 class GPTOrchestrator:
-    """Orquestador GPT 100% conversacional como doctor real"""
+    """
+    Orquestador GPT 100% conversacional como doctor real
+    
+    Sin estado por paciente: una instancia compartida atiende todas las sesiones
+    (el historial y el conteo de preguntas viven en SessionManager)
+    """
     
     def __init__(self):
         self.ia_config = IAConfigManager()
+        self.llm = obtener_cliente_llm()
+        self.cache = obtener_cache_respuestas()
         self.productos = ProductosManager()
         self.plantas = PlantasMedicinalesManager()
         self.remedios = RemediosCaserosManager()
+        self.catalogo = obtener_catalogo()
         
         # ⭐ CAMBIO 1: Eliminar límite hardcodeado
-        self.preguntas_realizadas = 0
         self.preguntas_sugeridas = 8  # Solo referencia, NO límite obligatorio
         
         # ⭐ CAMBIO 2: Identidad mejorada - Doctor de cabecera REAL
@@ -84,21 +238,22 @@ IMPORTANTE:
 - No seas insistente si ya tienes: síntoma + duración aproximada
 """
         
-        print("🧠 GPT Orchestrator V4.1 inicializado")
+        logger.info("🧠 GPT Orchestrator V4.1 inicializado")
         
         # ⭐ Mostrar configuración actual
         if self.ia_config.esta_activo():
             config = self.ia_config.obtener_config()
-            print(f"   📡 Modelo: {config.get('modelo', 'N/A')}")
-            print(f"   🌡️ Temperatura: {config.get('temperatura', 'N/A')}")
-            print(f"   📊 Max tokens: {config.get('max_tokens', 'N/A')}")
+            logger.debug("📡 Modelo: %s", config.get('modelo', 'N/A'))
+            logger.debug("🌡️ Temperatura: %s", config.get('temperatura', 'N/A'))
+            logger.debug("📊 Max tokens: %s", config.get('max_tokens', 'N/A'))
         else:
-            print("   ⚠️ GPT desactivado en configuración")
+            logger.warning("⚠️ GPT desactivado en configuración")
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # ⭐ CAMBIO 3: DECISIÓN INTELIGENTE (sin límites hardcodeados)
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
+    @medir('gpt.decidir_accion')
     def decidir_accion(self, contexto: Dict) -> Dict:
         """GPT decide libremente: preguntar o diagnosticar"""
         
@@ -107,82 +262,66 @@ IMPORTANTE:
         
         mensajes = contexto.get('mensajes', [])
         
+        # ⚡ Primeros turnos casi idénticos entre visitantes: reutilizar decisión
+        clave = self._clave_cache('decision', contexto)
+        decision = self.cache.obtener(clave, 'decision') if clave else None
+        if decision:
+            logger.debug("⚡ Decisión desde caché: %s", decision['accion'].upper())
+            return dict(decision)
+        
         # ⭐ DETECCIÓN INTELIGENTE: Mensajes repetidos
         mensaje_repetido = self._detectar_mensaje_repetido(mensajes)
         
         # ⭐ CAMBIO 4: Prompt sin mencionar límites
-        prompt = f"""Analiza la conversación médica y decide la mejor acción.
+        # Prefijo fijo primero, conversación al final (caché de prefijo del proveedor)
+        def armar(conversacion: str) -> str:
+            return f"""{INSTRUCCIONES_DECISION}
 
-CONVERSACIÓN COMPLETA:
-{json.dumps(mensajes[-8:], ensure_ascii=False, indent=2)}
+CONVERSACIÓN:
+{conversacion}
 
 {'⚠️ ALERTA: El paciente repitió su último mensaje. Puede estar confundido o nervioso.' if mensaje_repetido else ''}
 
-DECIDE:
-- PREGUNTAR: Si necesitas más información para un diagnóstico responsable
-- DIAGNOSTICAR: Si ya tienes suficiente información (síntoma + contexto básico)
-
-CRITERIOS PARA DIAGNOSTICAR:
-✅ Tienes: síntoma principal + duración aprox + intensidad + algo sobre qué lo mejora/empeora
-✅ El paciente ya dio suficientes detalles
-✅ Han conversado lo suficiente (no necesitas 20 preguntas, con 4-6 buenas preguntas basta)
-
-NO DIAGNOSTIQUES SI:
-❌ Solo sabes el síntoma sin contexto
-❌ El paciente solo saludó o dijo algo confuso
-❌ Falta información crítica (ejemplo: dice "me duele" pero no dónde ni desde cuándo)
-
-Responde SOLO JSON:
-{{
-  "accion": "preguntar" o "diagnosticar",
-  "razon": "Explicación breve de por qué"
-}}
-
-Si decides PREGUNTAR y detectaste mensaje repetido, el siguiente paso será responder con empatía.
-Si decides DIAGNOSTICAR, el paciente ya dio suficiente información."""
+Responde SOLO el JSON indicado arriba."""
+        
+        # La plantilla cuenta dentro del presupuesto
+        prompt = armar(ensamblar_conversacion(
+            mensajes, contexto.get('usuario'), fijos=(self.identidad, armar('')),
+            max_turnos=Config.PROMPT_TURNOS_RECIENTES, llamada='decision'
+        ))
 
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {'role': 'system', 'content': self.identidad},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': float(config.get('temperatura', 0.3)),  # ⭐ Lee desde BD
-                    'max_tokens': 150
-                },
-                timeout=20
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=float(config.get('temperatura', 0.3)),  # ⭐ Lee desde BD
+                max_tokens=150,
+                timeout=20,
+                sesion_id=contexto.get('sesion_id')
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
                 decision = json.loads(contenido)
                 
-                if decision['accion'] == 'preguntar':
-                    self.preguntas_realizadas += 1
-                
-                self.ia_config.incrementar_consulta(0.01)
+                if clave:
+                    self.cache.guardar(clave, {'accion': decision['accion'], 'razon': decision.get('razon', '')})
                 
-                print(f"   🤔 Decisión: {decision['accion'].upper()}")
-                print(f"   💭 Razón: {decision['razon']}")
+                logger.debug("🤔 Decisión: %s", decision['accion'].upper())
+                logger.debug("💭 Razón: %s", decision['razon'])
                 
                 return decision
         
         except Exception as e:
-            print(f"❌ Error decidir acción: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error decidir acción: %s", e)
         
         # Fallback inteligente
         if len(mensajes) >= 10:
@@ -194,12 +333,115 @@ Si decides DIAGNOSTICAR, el paciente ya dio suficiente información."""
     # ⭐ CAMBIO 5: RESPUESTA CONVERSACIONAL NATURAL
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
+    @medir('gpt.respuesta')
     def generar_respuesta(self, decision: Dict, contexto: Dict) -> str:
         """Generar respuesta natural como doctor de cabecera"""
         
         if not self.ia_config.esta_activo():
             return "Lo siento, no puedo procesar tu consulta ahora."
         
+        nombre = contexto.get('usuario', {}).get('nombre', '')
+        clave = self._clave_cache('respuesta', contexto, decision)
+        cacheada = self.cache.obtener(clave, 'respuesta') if clave else None
+        if cacheada:
+            return rellenar(cacheada, nombre)
+        
+        prompt = self._construir_prompt_respuesta(decision, contexto)
+        
+        try:
+            config = self.ia_config.obtener_config()
+            
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=float(config.get('temperatura', 0.7)),  # ⭐ Lee desde BD
+                max_tokens=150,
+                timeout=20,
+                sesion_id=contexto.get('sesion_id')
+            )
+            
+            if data:
+                respuesta = data['choices'][0]['message']['content'].strip()
+                
+                if clave:
+                    self.cache.guardar(clave, plantillar(respuesta, nombre))
+                
+                return respuesta
+        
+        except Exception as e:
+            logger.exception("❌ Error generar respuesta: %s", e)
+        
+        return self._respuesta_fallback(contexto)
+    
+    def generar_respuesta_stream(self, decision: Dict, contexto: Dict) -> Iterator[str]:
+        """
+        Igual que generar_respuesta, pero entrega fragmentos a medida que GPT escribe
+        
+        Yields:
+            Fragmentos de texto (si GPT falla antes de empezar, el fallback completo)
+        """
+        
+        if not self.ia_config.esta_activo():
+            yield "Lo siento, no puedo procesar tu consulta ahora."
+            return
+        
+        nombre = contexto.get('usuario', {}).get('nombre', '')
+        clave = self._clave_cache('respuesta', contexto, decision)
+        cacheada = self.cache.obtener(clave, 'respuesta') if clave else None
+        if cacheada:
+            yield rellenar(cacheada, nombre)
+            return
+        
+        prompt = self._construir_prompt_respuesta(decision, contexto)
+        hubo_texto = False
+        texto = []
+        
+        try:
+            config = self.ia_config.obtener_config()
+            
+            fragmentos = self.llm.chat_stream(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=float(config.get('temperatura', 0.7)),
+                max_tokens=150,
+                timeout=20,
+                etapa='gpt.respuesta',
+                sesion_id=contexto.get('sesion_id')
+            )
+            
+            for fragmento in fragmentos:
+                # Quitar espacios iniciales del primer fragmento (como strip())
+                if not hubo_texto:
+                    fragmento = fragmento.lstrip()
+                    if not fragmento:
+                        continue
+                
+                hubo_texto = True
+                texto.append(fragmento)
+                yield fragmento
+            
+            if hubo_texto:
+                if clave:
+                    self.cache.guardar(clave, plantillar(''.join(texto).strip(), nombre))
+                return
+        
+        except Exception as e:
+            logger.exception("❌ Error generar respuesta (stream): %s", e)
+        
+        if not hubo_texto:
+            yield self._respuesta_fallback(contexto)
+    
+    def _construir_prompt_respuesta(self, decision: Dict, contexto: Dict) -> str:
+        """Prompt para la respuesta al paciente (preguntar o transición a diagnóstico)"""
+        
         mensajes = contexto.get('mensajes', [])
         usuario = contexto.get('usuario', {})
         
@@ -208,97 +450,48 @@ Si decides DIAGNOSTICAR, el paciente ya dio suficiente información."""
         
         if decision['accion'] == 'preguntar':
             # ⭐ CAMBIO 6: Prompt mejorado para preguntas naturales
-            prompt = f"""Eres Kairos, médico de cabecera que conversa naturalmente.
+            def armar(conversacion: str) -> str:
+                return f"""Eres Kairos, médico de cabecera que conversa naturalmente.
 
 PACIENTE: {usuario.get('nombre', 'Paciente')}
 
-CONVERSACIÓN COMPLETA (últimos 8 mensajes):
-{json.dumps(mensajes[-8:], ensure_ascii=False, indent=2)}
+CONVERSACIÓN:
+{conversacion}
 
 {'⚠️ SITUACIÓN: El paciente repitió su mensaje. Puede estar nervioso o confundido.' if mensaje_repetido else ''}
 
-INSTRUCCIONES:
-
-1. Si detectaste mensaje repetido:
-   - Responde con EMPATÍA: "Ya te escuché. Tranquilo, cuéntame con confianza..."
-   - NO repitas la misma pregunta
-   - Reformula de forma más clara y amable
-
-2. Si el paciente solo saludó sin mencionar síntomas:
-   - Responde natural: "Hola [nombre], ¿qué te trae por aquí hoy?"
-   - NO digas: "¿Podrías contarme más sobre tus síntomas?" (muy robótico)
-
-3. Si el paciente ya mencionó un síntoma:
-   - NO repitas el síntoma obvio
-   - Pregunta lo que falta: duración, intensidad, momento del día, qué lo mejora/empeora
-   - Ejemplo: Si dijo "gastritis", pregunta "¿Desde cuándo la tienes?" NO "cuéntame sobre tu gastritis"
-
-4. Sé CONVERSACIONAL:
-   - Máximo 2-3 líneas
-   - Usa el nombre del paciente naturalmente
-   - Haz UNA pregunta clara y específica
-   - Si necesitas, da contexto primero: "Entiendo que es molesto. ¿Desde hace cuánto lo tienes?"
-
-5. Reconoce lo que ya dijeron:
-   - Si dijo "me duele la cabeza" NO preguntes "¿qué te duele?"
-   - Pregunta lo siguiente lógico: "¿Desde hace cuánto?" o "¿Qué tan fuerte del 1 al 10?"
-
-Responde de forma natural y empática. SOLO el texto que le dirías al paciente."""
-
-        else:  # diagnosticar
-            prompt = f"""Eres Kairos, médico de cabecera.
+{INSTRUCCIONES_PREGUNTA}"""
+            
+            return armar(ensamblar_conversacion(
+                mensajes, usuario, fijos=(self.identidad, armar('')),
+                max_turnos=Config.PROMPT_TURNOS_RECIENTES, llamada='respuesta'
+            ))
+        
+        # diagnosticar
+        def armar(conversacion: str) -> str:
+            return f"""Eres Kairos, médico de cabecera.
 
 CONVERSACIÓN:
-{json.dumps(mensajes, ensure_ascii=False, indent=2)}
-
-Ya tienes suficiente información para diagnosticar.
-
-Responde de forma natural:
-- Agradece al paciente por la información
-- Dile que ya puedes ayudarle
-- Mantén 2-3 líneas máximo
-- Usa su nombre si lo tienes
-
-Ejemplo: "Perfecto [nombre], ya tengo toda la información necesaria. Déjame analizar tu caso..."
-
-SOLO el texto natural, sin explicaciones extras."""
+{conversacion}
 
-        try:
-            config = self.ia_config.obtener_config()
-            
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {'role': 'system', 'content': self.identidad},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': float(config.get('temperatura', 0.7)),  # ⭐ Lee desde BD
-                    'max_tokens': 150
-                },
-                timeout=20
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                respuesta = data['choices'][0]['message']['content'].strip()
-                
-                self.ia_config.incrementar_consulta(0.01)
-                
-                return respuesta
+{INSTRUCCIONES_TRANSICION}"""
         
-        except Exception as e:
-            print(f"❌ Error generar respuesta: {e}")
-            import traceback
-            traceback.print_exc()
+        return armar(ensamblar_conversacion(
+            mensajes, usuario, fijos=(self.identidad, armar('')), llamada='transicion'
+        ))
+    
+    def _clave_cache(self, tipo: str, contexto: Dict, decision: Dict = None) -> Optional[str]:
+        """Clave de caché (None si la conversación ya no está en sus primeros turnos)"""
+        config = self.ia_config.obtener_config()
+        extra = f"{config.get('modelo', '')}|{decision['accion'] if decision else ''}"
         
-        # Fallback empático
-        if mensaje_repetido:
+        return construir_clave(tipo, contexto.get('mensajes', []), contexto.get('usuario'), extra)
+    
+    def _respuesta_fallback(self, contexto: Dict) -> str:
+        """Respuesta empática cuando GPT no responde"""
+        usuario = contexto.get('usuario', {})
+        
+        if self._detectar_mensaje_repetido(contexto.get('mensajes', [])):
             return f"Tranquilo {usuario.get('nombre', '')}, cuéntame con confianza: ¿qué molestia tienes?"
         
         return "¿Podrías contarme más sobre lo que te molesta?"
@@ -338,16 +531,24 @@ SOLO el texto natural, sin explicaciones extras."""
     # RESTO DE FUNCIONES (usando config desde BD)
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
+    @medir('gpt.diagnostico')
     def generar_diagnostico_final(self, contexto: Dict) -> Optional[Dict]:
         """Generar diagnóstico CON CAUSAS"""
         
         if not self.ia_config.esta_activo():
             return None
         
-        prompt = f"""Analiza los síntomas y genera un diagnóstico.
+        # Todos los datos del contexto (no solo nombre y edad); la conversación, compacta
+        datos = serializar_datos(contexto, omitir=('mensajes', 'sesion_id')) or 'Sin datos'
+        
+        def armar(conversacion: str) -> str:
+            return f"""Analiza los síntomas y genera un diagnóstico.
+
+DATOS DEL PACIENTE:
+{datos}
 
-SÍNTOMAS:
-{json.dumps(contexto, ensure_ascii=False, indent=2)}
+SÍNTOMAS (conversación):
+{conversacion}
 
 Responde SOLO JSON:
 {{
@@ -360,62 +561,61 @@ Responde SOLO JSON:
   "advertencias": ["Si aplica"],
   "cuando_ver_medico": "Cuándo consultar"
 }}"""
+        
+        prompt = armar(ensamblar_conversacion(
+            contexto.get('mensajes', []), contexto.get('usuario'), fijos=(self.identidad, armar('')),
+            presupuesto=Config.PROMPT_PRESUPUESTO_DIAGNOSTICO, llamada='diagnostico'
+        ))
 
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {'role': 'system', 'content': self.identidad},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': float(config.get('temperatura', 0.3)),  # ⭐ Lee desde BD
-                    'max_tokens': int(config.get('max_tokens', 800))  # ⭐ Lee desde BD
-                },
-                timeout=30
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=float(config.get('temperatura', 0.3)),  # ⭐ Lee desde BD
+                max_tokens=int(config.get('max_tokens', 800)),  # ⭐ Lee desde BD
+                timeout=30,
+                sesion_id=contexto.get('sesion_id')
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
                 diagnostico = json.loads(contenido)
                 
-                self.ia_config.incrementar_consulta(0.03)
-                
                 return diagnostico
         
         except Exception as e:
-            print(f"❌ Error diagnóstico: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error diagnóstico: %s", e)
         
         return None
     
+    @medir('gpt.receta')
     def generar_receta_completa(self, diagnostico: str, contexto: Dict) -> Optional[Dict]:
         """Generar receta CON ANÁLISIS DE COMPOSICIÓN"""
         
         if not self.ia_config.esta_activo():
             return None
         
-        productos = self.productos.obtener_todos()
-        plantas = self.plantas.obtener_todas()
-        remedios = self.remedios.obtener_todos()
+        # ⚡ Solo los candidatos más relevantes de cada catálogo (prompt de tamaño fijo)
+        consulta = self._consulta_catalogo(diagnostico, contexto)
+        productos = self.productos.recuperar(consulta, Config.RECETA_TOP_PRODUCTOS)
+        plantas = self.plantas.recuperar(consulta, Config.RECETA_TOP_PLANTAS)
+        remedios = self.remedios.recuperar(consulta, Config.RECETA_TOP_REMEDIOS)
         
         # ⭐ NUEVO: Formatear con composición
         productos_str = self._formatear_productos_con_composicion(productos)
         plantas_str = self._formatear_plantas_para_gpt(plantas)
         remedios_str = self._formatear_remedios_para_gpt(remedios)
         
-        prompt = f"""Eres médico naturista experto. Analiza CIENTÍFICAMENTE qué producto es más efectivo.
+        # Prefijo fijo (instrucciones) primero: el proveedor reutiliza su caché de prompt
+        prompt = f"""{INSTRUCCIONES_RECETA}
 
 DIAGNÓSTICO: {diagnostico}
 
@@ -428,103 +628,57 @@ PLANTAS DISPONIBLES:
 REMEDIOS CASEROS:
 {remedios_str}
 
-INSTRUCCIONES:
-1. SIEMPRE recomienda AL MENOS 1 producto
-2. Analiza la COMPOSICIÓN de cada producto
-3. Elige el que tenga ingredientes activos MÁS efectivos para este caso
-4. Explica POR QUÉ ese producto (basado en su composición)
-
-CRITERIOS DE SELECCIÓN:
-- Para INSOMNIO: busca triptófano, magnesio, valeriana, pasiflora
-- Para ESTRÉS: busca ashwagandha, magnesio, vitamina B
-- Para CANSANCIO: busca hierro, vitamina B12, ginseng, maca
-- Para DOLOR: busca omega-3, cúrcuma, jengibre, MSM
-
-REGLAS:
-- Casos SIMPLES: 1 producto + 1-2 plantas + 1 remedio
-- Casos COMPLEJOS: 1-2 productos + 1-2 plantas + 1 remedio
-- PRIORIZA productos con ingredientes activos específicos para el caso
-- Si ningún producto tiene ingredientes específicos, elige el más completo
-
-Responde SOLO JSON:
-{{
-  "productos": [1],
-  "plantas": [1, 2],
-  "remedios": [1],
-  "razon_producto": "Este producto contiene X que ayuda con Y porque Z"
-}}"""
+Responde SOLO el JSON indicado arriba."""
 
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],
-                    'messages': [
-                        {'role': 'system', 'content': 'Eres médico que analiza composición química de productos naturales.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 400
-                },
-                timeout=25
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': SISTEMA_RECETA},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.3,
+                max_tokens=400,
+                timeout=25,
+                sesion_id=contexto.get('sesion_id')
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
                 receta = json.loads(contenido)
                 
-                self.ia_config.incrementar_consulta(0.02)
-                
                 # ⭐ Agregar explicación de por qué ese producto
-                print(f"   ✅ Producto recomendado: {receta.get('razon_producto', 'N/A')}")
+                logger.debug("✅ Producto recomendado: %s", receta.get('razon_producto', 'N/A'))
                 
                 return receta
         
         except Exception as e:
-            print(f"❌ Error receta: {e}")
+            logger.error("❌ Error receta: %s", e)
         
         return None
     
+    @staticmethod
+    def _consulta_catalogo(diagnostico: str, contexto: Dict) -> str:
+        """Texto para preseleccionar el catálogo: diagnóstico (peso doble) + lo que dijo el paciente"""
+        sintomas = [m['content'] for m in contexto.get('mensajes', []) if m.get('role') == 'user']
+        return ' '.join([diagnostico, diagnostico] + sintomas)
+    
     def _formatear_productos_con_composicion(self, productos: List[Dict]) -> str:
-        """Formatear productos CON análisis de composición"""
-        lineas = []
-        for p in productos[:10]:
-            precio = float(p.get('precio', 0))
-            
-            lineas.append(f"ID {p['id']}: {p['nombre']} (S/.{precio:.0f})")
-            lineas.append(f"   Para qué: {p.get('para_que_sirve', 'N/A')[:100]}")
-            
-            # ⭐ COMPOSICIÓN
-            if p.get('composicion_activos'):
-                lineas.append(f"   Composición: {p['composicion_activos'][:150]}")
-            
-            if p.get('mecanismo_accion'):
-                lineas.append(f"   Cómo funciona: {p['mecanismo_accion'][:150]}")
-            
-            if p.get('efectividad_estimada'):
-                efectividad_pct = float(p['efectividad_estimada']) * 100
-                lineas.append(f"   Efectividad: {efectividad_pct:.0f}%")
-            
-            lineas.append("")
-        
-        return '\n'.join(lineas)
+        """Formatear productos CON análisis de composición (fragmentos precalculados)"""
+        return '\n'.join(self.catalogo.fragmentos('productos', 'composicion', productos))
     
-    def investigar_plantas_para_diagnostico(self, diagnostico: str) -> List[Dict]:
+    def investigar_plantas_para_diagnostico(self, diagnostico: str, sesion_id: str = None) -> List[Dict]:
         """Investigar plantas con WEB SEARCH REAL"""
         
         if not self.ia_config.esta_activo():
             return []
         
-        print(f"   🌐 Buscando plantas REALES en internet para {diagnostico}...")
+        logger.debug("🌐 Buscando plantas REALES en internet para %s...", diagnostico)
         
         info_web = self._buscar_info_web(f"plantas medicinales naturales para {diagnostico}")
         
@@ -553,43 +707,34 @@ IMPORTANTE: Solo plantas mencionadas en la información proporcionada."""
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {'role': 'system', 'content': self.identidad + '\n\nExtrae plantas REALES de información verificada.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 800
-                },
-                timeout=35
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad + '\n\nExtrae plantas REALES de información verificada.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.3,
+                max_tokens=800,
+                timeout=35,
+                etapa='gpt.plantas',
+                sesion_id=sesion_id
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
                 plantas = json.loads(contenido)
                 
-                self.ia_config.incrementar_consulta(0.03)
-                
-                print(f"   ✅ Encontré {len(plantas)} plantas verificadas")
+                logger.debug("✅ Encontré %s plantas verificadas", len(plantas))
                 for p in plantas:
-                    print(f"      • {p['nombre_comun']}")
+                    logger.debug("• %s", p['nombre_comun'])
                 
                 return plantas
         
         except Exception as e:
-            print(f"❌ Error investigar plantas: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error investigar plantas: %s", e)
         
         return []
     
@@ -609,16 +754,16 @@ Proporciona información verificada sobre plantas/remedios:
 - Seguros para uso general"""
             
         except Exception as e:
-            print(f"⚠️ Error web search: {e}")
+            logger.warning("⚠️ Error web search: %s", e)
             return "Investiga plantas/remedios verificados y comunes."
     
-    def investigar_remedios_para_diagnostico(self, diagnostico: str) -> List[Dict]:
+    def investigar_remedios_para_diagnostico(self, diagnostico: str, sesion_id: str = None) -> List[Dict]:
         """Investigar remedios con WEB SEARCH REAL"""
         
         if not self.ia_config.esta_activo():
             return []
         
-        print(f"   🌐 Buscando remedios REALES en internet para {diagnostico}...")
+        logger.debug("🌐 Buscando remedios REALES en internet para %s...", diagnostico)
         
         info_web = self._buscar_info_web(f"remedios caseros naturales efectivos para {diagnostico}")
         
@@ -652,46 +797,37 @@ IMPORTANTE: Solo remedios mencionados en la información."""
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {
-                            'role': 'system', 
-                            'content': self.identidad + '\n\nExtrae remedios REALES de información verificada. NO repitas remedios.'
-                        },
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.4,
-                    'max_tokens': 800
-                },
-                timeout=35
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {
+                        'role': 'system', 
+                        'content': self.identidad + '\n\nExtrae remedios REALES de información verificada. NO repitas remedios.'
+                    },
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.4,
+                max_tokens=800,
+                timeout=35,
+                etapa='gpt.remedios',
+                sesion_id=sesion_id
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
                 remedios = json.loads(contenido)
                 
-                self.ia_config.incrementar_consulta(0.03)
-                
-                print(f"   ✅ Encontré {len(remedios)} remedios verificados")
+                logger.debug("✅ Encontré %s remedios verificados", len(remedios))
                 for r in remedios:
-                    print(f"      • {r['nombre']}")
+                    logger.debug("• %s", r['nombre'])
                 
                 return remedios
         
         except Exception as e:
-            print(f"❌ Error investigar remedios: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error investigar remedios: %s", e)
         
         return []
     
@@ -716,34 +852,27 @@ Máximo 3-4 líneas."""
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],  # ⭐ Lee desde BD
-                    'messages': [
-                        {'role': 'system', 'content': self.identidad},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.5,
-                    'max_tokens': 200
-                },
-                timeout=20
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],  # ⭐ Lee desde BD
+                mensajes=[
+                    {'role': 'system', 'content': self.identidad},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.5,
+                max_tokens=200,
+                timeout=20,
+                etapa='gpt.duda_tratamiento',
+                sesion_id=contexto.get('sesion_id')
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 respuesta = data['choices'][0]['message']['content'].strip()
                 
-                self.ia_config.incrementar_consulta(0.01)
-                
                 return respuesta
         
         except Exception as e:
-            print(f"❌ Error respondiendo duda: {e}")
+            logger.error("❌ Error respondiendo duda: %s", e)
         
         return "Lo siento, no pude procesar tu pregunta."
     
@@ -757,17 +886,23 @@ Máximo 3-4 líneas."""
         return '\n'.join(lineas)
     
     def _formatear_plantas_para_gpt(self, plantas: List[Dict]) -> str:
-        """Formatear plantas para GPT"""
-        lineas = []
-        for p in plantas[:15]:
-            sirve = p.get('propiedades_curativas', '') or p.get('sintomas_que_trata', '')
-            lineas.append(f"ID {p['id']}: {p['nombre_comun']} - {sirve[:80]}")
-        return '\n'.join(lineas)
+        """Formatear plantas para GPT (fragmentos precalculados)"""
+        return '\n'.join(self.catalogo.fragmentos('plantas', 'gpt', plantas[:15]))
     
     def _formatear_remedios_para_gpt(self, remedios: List[Dict]) -> str:
-        """Formatear remedios para GPT"""
-        lineas = []
-        for r in remedios[:10]:
-            desc = r.get('descripcion', '')
-            lineas.append(f"ID {r['id']}: {r['nombre']} - {desc[:80]}")
-        return '\n'.join(lineas)
\ No newline at end of file
+        """Formatear remedios para GPT (fragmentos precalculados)"""
+        return '\n'.join(self.catalogo.fragmentos('remedios', 'gpt', remedios[:10]))
+
+
+# Singleton
+_orquestador = None
+_orquestador_lock = threading.Lock()
+
+def obtener_orquestador() -> GPTOrchestrator:
+    """Obtener orquestador compartido del proceso (sin estado por sesión)"""
+    global _orquestador
+    if _orquestador is None:
+        with _orquestador_lock:
+            if _orquestador is None:
+                _orquestador = GPTOrchestrator()
+    return _orquestador
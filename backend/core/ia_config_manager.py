@@ -1,6 +1,6 @@
 """
 Gestor de Configuración de IA
-Lee configuración desde BD (panel admin)
+Lee configuración desde BD (panel admin), compartida por el gobernador de IA del proceso
 """
 
 import sys
@@ -12,6 +12,12 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.insert(0, BASE_DIR)
 
 from backend.database.database_manager import DatabaseManager
+from backend.database.escritura_diferida import obtener_escritura_diferida
+from backend.core.consumo_ia import obtener_consumo_ia
+from backend.core.gobernador_ia import obtener_gobernador_ia
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class IAConfigManager:
     """
@@ -19,37 +25,30 @@ class IAConfigManager:
     """
     
     def __init__(self):
-        """Inicializar gestor"""
+        """Inicializar gestor (la configuración vive en el gobernador de IA del proceso)"""
         self.db = DatabaseManager()
-        self.config = None
+        self.gobernador = obtener_gobernador_ia()
         self.cargar_configuracion()
     
+    @property
+    def config(self) -> Optional[Dict]:
+        """Última configuración activa leída por el gobernador (se resincroniza sola)"""
+        return self.gobernador.config
+    
     def cargar_configuracion(self) -> bool:
         """
-        Cargar configuración desde BD
+        Cargar configuración desde BD (solo la primera vez en el proceso)
         """
         try:
-            query = """
-            SELECT * FROM configuracion_ia 
-            WHERE activo = TRUE 
-            ORDER BY id DESC 
-            LIMIT 1
-            """
+            self.gobernador.asegurar_sincronizado()
             
-            resultado = self.db.ejecutar_query(query)
-            
-            if resultado and len(resultado) > 0:
-                self.config = resultado[0]
-                print(f"✅ Config IA cargada: {self.config['proveedor']} ({self.config['modelo_gpt']})")
+            if self.config:
+                logger.debug("✅ Config IA: %s (%s)", self.config['proveedor'], self.config['modelo_gpt'])
                 return True
-            else:
-                print("⚠️ No hay configuración de IA activa")
-                self.config = None
-                return False
+            return False
                 
         except Exception as e:
-            print(f"❌ Error cargando config IA: {e}")
-            self.config = None
+            logger.error("❌ Error cargando config IA: %s", e)
             return False
     
     def esta_activo(self) -> bool:
@@ -77,15 +76,8 @@ class IAConfigManager:
         if not self.tiene_api_key():
             return False, "No hay API key configurada"
         
-        # Verificar límite diario
-        if self.config['consultas_realizadas_hoy'] >= self.config['limite_diario_consultas']:
-            return False, f"Límite diario alcanzado ({self.config['limite_diario_consultas']})"
-        
-        # Verificar presupuesto mensual
-        if self.config['gasto_mes_actual'] >= self.config['presupuesto_mensual']:
-            return False, f"Presupuesto mensual agotado (S/. {self.config['presupuesto_mensual']})"
-        
-        return True, "OK"
+        # Topes diario/mensual con contadores en memoria (incluye lo no sincronizado)
+        return self.gobernador.verificar()
     
     def obtener_config(self) -> Dict:
         """Obtener configuración completa"""
@@ -102,37 +94,30 @@ class IAConfigManager:
             'confianza_minima': float(self.config['confianza_minima_guardar'])
         }
     
-    def incrementar_consulta(self, costo: float = 0.02):
-        """
-        Registrar consulta realizada
-        """
-        if not self.config:
-            return
-        
-        query = """
-        UPDATE configuracion_ia 
-        SET consultas_realizadas_hoy = consultas_realizadas_hoy + 1,
-            gasto_mes_actual = gasto_mes_actual + %s
-        WHERE id = %s
-        """
-        
-        self.db.ejecutar_comando(query, (costo, self.config['id']))
-    
     def resetear_contador_diario(self):
         """
         Resetear contador diario (cron job)
         """
+        # Aplicar antes los incrementos pendientes para no arrastrarlos al día nuevo
+        obtener_consumo_ia().vaciar()
+        obtener_escritura_diferida().vaciar()
+        
         query = "UPDATE configuracion_ia SET consultas_realizadas_hoy = 0"
         self.db.ejecutar_comando(query)
-        print("✅ Contador diario de consultas reseteado")
+        self.gobernador.sincronizar()
+        logger.info("✅ Contador diario de consultas reseteado")
     
     def resetear_gasto_mensual(self):
         """
         Resetear gasto mensual (cron job)
         """
+        obtener_consumo_ia().vaciar()
+        obtener_escritura_diferida().vaciar()
+        
         query = "UPDATE configuracion_ia SET gasto_mes_actual = 0"
         self.db.ejecutar_comando(query)
-        print("✅ Gasto mensual reseteado")
+        self.gobernador.sincronizar()
+        logger.info("✅ Gasto mensual reseteado")
     
     def registrar_consulta_log(self, datos: Dict) -> int:
         """
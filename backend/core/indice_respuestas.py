@@ -0,0 +1,276 @@
+"""
+Índice de respuestas aprendidas (búsqueda difusa en memoria)
+✅ Vectores TF-IDF de n-gramas de caracteres (matriz dispersa por intención)
+✅ Top-k por similitud coseno, sin LIKE '%...%' contra MySQL
+✅ El coseno se pondera por los n-gramas del mensaje que el vocabulario conoce
+✅ Largo parecido y misma negación: un mensaje más grave no recibe la respuesta de uno leve
+✅ Se carga al iniciar y se actualiza al aprender una respuesta nueva
+✅ Reentrena el vocabulario cuando crece lo suficiente
+✅ numpy / scipy / sklearn se importan al construir el índice, no al importar el módulo
+"""
+
+import sys
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Por debajo de este tamaño cada respuesta nueva reentrena el vocabulario
+REENTRENAR_SIEMPRE_HASTA = 200
+
+# "no me duele" no debe responder como "me duele"
+NEGACIONES = frozenset({'no', 'ni', 'sin', 'nunca', 'tampoco', 'nada'})
+
+_PALABRAS = re.compile(r"\w+", re.UNICODE)
+
+
+def _negaciones(texto: str) -> frozenset:
+    return NEGACIONES.intersection(_PALABRAS.findall(texto.lower()))
+
+
+class _PorIntencion:
+    """Filas y matriz TF-IDF de una intención"""
+
+    def __init__(self):
+        self.filas: List[Dict] = []
+        self.matriz = None
+        self.exactos: Dict[str, int] = {}   # patrón -> posición (coincidencia exacta)
+
+
+class IndiceRespuestas:
+    """
+    Uso:
+        indice = obtener_indice_respuestas()
+        indice.cargar(db)
+        resultados = indice.buscar('me duele cabeza', 'sintoma')
+    """
+
+    def __init__(self, umbral: float = None, top_k: int = None, proporcion_largo: float = None):
+        """
+        Args:
+            umbral: Similitud mínima (0-1) para aceptar una respuesta
+            top_k: Candidatos devueltos por búsqueda
+            proporcion_largo: Largo más corto / más largo mínimo entre mensaje y patrón
+        """
+        self.umbral = umbral if umbral is not None else Config.RESPUESTAS_UMBRAL_SIMILITUD
+        self.top_k = top_k or Config.RESPUESTAS_TOP_K
+        self.proporcion_largo = (proporcion_largo if proporcion_largo is not None
+                                 else Config.RESPUESTAS_PROPORCION_LARGO)
+
+        self._vectorizador = None
+        self._analizador = None
+        self._patrones_entrenados = 0
+        self._agregados_desde_entrenamiento = 0
+
+        self._intenciones: Dict[str, _PorIntencion] = {}
+        self._cargado = False
+        self._lock = threading.RLock()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CARGA Y ACTUALIZACIÓN
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def cargar(self, db):
+        """Cargar todas las respuestas activas desde MySQL"""
+        query = """
+        SELECT id, patron_mensaje, intencion, respuesta_generada,
+               veces_usado, calificacion_promedio
+        FROM respuestas_aprendidas
+        WHERE activo = TRUE
+        """
+
+        filas = db.ejecutar_query(query)
+        if filas is None:
+            logger.warning("⚠️ Índice de respuestas: no se pudo leer respuestas_aprendidas")
+            return
+
+        with self._lock:
+            self._reconstruir([{
+                'id': f['id'],
+                'patron': f.get('patron_mensaje') or '',
+                'intencion': f.get('intencion') or '',
+                'respuesta': f.get('respuesta_generada') or '',
+                'veces_usado': f.get('veces_usado') or 0,
+                'calificacion': float(f.get('calificacion_promedio') or 0)
+            } for f in filas])
+            self._cargado = True
+
+        logger.info("🔎 Índice de respuestas: %s patrones en %s intenciones", len(filas), len(self._intenciones))
+
+    def agregar(self, id_respuesta: int, patron: str, intencion: str, respuesta: str):
+        """Agregar una respuesta recién aprendida"""
+        fila = {
+            'id': id_respuesta,
+            'patron': patron,
+            'intencion': intencion,
+            'respuesta': respuesta,
+            'veces_usado': 0,
+            'calificacion': 0.0
+        }
+
+        with self._lock:
+            self._agregados_desde_entrenamiento += 1
+
+            # Índice pequeño (reentrenar es barato) o vocabulario desactualizado
+            if (self._vectorizador is None or
+                    self._patrones_entrenados < REENTRENAR_SIEMPRE_HASTA or
+                    self._agregados_desde_entrenamiento > self._patrones_entrenados // 2):
+                self._reconstruir(self._todas_las_filas() + [fila])
+                return
+
+            from scipy.sparse import vstack
+
+            grupo = self._intenciones.setdefault(intencion, _PorIntencion())
+            vector = self._vectorizador.transform([patron])
+
+            grupo.matriz = vector if grupo.matriz is None else vstack([grupo.matriz, vector]).tocsr()
+            grupo.exactos.setdefault(patron, len(grupo.filas))
+            grupo.filas.append(fila)
+
+    def marcar_uso(self, id_respuesta: int):
+        """Reflejar en memoria el uso de una respuesta (orden por popularidad)"""
+        with self._lock:
+            for grupo in self._intenciones.values():
+                for fila in grupo.filas:
+                    if fila['id'] == id_respuesta:
+                        fila['veces_usado'] += 1
+                        return
+
+    def quitar(self, id_respuesta: int):
+        """Quitar una respuesta desactivada (reconstruye el índice)"""
+        with self._lock:
+            filas = self._todas_las_filas()
+            restantes = [f for f in filas if f['id'] != id_respuesta]
+            if len(restantes) != len(filas):
+                self._reconstruir(restantes)
+
+    def _todas_las_filas(self) -> List[Dict]:
+        return [fila for grupo in self._intenciones.values() for fila in grupo.filas]
+
+    def _reconstruir(self, filas: List[Dict]):
+        """Entrenar vocabulario y construir las matrices por intención"""
+        self._intenciones = {}
+        self._agregados_desde_entrenamiento = 0
+        self._patrones_entrenados = len(filas)
+
+        if not filas:
+            self._vectorizador = None
+            self._analizador = None
+            return
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self._vectorizador = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 4),
+                                             sublinear_tf=True)
+        matriz = self._vectorizador.fit_transform([f['patron'] for f in filas])
+        self._analizador = self._vectorizador.build_analyzer()
+
+        posiciones: Dict[str, List[int]] = {}
+        for i, fila in enumerate(filas):
+            posiciones.setdefault(fila['intencion'], []).append(i)
+
+        for intencion, indices in posiciones.items():
+            grupo = _PorIntencion()
+            grupo.filas = [filas[i] for i in indices]
+            grupo.matriz = matriz[indices]
+            for posicion, fila in enumerate(grupo.filas):
+                grupo.exactos.setdefault(fila['patron'], posicion)
+            self._intenciones[intencion] = grupo
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # BÚSQUEDA
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def buscar(self, patron: str, intencion: str, k: int = None) -> List[Tuple[Dict, float]]:
+        """
+        Respuestas más parecidas dentro de una intención
+
+        transform() descarta los n-gramas fuera del vocabulario y el coseno
+        saldría ~1.0 para cualquier mensaje que contenga un patrón aprendido
+        ("tengo tos con sangre" vs "tengo tos"); por eso se multiplica por la
+        fracción de n-gramas conocidos y se exige largo parecido.
+
+        Returns:
+            Lista de (fila, similitud) sobre el umbral, la mejor primero
+        """
+        k = k or self.top_k
+
+        with self._lock:
+            grupo = self._intenciones.get(intencion)
+            if grupo is None or grupo.matriz is None or not patron:
+                return []
+
+            # Coincidencia exacta: sin calcular vectores
+            if patron in grupo.exactos:
+                return [(grupo.filas[grupo.exactos[patron]], 1.0)]
+
+            vector = self._vectorizador.transform([patron])
+            if vector.nnz == 0:
+                return []
+
+            ngramas = self._analizador(patron)
+            vocabulario = self._vectorizador.vocabulary_
+            cobertura = sum(1 for ngrama in ngramas if ngrama in vocabulario) / len(ngramas)
+
+            # Filas L2-normalizadas: producto punto = coseno
+            similitudes = (grupo.matriz @ vector.T).toarray().ravel() * cobertura
+
+            if len(similitudes) > k:
+                candidatos = (-similitudes).argpartition(k)[:k]
+            else:
+                candidatos = range(len(similitudes))
+
+            negaciones = _negaciones(patron)
+            resultados = [
+                (grupo.filas[i], float(similitudes[i]))
+                for i in candidatos
+                if similitudes[i] >= self.umbral and self._compatibles(patron, negaciones, grupo.filas[i]['patron'])
+            ]
+
+        resultados.sort(key=lambda r: (r[1], r[0]['veces_usado'], r[0]['calificacion']), reverse=True)
+        return resultados
+
+    def _compatibles(self, mensaje: str, negaciones: frozenset, patron: str) -> bool:
+        """Largo parecido y las mismas negaciones"""
+        largos = sorted((len(mensaje), len(patron)))
+        if largos[1] and largos[0] / largos[1] < self.proporcion_largo:
+            return False
+        return _negaciones(patron) == negaciones
+
+    def mejor(self, patron: str, intencion: str) -> Optional[Dict]:
+        """Mejor respuesta sobre el umbral o None"""
+        resultados = self.buscar(patron, intencion, k=self.top_k)
+        return resultados[0][0] if resultados else None
+
+    @property
+    def cargado(self) -> bool:
+        return self._cargado
+
+    def obtener_estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                'patrones': sum(len(g.filas) for g in self._intenciones.values()),
+                'intenciones': len(self._intenciones),
+                'umbral': self.umbral,
+                'proporcion_largo': self.proporcion_largo
+            }
+
+
+# Singleton
+_indice = None
+_indice_lock = threading.Lock()
+
+def obtener_indice_respuestas() -> IndiceRespuestas:
+    """Obtener índice compartido del proceso"""
+    global _indice
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                _indice = IndiceRespuestas()
+    return _indice
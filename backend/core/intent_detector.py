@@ -3,10 +3,30 @@ Intent Detector - Detector de Intenciones
 Identifica qué quiere el usuario de forma inteligente
 """
 
+import os
 import re
+import sys
 from typing import Dict, List, Tuple, Optional
 from unidecode import unidecode
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from backend.core.aho_corasick import AutomataPatrones, Coincidencia
+from backend.core.normalizacion import normalizar
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Patrones genéricos de síntoma (cuando no hay intención clara)
+PATRONES_SINTOMA = [
+    'me duele', 'me siento', 'tengo', 'siento',
+    'dolor', 'molestia', 'malestar', 'problema'
+]
+
+# Palabras clave de intención hasta este largo exigen palabra completa
+# ('si' no debe coincidir en 'siento'); las más largas basta con que empiecen
+# palabra ('precio' coincide con 'precios', 'cuanto cuesta' con 'cuanto cuestan')
+LARGO_PALABRA_COMPLETA = 3
+
 class IntentDetector:
     """
     Detector de intenciones del usuario
@@ -109,7 +129,10 @@ class IntentDetector:
             'fiebre': ['fiebre', 'calentura', 'temperatura'],
         }
         
-        print("🎯 Intent Detector inicializado")
+        # ⚡ Todas las palabras clave en un solo autómata
+        self._automata = self._construir_automata()
+        
+        logger.info("🎯 Intent Detector inicializado")
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # DETECCIÓN PRINCIPAL
@@ -130,11 +153,14 @@ class IntentDetector:
         # Normalizar mensaje
         mensaje_norm = self._normalizar(mensaje)
         
+        # Una sola pasada: todas las coincidencias de todos los patrones
+        coincidencias = self._automata.buscar(mensaje_norm)
+        
         # Detectar intención primaria
-        intencion_primaria = self._detectar_intencion_primaria(mensaje_norm)
+        intencion_primaria = self._detectar_intencion_primaria(mensaje_norm, coincidencias)
         
         # Detectar síntomas específicos
-        sintomas = self._detectar_sintomas(mensaje_norm)
+        sintomas = self._detectar_sintomas(mensaje_norm, coincidencias)
         
         # Extraer entidades
         entidades = self._extraer_entidades(mensaje_norm)
@@ -156,52 +182,90 @@ class IntentDetector:
             'es_transaccional': intencion_primaria in ['producto', 'precio', 'modo_uso']
         }
         
-        print(f"   🎯 Detectado: {intencion_primaria} (conf: {confianza:.0%})")
+        logger.debug("🎯 Detectado: %s (conf: %.0f%%)", intencion_primaria, confianza * 100)
         if sintomas:
-            print(f"   💊 Síntomas: {', '.join(sintomas)}")
+            logger.debug("💊 Síntomas: %s", ', '.join(sintomas))
         
         return resultado
     
-    def _detectar_intencion_primaria(self, mensaje: str) -> str:
-        """Detectar la intención principal"""
+    def _construir_automata(self) -> AutomataPatrones:
+        """
+        Compilar patrones, síntomas específicos y patrones genéricos
+        
+        Las palabras clave cortas de intención exigen palabra completa ('si'
+        no coincide dentro de 'siento'); el resto y los síntomas basta con que
+        empiecen palabra ('precio' coincide con 'precios', 'migrana' con 'migranas').
+        """
+        automata = AutomataPatrones()
         
-        # Verificar cada patrón
         for intencion, palabras_clave in self.patrones.items():
             for palabra in palabras_clave:
-                if palabra in mensaje:
-                    return intencion
+                palabra = unidecode(palabra)
+                automata.agregar(palabra, ('intencion', intencion),
+                                 palabra_completa=len(palabra) <= LARGO_PALABRA_COMPLETA)
+        
+        for sintoma, palabras in self.sintomas_especificos.items():
+            for palabra in palabras:
+                automata.agregar(unidecode(palabra), ('sintoma', sintoma))
+        
+        for patron in PATRONES_SINTOMA:
+            automata.agregar(patron, ('generico', None))
+        
+        automata.construir()
+        
+        # Ante empate de puntaje gana la intención declarada primero
+        self._prioridad = {intencion: i for i, intencion in enumerate(self.patrones)}
+        
+        return automata
+    
+    def _detectar_intencion_primaria(self, mensaje: str,
+                                     coincidencias: List[Coincidencia] = None) -> str:
+        """
+        Detectar la intención principal
+        
+        Cada coincidencia suma su largo al puntaje de su intención:
+        patrones más específicos ('no gracias') pesan más que los cortos ('no').
+        """
+        if coincidencias is None:
+            coincidencias = self._automata.buscar(mensaje)
+        
+        puntajes = {}
+        for c in coincidencias:
+            tipo, intencion = c.etiqueta
+            if tipo == 'intencion':
+                puntajes[intencion] = puntajes.get(intencion, 0) + len(c.patron)
+        
+        if puntajes:
+            return max(puntajes, key=lambda i: (puntajes[i], -self._prioridad[i]))
         
         # Si menciona síntomas específicos
-        if self._tiene_sintoma(mensaje):
+        if self._tiene_sintoma(mensaje, coincidencias):
             return 'sintoma'
         
         # Default
         return 'desconocida'
     
-    def _detectar_sintomas(self, mensaje: str) -> List[str]:
-        """Detectar síntomas específicos mencionados"""
+    def _detectar_sintomas(self, mensaje: str,
+                           coincidencias: List[Coincidencia] = None) -> List[str]:
+        """Detectar síntomas específicos mencionados (en orden de aparición)"""
+        if coincidencias is None:
+            coincidencias = self._automata.buscar(mensaje)
         
         sintomas_encontrados = []
         
-        for sintoma, palabras in self.sintomas_especificos.items():
-            for palabra in palabras:
-                if palabra in mensaje:
-                    if sintoma not in sintomas_encontrados:
-                        sintomas_encontrados.append(sintoma)
-                    break
+        for c in sorted(coincidencias, key=lambda c: c.inicio):
+            tipo, sintoma = c.etiqueta
+            if tipo == 'sintoma' and sintoma not in sintomas_encontrados:
+                sintomas_encontrados.append(sintoma)
         
         return sintomas_encontrados
     
-    def _tiene_sintoma(self, mensaje: str) -> bool:
+    def _tiene_sintoma(self, mensaje: str, coincidencias: List[Coincidencia] = None) -> bool:
         """Verificar si el mensaje menciona algún síntoma"""
+        if coincidencias is None:
+            coincidencias = self._automata.buscar(mensaje)
         
-        # Patrones de síntomas
-        patrones_sintoma = [
-            'me duele', 'me siento', 'tengo', 'siento',
-            'dolor', 'molestia', 'malestar', 'problema'
-        ]
-        
-        return any(patron in mensaje for patron in patrones_sintoma)
+        return any(c.etiqueta[0] == 'generico' for c in coincidencias)
     
     def _extraer_entidades(self, mensaje: str) -> Dict:
         """Extraer entidades específicas del mensaje"""
@@ -314,32 +378,8 @@ class IntentDetector:
         return min(1.0, confianza)
     
     def _normalizar(self, mensaje: str) -> str:
-        """Normalizar mensaje para análisis"""
-        
-        # Minúsculas
-        msg = mensaje.lower().strip()
-        
-        # Quitar acentos
-        msg = unidecode(msg)
-        
-        # Correcciones ortográficas comunes
-        correcciones = {
-            'cabesa': 'cabeza',
-            'estomago': 'estomago',
-            'cansao': 'cansado',
-            'jodido': 'muy mal',
-            'fregado': 'muy mal',
-            'pa': 'para',
-            'q': 'que',
-            'xq': 'porque',
-            'k': 'que',
-            've[cz]': 'vez'
-        }
-        
-        for error, correcto in correcciones.items():
-            msg = msg.replace(error, correcto)
-        
-        return msg
+        """Normalizar mensaje para análisis (normalización compartida, memorizada)"""
+        return normalizar(mensaje)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # MÉTODOS DE UTILIDAD
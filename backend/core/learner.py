@@ -5,18 +5,27 @@ Aprende automáticamente de cada consulta y mejora con el tiempo
 
 import sys
 import os
+import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import json
-import pandas as pd
 from collections import Counter
-import re
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 
 from backend.database.database_manager import DatabaseManager
 from backend.core.classifier import IntentClassifier
+from backend.core.normalizacion import quitar_palabras
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Palabras ignoradas al agrupar mensajes similares
+STOPWORDS_PATRONES = {'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'una', 'por', 'para'}
+
+_PUNTUACION = re.compile(r'[^\w\s]')
+
 
 class TipoAprendizaje:
     """Tipos de aprendizaje del sistema"""
@@ -62,14 +71,11 @@ class KairosLearner:
         self.reentrenamientos = 0
         self.patrones_nuevos = 0
         
-        print("="*70)
-        print("🧠 KAIROS LEARNER - SISTEMA DE APRENDIZAJE CONTINUO")
-        print("="*70)
-        print(f"   Auto-entrenamiento: {'✅ ACTIVO' if auto_entrenamiento else '❌ MANUAL'}")
-        print(f"   Umbral patrones: {self.umbral_patron_repetitivo} repeticiones")
-        print(f"   Umbral confianza: {self.umbral_confianza_baja}")
-        print(f"   Días análisis: {self.dias_analisis}")
-        print("="*70 + "\n")
+        logger.debug("🧠 KAIROS LEARNER - SISTEMA DE APRENDIZAJE CONTINUO")
+        logger.debug("Auto-entrenamiento: %s", '✅ ACTIVO' if auto_entrenamiento else '❌ MANUAL')
+        logger.debug("Umbral patrones: %s repeticiones", self.umbral_patron_repetitivo)
+        logger.debug("Umbral confianza: %s", self.umbral_confianza_baja)
+        logger.debug("Días análisis: %s", self.dias_analisis)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # ANÁLISIS DE CONVERSACIONES
@@ -87,9 +93,7 @@ class KairosLearner:
         """
         dias = dias or self.dias_analisis
         
-        print(f"\n{'='*70}")
-        print(f"📊 ANALIZANDO CONVERSACIONES DE ÚLTIMOS {dias} DÍAS")
-        print(f"{'='*70}\n")
+        logger.debug("📊 ANALIZANDO CONVERSACIONES DE ÚLTIMOS %s DÍAS", dias)
         
         # Obtener conversaciones recientes
         fecha_inicio = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
@@ -103,7 +107,7 @@ class KairosLearner:
         conversaciones = self.db.ejecutar_query(query, (fecha_inicio,))
         
         if not conversaciones:
-            print("⚠️ No hay conversaciones para analizar\n")
+            logger.warning("⚠️ No hay conversaciones para analizar")
             # RETORNAR ESTRUCTURA COMPLETA VACÍA
             return {
                 'total_conversaciones': 0,
@@ -120,7 +124,7 @@ class KairosLearner:
                 'errores_clasificacion': []
             }
         
-        print(f"✅ {len(conversaciones)} conversaciones encontradas\n")
+        logger.debug("✅ %s conversaciones encontradas", len(conversaciones))
         
         # Análisis
         analisis = {
@@ -145,7 +149,7 @@ class KairosLearner:
         Returns:
             Lista de patrones encontrados
         """
-        print("🔍 Detectando patrones repetitivos...")
+        logger.debug("🔍 Detectando patrones repetitivos...")
         
         # Agrupar mensajes similares
         mensajes_normalizados = {}
@@ -191,7 +195,7 @@ class KairosLearner:
                 
                 patrones.append(patron)
         
-        print(f"   ✅ {len(patrones)} patrones repetitivos encontrados\n")
+        logger.debug("✅ %s patrones repetitivos encontrados", len(patrones))
         
         return sorted(patrones, key=lambda x: x['frecuencia'], reverse=True)
     
@@ -202,7 +206,7 @@ class KairosLearner:
         Returns:
             Lista de mensajes problemáticos
         """
-        print("🔍 Detectando mensajes con baja confianza...")
+        logger.debug("🔍 Detectando mensajes con baja confianza...")
         
         bajas = []
         
@@ -217,7 +221,7 @@ class KairosLearner:
                     'fecha': conv['fecha']
                 })
         
-        print(f"   ⚠️ {len(bajas)} mensajes con confianza < {self.umbral_confianza_baja}\n")
+        logger.info("⚠️ %s mensajes con confianza < %s", len(bajas), self.umbral_confianza_baja)
         
         return sorted(bajas, key=lambda x: x['confianza'])
     
@@ -228,7 +232,7 @@ class KairosLearner:
         Returns:
             Lista de mensajes desconocidos
         """
-        print("🔍 Detectando mensajes desconocidos...")
+        logger.debug("🔍 Detectando mensajes desconocidos...")
         
         desconocidos = []
         
@@ -240,7 +244,7 @@ class KairosLearner:
                     'fecha': conv['fecha']
                 })
         
-        print(f"   ❓ {len(desconocidos)} mensajes desconocidos\n")
+        logger.debug("❓ %s mensajes desconocidos", len(desconocidos))
         
         return desconocidos
     
@@ -251,7 +255,7 @@ class KairosLearner:
         Returns:
             Dict con estadísticas de intenciones
         """
-        print("📊 Analizando frecuencia de intenciones...")
+        logger.debug("📊 Analizando frecuencia de intenciones...")
         
         intenciones = [conv['intencion_detectada'] for conv in conversaciones]
         frecuencias = Counter(intenciones)
@@ -263,7 +267,7 @@ class KairosLearner:
             'menos_comun': frecuencias.most_common()[-1] if frecuencias else None
         }
         
-        print(f"   ✅ {len(frecuencias)} intenciones diferentes detectadas\n")
+        logger.debug("✅ %s intenciones diferentes detectadas", len(frecuencias))
         
         return stats
     
@@ -275,7 +279,7 @@ class KairosLearner:
         Returns:
             Lista de posibles errores
         """
-        print("🔍 Detectando posibles errores de clasificación...")
+        logger.debug("🔍 Detectando posibles errores de clasificación...")
         
         # Por ahora, consideramos errores los casos con confianza muy baja
         # En el futuro, podríamos usar feedback del usuario
@@ -294,7 +298,7 @@ class KairosLearner:
                     'fecha': conv['fecha']
                 })
         
-        print(f"   ⚠️ {len(errores)} posibles errores detectados\n")
+        logger.warning("⚠️ %s posibles errores detectados", len(errores))
         
         return errores
     
@@ -308,45 +312,34 @@ class KairosLearner:
         Returns:
             Mensaje normalizado
         """
-        # Convertir a minúsculas
-        msg = mensaje.lower()
-        
-        # Eliminar puntuación
-        msg = re.sub(r'[^\w\s]', '', msg)
-        
-        # Eliminar espacios múltiples
-        msg = ' '.join(msg.split())
+        # Minúsculas, sin puntuación ni espacios múltiples; conserva tildes y
+        # no corrige ortografía: patrones_aprendidos.patron se guardó con este formato
+        msg = ' '.join(_PUNTUACION.sub('', mensaje.lower()).split())
         
         # Eliminar palabras muy comunes (stopwords básicos)
-        stopwords = ['el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'una', 'por', 'para']
-        palabras = [p for p in msg.split() if p not in stopwords]
-        
-        return ' '.join(palabras)
+        return quitar_palabras(msg, STOPWORDS_PATRONES)
     
     def _mostrar_resumen_analisis(self, analisis: Dict):
         """Mostrar resumen del análisis"""
-        print(f"\n{'='*70}")
-        print("📋 RESUMEN DEL ANÁLISIS")
-        print(f"{'='*70}\n")
+        logger.debug("📋 RESUMEN DEL ANÁLISIS")
         
-        print(f"Total conversaciones: {analisis['total_conversaciones']}")
-        print(f"Periodo: {analisis['periodo']}\n")
+        logger.debug("Total conversaciones: %s", analisis['total_conversaciones'])
+        logger.debug("Periodo: %s", analisis['periodo'])
         
-        print(f"🔄 Patrones repetitivos: {len(analisis['patrones_detectados'])}")
+        logger.debug("🔄 Patrones repetitivos: %s", len(analisis['patrones_detectados']))
         if analisis['patrones_detectados']:
             top3 = analisis['patrones_detectados'][:3]
             for i, patron in enumerate(top3, 1):
-                print(f"   {i}. '{patron['patron'][:40]}...' ({patron['frecuencia']} veces)")
+                logger.debug("%s. '%s...' (%s veces)", i, patron['patron'][:40], patron['frecuencia'])
         
-        print(f"\n⚠️ Mensajes baja confianza: {len(analisis['intenciones_bajas'])}")
-        print(f"❓ Mensajes desconocidos: {len(analisis['mensajes_desconocidos'])}")
-        print(f"❌ Posibles errores: {len(analisis['errores_clasificacion'])}")
+        logger.info("⚠️ Mensajes baja confianza: %s", len(analisis['intenciones_bajas']))
+        logger.debug("❓ Mensajes desconocidos: %s", len(analisis['mensajes_desconocidos']))
+        logger.info("❌ Posibles errores: %s", len(analisis['errores_clasificacion']))
         
         if analisis['intenciones_frecuentes']['mas_comun']:
             intencion, count = analisis['intenciones_frecuentes']['mas_comun']
-            print(f"\n🏆 Intención más común: {intencion} ({count} veces)")
+            logger.debug("🏆 Intención más común: %s (%s veces)", intencion, count)
         
-        print(f"\n{'='*70}\n")
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # APRENDIZAJE AUTOMÁTICO
@@ -363,9 +356,7 @@ class KairosLearner:
         Returns:
             Dict con resultado del aprendizaje
         """
-        print(f"\n{'='*70}")
-        print("🎓 APRENDIENDO DE PATRONES DETECTADOS")
-        print(f"{'='*70}\n")
+        logger.debug("🎓 APRENDIENDO DE PATRONES DETECTADOS")
         
         aprendidos = 0
         
@@ -396,7 +387,7 @@ class KairosLearner:
                     (patron['frecuencia'], patron['confianza_promedio'], existe[0]['id'])
                 )
                 
-                print(f"   🔄 Actualizado: '{patron['patron'][:40]}...'")
+                logger.debug("🔄 Actualizado: '%s...'", patron['patron'][:40])
                 
             else:
                 # Guardar nuevo patrón
@@ -423,16 +414,16 @@ class KairosLearner:
                 aprendidos += 1
                 self.patrones_nuevos += 1
                 
-                print(f"   ✅ Nuevo patrón: '{patron['patron'][:40]}...'")
+                logger.debug("✅ Nuevo patrón: '%s...'", patron['patron'][:40])
         
-        print(f"\n✅ {aprendidos} patrones nuevos aprendidos")
-        print(f"   Total acumulado: {self.patrones_nuevos}\n")
+        logger.debug("✅ %s patrones nuevos aprendidos", aprendidos)
+        logger.debug("Total acumulado: %s", self.patrones_nuevos)
         
         self.aprendizajes_realizados += aprendidos
         
         # Si hay suficientes patrones nuevos, sugerir re-entrenamiento
         if aprendidos >= 10 and self.auto_entrenamiento:
-            print("💡 Suficientes patrones nuevos. Iniciando re-entrenamiento...\n")
+            logger.debug("💡 Suficientes patrones nuevos. Iniciando re-entrenamiento...")
             return self.reentrenar_clasificador()
         
         return {
@@ -448,9 +439,7 @@ class KairosLearner:
         Returns:
             Dict con resultado del re-entrenamiento
         """
-        print(f"\n{'='*70}")
-        print("🔄 RE-ENTRENANDO CLASIFICADOR ML")
-        print(f"{'='*70}\n")
+        logger.debug("🔄 RE-ENTRENANDO CLASIFICADOR ML")
         
         try:
             # Obtener todos los patrones aprendidos
@@ -464,10 +453,10 @@ class KairosLearner:
             patrones = self.db.ejecutar_query(query)
             
             if not patrones or len(patrones) < 20:
-                print("⚠️ Muy pocos datos para re-entrenar (mínimo 20)\n")
+                logger.warning("⚠️ Muy pocos datos para re-entrenar (mínimo 20)")
                 return {'exito': False, 'razon': 'datos_insuficientes'}
             
-            print(f"📊 {len(patrones)} patrones para entrenamiento\n")
+            logger.debug("📊 %s patrones para entrenamiento", len(patrones))
             
             # Preparar datos
             textos = []
@@ -481,10 +470,10 @@ class KairosLearner:
                     textos.append(patron['patron'])
                     intenciones.append(patron['intencion_detectada'])
             
-            print(f"📝 Total ejemplos (ponderados): {len(textos)}\n")
+            logger.debug("📝 Total ejemplos (ponderados): %s", len(textos))
             
             # Re-entrenar
-            print("🧠 Entrenando modelo...\n")
+            logger.debug("🧠 Entrenando modelo...")
             metricas = self.classifier.entrenar(textos, intenciones)
             
             self.reentrenamientos += 1
@@ -492,14 +481,11 @@ class KairosLearner:
             # Guardar evento de re-entrenamiento
             self._registrar_reentrenamiento(metricas, len(patrones))
             
-            print(f"\n{'='*70}")
-            print("✅ RE-ENTRENAMIENTO COMPLETADO")
-            print(f"{'='*70}")
-            print(f"   Precisión: {metricas['precision']:.1%}")
-            print(f"   Ejemplos: {metricas['num_ejemplos']}")
-            print(f"   Intenciones: {metricas['num_intenciones']}")
-            print(f"   Vocabulario: {metricas['vocabulario']} palabras")
-            print(f"{'='*70}\n")
+            logger.debug("✅ RE-ENTRENAMIENTO COMPLETADO")
+            logger.debug("Precisión: %.1f%%", metricas['precision'] * 100)
+            logger.debug("Ejemplos: %s", metricas['num_ejemplos'])
+            logger.debug("Intenciones: %s", metricas['num_intenciones'])
+            logger.debug("Vocabulario: %s palabras", metricas['vocabulario'])
             
             return {
                 'exito': True,
@@ -508,7 +494,7 @@ class KairosLearner:
             }
             
         except Exception as e:
-            print(f"❌ Error en re-entrenamiento: {e}\n")
+            logger.error("❌ Error en re-entrenamiento: %s", e)
             return {'exito': False, 'error': str(e)}
     
     def _registrar_reentrenamiento(self, metricas: Dict, patrones_usados: int):
@@ -546,9 +532,7 @@ class KairosLearner:
         Returns:
             Dict con análisis de conocimientos
         """
-        print(f"\n{'='*70}")
-        print(f"🤖 ANALIZANDO CONOCIMIENTOS DE GPT ({dias} días)")
-        print(f"{'='*70}\n")
+        logger.debug("🤖 ANALIZANDO CONOCIMIENTOS DE GPT (%s días)", dias)
         
         fecha_inicio = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
         
@@ -562,10 +546,10 @@ class KairosLearner:
         conocimientos = self.db.ejecutar_query(query, (fecha_inicio,))
         
         if not conocimientos:
-            print("⚠️ No hay conocimientos nuevos de GPT\n")
+            logger.warning("⚠️ No hay conocimientos nuevos de GPT")
             return {'total': 0}
         
-        print(f"✅ {len(conocimientos)} conocimientos encontrados\n")
+        logger.debug("✅ %s conocimientos encontrados", len(conocimientos))
         
         # Análisis
         analisis = {
@@ -577,17 +561,16 @@ class KairosLearner:
         }
         
         # Mostrar resumen
-        print("📊 RESUMEN:")
-        print(f"   Total: {analisis['total_conocimientos']}")
-        print(f"   De GPT: {analisis['por_origen'].get('gpt', 0)}")
-        print(f"   Confianza promedio: {analisis['confianza_promedio']:.1%}")
+        logger.debug("📊 RESUMEN:")
+        logger.debug("Total: %s", analisis['total_conocimientos'])
+        logger.debug("De GPT: %s", analisis['por_origen'].get('gpt', 0))
+        logger.debug("Confianza promedio: %.1f%%", analisis['confianza_promedio'] * 100)
         
         if analisis['mas_usados']:
-            print(f"\n🏆 Top 5 más usados:")
+            logger.debug("🏆 Top 5 más usados:")
             for i, conocimiento in enumerate(analisis['mas_usados'], 1):
-                print(f"   {i}. {conocimiento['condicion']} ({conocimiento['veces_usado']} veces)")
+                logger.debug("%s. %s (%s veces)", i, conocimiento['condicion'], conocimiento['veces_usado'])
         
-        print()
         
         return analisis
     
@@ -627,9 +610,7 @@ class KairosLearner:
         Returns:
             Dict con sugerencias
         """
-        print(f"\n{'='*70}")
-        print("💡 ANALIZANDO PROMPTS A GPT")
-        print(f"{'='*70}\n")
+        logger.debug("💡 ANALIZANDO PROMPTS A GPT")
         
         # Obtener consultas recientes a IA
         query = """
@@ -641,10 +622,10 @@ class KairosLearner:
         consultas = self.db.ejecutar_query(query)
         
         if not consultas:
-            print("⚠️ No hay consultas a IA para analizar\n")
+            logger.warning("⚠️ No hay consultas a IA para analizar")
             return {'total': 0}
         
-        print(f"✅ {len(consultas)} consultas analizadas\n")
+        logger.debug("✅ %s consultas analizadas", len(consultas))
         
         # Análisis
         sugerencias = {
@@ -680,18 +661,17 @@ class KairosLearner:
             })
         
         # Mostrar
-        print("📊 ESTADÍSTICAS:")
-        print(f"   Exitosas: {sugerencias['exitosas']}/{sugerencias['total_consultas']}")
-        print(f"   Tiempo promedio: {sugerencias['tiempo_promedio']:.0f}ms")
-        print(f"   Tokens promedio: {sugerencias['tokens_promedio']:.0f}")
-        print(f"   Costo total: S/. {sugerencias['costo_total']:.4f}")
+        logger.debug("📊 ESTADÍSTICAS:")
+        logger.debug("Exitosas: %s/%s", sugerencias['exitosas'], sugerencias['total_consultas'])
+        logger.debug("Tiempo promedio: %.0fms", sugerencias['tiempo_promedio'])
+        logger.debug("Tokens promedio: %.0f", sugerencias['tokens_promedio'])
+        logger.debug("Costo total: S/. %.4f", sugerencias['costo_total'])
         
         if sugerencias['mejoras_sugeridas']:
-            print(f"\n💡 SUGERENCIAS DE MEJORA:")
+            logger.debug("💡 SUGERENCIAS DE MEJORA:")
             for i, mejora in enumerate(sugerencias['mejoras_sugeridas'], 1):
-                print(f"   {i}. [{mejora['prioridad'].upper()}] {mejora['descripcion']}")
+                logger.debug("%s. [%s] %s", i, mejora['prioridad'].upper(), mejora['descripcion'])
         
-        print()
         
         return sugerencias
     
@@ -729,9 +709,7 @@ class KairosLearner:
         Returns:
             Dict con resultado completo
         """
-        print("\n" + "="*70)
-        print("🎓 INICIANDO CICLO COMPLETO DE APRENDIZAJE")
-        print("="*70)
+        logger.debug("🎓 INICIANDO CICLO COMPLETO DE APRENDIZAJE")
         
         inicio = datetime.now()
         
@@ -746,7 +724,7 @@ class KairosLearner:
                 analisis_conv['patrones_detectados']
             )
         else:
-            print("ℹ️ No hay patrones detectados para aprender\n")
+            logger.debug("ℹ️ No hay patrones detectados para aprender")
         
         # 3. Analizar conocimientos de GPT
         analisis_gpt = self.analizar_conocimientos_gpt(dias)
@@ -756,7 +734,7 @@ class KairosLearner:
         try:
             sugerencias = self.sugerir_mejoras_prompts()
         except Exception as e:
-            print(f"⚠️ No se pudieron analizar prompts: {e}\n")
+            logger.warning("⚠️ No se pudieron analizar prompts: %s", e)
         
         # Tiempo total
         duracion = (datetime.now() - inicio).total_seconds()
@@ -775,15 +753,12 @@ class KairosLearner:
             }
         }
         
-        print(f"\n{'='*70}")
-        print("✅ CICLO DE APRENDIZAJE COMPLETADO")
-        print(f"{'='*70}")
-        print(f"   Duración: {duracion:.1f}s")
-        print(f"   Conversaciones: {resultado['conversaciones_analizadas']}")
-        print(f"   Patrones aprendidos: {resultado['patrones_aprendidos']}")
-        print(f"   Conocimientos GPT: {resultado['conocimientos_gpt']}")
-        print(f"   Sugerencias: {resultado['sugerencias_prompts']}")
-        print(f"{'='*70}\n")
+        logger.debug("✅ CICLO DE APRENDIZAJE COMPLETADO")
+        logger.debug("Duración: %.1fs", duracion)
+        logger.debug("Conversaciones: %s", resultado['conversaciones_analizadas'])
+        logger.debug("Patrones aprendidos: %s", resultado['patrones_aprendidos'])
+        logger.debug("Conocimientos GPT: %s", resultado['conocimientos_gpt'])
+        logger.debug("Sugerencias: %s", resultado['sugerencias_prompts'])
         
         return resultado
     
@@ -13,6 +13,9 @@ sys.path.insert(0, BASE_DIR)
 sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
 
 from backend.database.db_manager import DatabaseManager
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class LearningManager:
     """
@@ -29,7 +32,7 @@ class LearningManager:
         """Inicializar learning manager"""
         
         self.db = DatabaseManager()
-        print("📚 Learning Manager inicializado")
+        logger.info("📚 Learning Manager inicializado")
     
     def registrar_conversacion(self, 
                                paciente_nombre: str,
@@ -49,7 +52,7 @@ class LearningManager:
                 query,
                 (paciente_nombre, len(mensajes), exitosa, calificacion)
             )
-            print(f"   📝 Conversación registrada para aprendizaje")
+            logger.debug("📝 Conversación registrada para aprendizaje")
         except:
             pass
     
@@ -0,0 +1,422 @@
+"""
+Cliente LLM compartido de Kairos
+✅ Una sola sesión HTTP con keep-alive y pool de conexiones
+✅ Concurrencia limitada (semáforo)
+✅ Reintentos con backoff exponencial en 429/5xx
+✅ Deadline por llamada (incluye reintentos)
+✅ Modo streaming (fragmentos de texto a medida que llegan)
+✅ Transporte intercambiable (OpenAI real o stub local)
+✅ Tokens y costo reales de cada respuesta ('usage') en el consumo de IA
+✅ Topes de presupuesto y llamadas por minuto (gobernador de IA) antes de cada llamada
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.metricas import tramo, contar_tokens, observar_etapa, etapa_actual
+from backend.core.consumo_ia import obtener_consumo_ia
+from backend.core.gobernador_ia import obtener_gobernador_ia
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Códigos que vale la pena reintentar
+CODIGOS_REINTENTO = {429, 500, 502, 503, 504}
+
+
+class TransporteHTTP:
+    """Transporte por defecto: requests.Session reutilizable"""
+
+    def __init__(self, base_url: str = None, conexiones: int = None):
+        self.base_url = (base_url or Config.LLM_BASE_URL).rstrip('/')
+
+        conexiones = conexiones or Config.LLM_POOL_CONEXIONES
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=conexiones, max_retries=0)
+
+        self.sesion = requests.Session()
+        self.sesion.mount('https://', adaptador)
+        self.sesion.mount('http://', adaptador)
+
+    def enviar(self, ruta: str, headers: Dict, payload: Dict,
+               timeout: float) -> Tuple[int, Optional[Dict], Dict]:
+        """
+        POST JSON
+
+        Returns:
+            (status_code, json o None, headers)
+        """
+        response = self.sesion.post(
+            f"{self.base_url}{ruta}",
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        )
+
+        try:
+            datos = response.json()
+        except ValueError:
+            datos = None
+
+        return response.status_code, datos, response.headers
+
+    def enviar_stream(self, ruta: str, headers: Dict, payload: Dict,
+                      timeout: float) -> Tuple[int, object, Dict]:
+        """
+        POST con respuesta en streaming (SSE)
+
+        Returns:
+            (status_code, iterador de líneas si 200 / json de error si no, headers)
+        """
+        response = self.sesion.post(
+            f"{self.base_url}{ruta}",
+            headers=headers,
+            json=payload,
+            timeout=timeout,
+            stream=True
+        )
+
+        if response.status_code != 200:
+            try:
+                datos = response.json()
+            except ValueError:
+                datos = None
+            response.close()
+            return response.status_code, datos, response.headers
+
+        # SSE siempre es UTF-8 (requests asume latin-1 si no hay charset)
+        response.encoding = 'utf-8'
+
+        def lineas():
+            try:
+                for linea in response.iter_lines(decode_unicode=True):
+                    yield linea
+            finally:
+                response.close()
+
+        return 200, lineas(), response.headers
+
+    def cerrar(self):
+        self.sesion.close()
+
+
+class ClienteLLM:
+    """
+    Cliente de chat completions para todos los módulos
+
+    Uso:
+        data = obtener_cliente_llm().chat(api_key, modelo, mensajes, max_tokens=150)
+        if data:
+            texto = data['choices'][0]['message']['content']
+    """
+
+    def __init__(self, transporte=None, max_concurrentes: int = None,
+                 reintentos: int = None, backoff_base: float = None, gobernador=None):
+        """
+        Inicializar cliente
+
+        Args:
+            transporte: Objeto con enviar(ruta, headers, payload, timeout)
+            max_concurrentes: Llamadas simultáneas permitidas
+            reintentos: Reintentos ante 429/5xx/errores de red
+            backoff_base: Espera inicial entre reintentos (segundos)
+            gobernador: GobernadorIA (por defecto el del proceso)
+        """
+        self.transporte = transporte or TransporteHTTP()
+        self.max_concurrentes = max_concurrentes or Config.LLM_MAX_CONCURRENTES
+        self.reintentos = reintentos if reintentos is not None else Config.LLM_REINTENTOS
+        self.backoff_base = backoff_base if backoff_base is not None else Config.LLM_BACKOFF_BASE
+        self.gobernador = gobernador or obtener_gobernador_ia()
+
+        self._semaforo = threading.BoundedSemaphore(self.max_concurrentes)
+
+        # Métricas
+        self._lock = threading.Lock()
+        self.llamadas = 0
+        self.fallidas = 0
+        self.reintentos_hechos = 0
+
+    def chat(self, api_key: str, modelo: str, mensajes: List[Dict],
+             temperatura: float = 0.7, max_tokens: int = 150,
+             timeout: float = 20, etapa: str = None, sesion_id: str = None,
+             **extra) -> Optional[Dict]:
+        """
+        Llamar a /chat/completions
+
+        Args:
+            api_key: API key de OpenAI
+            modelo: Modelo a usar
+            mensajes: Lista de mensajes {role, content}
+            temperatura: Temperatura
+            max_tokens: Máximo de tokens de salida
+            timeout: Deadline total de la llamada en segundos (con reintentos)
+            etapa: Etapa a la que se imputa el consumo (por defecto el tramo abierto)
+            sesion_id: Sesión a la que se imputa el consumo
+            **extra: Campos adicionales del payload
+
+        Returns:
+            Respuesta JSON de la API o None si falló
+        """
+        deadline = time.monotonic() + timeout
+
+        headers = {
+            'Authorization': f"Bearer {api_key}",
+            'Content-Type': 'application/json'
+        }
+
+        payload = {
+            'model': modelo,
+            'messages': mensajes,
+            'temperature': temperatura,
+            'max_tokens': max_tokens
+        }
+        payload.update(extra)
+
+        if not self._semaforo.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            logger.warning("⚠️ LLM: sin cupo (%s llamadas en curso)", self.max_concurrentes)
+            self._contar(fallida=True)
+            return None
+
+        # Con el cupo ya tomado: el gobernador solo cuenta llamadas que se hacen
+        if not self._autorizar(deadline):
+            self._semaforo.release()
+            return None
+
+        etapa = etapa or etapa_actual()
+        inicio = time.perf_counter()
+
+        try:
+            with tramo('gpt.llamada') as atributos:
+                datos = self._enviar_con_reintentos('/chat/completions', headers, payload, deadline)
+                if datos:
+                    contar_tokens(modelo, datos.get('usage'), atributos)
+                    obtener_consumo_ia().registrar(modelo, datos.get('usage'), etapa, sesion_id,
+                                                   segundos=time.perf_counter() - inicio)
+                return datos
+        finally:
+            self._semaforo.release()
+
+    def chat_stream(self, api_key: str, modelo: str, mensajes: List[Dict],
+                    temperatura: float = 0.7, max_tokens: int = 150,
+                    timeout: float = 20, etapa: str = None, sesion_id: str = None,
+                    **extra) -> Iterator[str]:
+        """
+        Llamar a /chat/completions con stream=True
+
+        Solo se reintenta antes del primer fragmento. Si la llamada falla,
+        el generador termina sin producir nada (el llamador usa su fallback).
+        Un corte a mitad del stream o el deadline vencido terminan el
+        generador con lo recibido hasta ese momento.
+
+        Yields:
+            Fragmentos de texto de la respuesta
+        """
+        deadline = time.monotonic() + timeout
+
+        headers = {
+            'Authorization': f"Bearer {api_key}",
+            'Content-Type': 'application/json'
+        }
+
+        payload = {
+            'model': modelo,
+            'messages': mensajes,
+            'temperature': temperatura,
+            'max_tokens': max_tokens,
+            'stream': True,
+            'stream_options': {'include_usage': True}  # último evento trae 'usage'
+        }
+        payload.update(extra)
+
+        if not self._semaforo.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            logger.warning("⚠️ LLM: sin cupo (%s llamadas en curso)", self.max_concurrentes)
+            self._contar(fallida=True)
+            return
+
+        if not self._autorizar(deadline):
+            self._semaforo.release()
+            return
+
+        etapa = etapa or etapa_actual()
+        inicio = time.perf_counter()
+        primer_fragmento = True
+        uso = None
+        lineas = None
+        
+        try:
+            lineas = self._enviar_con_reintentos('/chat/completions', headers, payload,
+                                                 deadline, stream=True)
+            if lineas is None:
+                return
+
+            for linea in lineas:
+                if time.monotonic() > deadline:
+                    logger.warning("⏱️ LLM: deadline agotado durante el stream")
+                    self._contar_corte()
+                    break
+
+                if not linea or not linea.startswith('data:'):
+                    continue
+
+                dato = linea[5:].strip()
+                if dato == '[DONE]':
+                    break
+
+                try:
+                    evento = json.loads(dato)
+                except ValueError:
+                    continue
+
+                if evento.get('usage'):
+                    uso = evento['usage']
+
+                opciones = evento.get('choices') or []
+                if not opciones:
+                    continue
+
+                fragmento = (opciones[0].get('delta') or {}).get('content')
+                if fragmento:
+                    if primer_fragmento:
+                        primer_fragmento = False
+                        observar_etapa('gpt.primer_fragmento', time.perf_counter() - inicio)
+                    yield fragmento
+
+        except (requests.RequestException, ProtocolError) as e:
+            logger.warning("⚠️ LLM: stream interrumpido (%s)", type(e).__name__)
+            self._contar_corte()
+
+        finally:
+            if lineas is not None and hasattr(lineas, 'close'):
+                lineas.close()   # cierra la respuesta HTTP si se cortó antes del final
+            self._semaforo.release()
+            observar_etapa('gpt.stream', time.perf_counter() - inicio)
+            if uso:
+                contar_tokens(modelo, uso)
+                obtener_consumo_ia().registrar(modelo, uso, etapa, sesion_id,
+                                               segundos=time.perf_counter() - inicio)
+
+    def _enviar_con_reintentos(self, ruta: str, headers: Dict, payload: Dict,
+                               deadline: float, stream: bool = False):
+        """Enviar respetando deadline y backoff exponencial con jitter"""
+        intento = 0
+        enviar = self.transporte.enviar_stream if stream else self.transporte.enviar
+
+        while True:
+            restante = deadline - time.monotonic()
+            if restante <= 0:
+                logger.warning("⏱️ LLM: deadline agotado")
+                self._contar(fallida=True)
+                return None
+
+            espera_sugerida = None
+
+            try:
+                status, datos, headers_resp = enviar(ruta, headers, payload, restante)
+
+                if status == 200 and datos is not None:
+                    self._contar()
+                    return datos
+
+                if status not in CODIGOS_REINTENTO:
+                    logger.error("❌ LLM: error %s: %s", status, self._mensaje_error(datos))
+                    self._contar(fallida=True)
+                    return None
+
+                logger.warning("⚠️ LLM: %s, reintentando...", status)
+                espera_sugerida = self._leer_retry_after(headers_resp)
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning("⚠️ LLM: error de red (%s), reintentando...", type(e).__name__)
+
+            if intento >= self.reintentos:
+                self._contar(fallida=True)
+                return None
+
+            espera = espera_sugerida if espera_sugerida is not None else self._backoff(intento)
+
+            # No dormir más allá del deadline
+            if time.monotonic() + espera >= deadline:
+                logger.warning("⏱️ LLM: sin tiempo para reintentar")
+                self._contar(fallida=True)
+                return None
+
+            time.sleep(espera)
+            intento += 1
+
+            with self._lock:
+                self.reintentos_hechos += 1
+
+    def _autorizar(self, deadline: float) -> bool:
+        """Topes diario/mensual y cupo por minuto (espera el cupo hasta el deadline)"""
+        permitido, razon = self.gobernador.autorizar(timeout=max(0.0, deadline - time.monotonic()))
+        if not permitido:
+            logger.warning("⚠️ LLM: llamada rechazada (%s)", razon)
+            self._contar(fallida=True)
+        return permitido
+
+    def _backoff(self, intento: int) -> float:
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, self.backoff_base * (2 ** intento))
+
+    def _leer_retry_after(self, headers: Dict) -> Optional[float]:
+        try:
+            valor = headers.get('Retry-After') if headers else None
+            return float(valor) if valor is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _mensaje_error(self, datos: Optional[Dict]) -> str:
+        if isinstance(datos, dict) and isinstance(datos.get('error'), dict):
+            return datos['error'].get('message', '')
+        return ''
+
+    def _contar(self, fallida: bool = False):
+        with self._lock:
+            self.llamadas += 1
+            if fallida:
+                self.fallidas += 1
+
+    def _contar_corte(self):
+        """Stream ya contado como llamada que no llegó al final"""
+        with self._lock:
+            self.fallidas += 1
+
+    def obtener_estadisticas(self) -> Dict:
+        """Métricas del cliente"""
+        with self._lock:
+            return {
+                'llamadas': self.llamadas,
+                'fallidas': self.fallidas,
+                'reintentos': self.reintentos_hechos,
+                'max_concurrentes': self.max_concurrentes
+            }
+
+
+# Singleton
+_cliente_llm = None
+_cliente_lock = threading.Lock()
+
+def obtener_cliente_llm() -> ClienteLLM:
+    """Obtener cliente LLM compartido del proceso"""
+    global _cliente_llm
+    if _cliente_llm is None:
+        with _cliente_lock:
+            if _cliente_llm is None:
+                _cliente_llm = ClienteLLM()
+    return _cliente_llm
+
+def configurar_cliente_llm(cliente: ClienteLLM):
+    """Reemplazar el cliente compartido (tests, benchmarks con stub)"""
+    global _cliente_llm
+    with _cliente_lock:
+        _cliente_llm = cliente
@@ -0,0 +1,145 @@
+"""
+Logging de Kairos
+✅ Niveles (DEBUG en desarrollo, WARNING en producción)
+✅ Formato diferido: logger.debug("Contexto: %s", mensajes) no formatea si el nivel está apagado
+✅ Handler con cola: el hilo de la petición no escribe en stdout/archivo
+✅ Cola acotada: si se llena se descartan registros en lugar de bloquear
+✅ Formato texto o JSON (una línea por evento, con id de traza)
+"""
+
+import sys
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+
+RAIZ = 'kairos'
+
+
+class _HandlerCola(QueueHandler):
+    """QueueHandler que nunca bloquea: con la cola llena descarta el registro"""
+
+    def __init__(self, cola: queue.Queue):
+        super().__init__(cola)
+        self.descartados = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class _FiltroTraza(logging.Filter):
+    """Agregar el id de la traza de métricas en curso (si hay)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        from backend.core.metricas import traza_actual
+        traza = traza_actual()
+        record.traza = traza.id if traza is not None else '-'
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'fecha': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'modulo': record.name,
+            'traza': getattr(record, 'traza', '-'),
+            'mensaje': record.getMessage()
+        }
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+_configurado = False
+_config_lock = threading.Lock()
+_listener = None
+_handler = None
+
+
+def configurar_logging(nivel: str = None, formato: str = None, archivo: str = None):
+    """
+    Configurar el logger raíz 'kairos' (una vez por proceso)
+
+    Args:
+        nivel: DEBUG, INFO, WARNING, ERROR
+        formato: 'texto' o 'json'
+        archivo: Ruta de archivo rotativo ('' = solo consola)
+    """
+    global _configurado, _listener, _handler
+
+    with _config_lock:
+        if _configurado:
+            return
+
+        nivel = (nivel or Config.LOG_NIVEL).upper()
+        formato = formato or Config.LOG_FORMATO
+        archivo = archivo if archivo is not None else Config.LOG_ARCHIVO
+
+        if formato == 'json':
+            formateador = FormatoJSON()
+        else:
+            formateador = logging.Formatter('%(asctime)s %(levelname)-7s [%(traza)s] %(name)s: %(message)s',
+                                            '%H:%M:%S')
+
+        destinos = [logging.StreamHandler(sys.stdout)]
+        if archivo:
+            os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+            destinos.append(RotatingFileHandler(archivo, maxBytes=10 * 1024 * 1024,
+                                                backupCount=5, encoding='utf-8'))
+        for destino in destinos:
+            destino.setFormatter(formateador)
+
+        cola = queue.Queue(maxsize=Config.LOG_COLA_MAX)
+        _handler = _HandlerCola(cola)
+        _handler.addFilter(_FiltroTraza())
+
+        raiz = logging.getLogger(RAIZ)
+        raiz.setLevel(getattr(logging, nivel, logging.WARNING))
+        raiz.addHandler(_handler)
+        raiz.propagate = False
+
+        _listener = QueueListener(cola, *destinos, respect_handler_level=True)
+        _listener.start()
+        atexit.register(detener_logging)
+
+        _configurado = True
+
+
+def detener_logging():
+    """Vaciar la cola y detener el hilo escritor (al apagar)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def obtener_logger(nombre: str) -> logging.Logger:
+    """
+    Logger hijo de 'kairos'
+
+    Uso:
+        logger = obtener_logger(__name__)
+        logger.info("✅ Catálogo cargado: %d productos", total)
+    """
+    configurar_logging()
+    nombre = nombre.split('.')[-1] if nombre != '__main__' else 'main'
+    return logging.getLogger(f"{RAIZ}.{nombre}")
+
+
+def obtener_estadisticas() -> dict:
+    return {
+        'nivel': logging.getLevelName(logging.getLogger(RAIZ).level),
+        'descartados': _handler.descartados if _handler else 0
+    }
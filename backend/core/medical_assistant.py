@@ -9,7 +9,6 @@ import os
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 import json
-import requests
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
@@ -18,6 +17,10 @@ sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
 from backend.core.classifier import IntentClassifier
 from backend.database.productos_manager import ProductosManager
 from backend.core.ia_config_manager import IAConfigManager
+from backend.core.llm_client import obtener_cliente_llm
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class MedicalAssistant:
     """
@@ -39,6 +42,7 @@ class MedicalAssistant:
         self.classifier = IntentClassifier()
         self.productos = ProductosManager()
         self.ia_config = IAConfigManager()
+        self.llm = obtener_cliente_llm()
         
         # Modo de preguntas
         self.modo_preguntas = modo_preguntas
@@ -78,15 +82,15 @@ class MedicalAssistant:
         self.consulta_iniciada = False
         self.diagnostico_completo = False
         
-        print("🤖 Kairos - Doctor de Cabecera Virtual")
-        print(f"   Creado por: Nilson Cayao")
-        print(f"   Modo: {modo_preguntas.upper()}")
+        logger.debug("🤖 Kairos - Doctor de Cabecera Virtual")
+        logger.debug("Creado por: Nilson Cayao")
+        logger.debug("Modo: %s", modo_preguntas.upper())
         
         if modo_preguntas == 'dinamico' and self.ia_config.esta_activo():
-            print(f"   IA: ✅ Activa")
+            logger.debug("IA: ✅ Activa")
         else:
             if modo_preguntas == 'dinamico':
-                print(f"   IA: ⚠️ No disponible, modo estático")
+                logger.warning("IA: ⚠️ No disponible, modo estático")
                 self.modo_preguntas = 'estatico'
     
     def procesar_mensaje(self, mensaje: str, usuario_info: Dict = None) -> Dict:
@@ -110,14 +114,14 @@ class MedicalAssistant:
             if self.usuario_nombre:
                 self.usuario_primer_nombre = self.usuario_nombre.split()[0]
             
-            print(f"👤 Paciente: {self.usuario_nombre} (DNI: {self.usuario_dni})")
+            logger.debug("👤 Paciente: %s (DNI: %s)", self.usuario_nombre, self.usuario_dni)
         
         self.interacciones_totales += 1
         
         # Clasificar intención
         intencion, confianza, _ = self.classifier.predecir(mensaje)
         
-        print(f"💭 Mensaje {self.interacciones_totales}: {intencion} ({confianza:.0%})")
+        logger.debug("💭 Mensaje %s: %s (%.0f%%)", self.interacciones_totales, intencion, confianza * 100)
         
         # Guardar en contexto
         self.contexto['preguntas_realizadas'].append(mensaje)
@@ -351,37 +355,29 @@ SOLO LA PREGUNTA:"""
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],
-                    'messages': [
-                        {'role': 'system', 'content': 'Eres médico empático.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.7,
-                    'max_tokens': 40
-                },
-                timeout=10
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': 'Eres médico empático.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.7,
+                max_tokens=40,
+                timeout=10,
+                etapa='gpt.asistente'
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 pregunta = data['choices'][0]['message']['content'].strip()
                 pregunta = pregunta.replace('"', '').replace("'", '')
                 
-                self.ia_config.incrementar_consulta(0.001)
-                
                 return pregunta
             else:
                 return self._generar_pregunta_estatica()
                 
         except Exception as e:
-            print(f"   ⚠️ GPT error: {e}")
+            logger.warning("⚠️ GPT error: %s", e)
             return self._generar_pregunta_estatica()
     
     def _generar_pregunta_estatica(self) -> str:
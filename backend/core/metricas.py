@@ -0,0 +1,357 @@
+"""
+Métricas y trazas de latencia de Kairos
+✅ Tramos (spans) por etapa: BD, GPT, catálogo, diagnóstico
+✅ Traza por petición en contexto (contextvars): sobrevive al ejecutor de hilos
+✅ Histogramas de duración con buckets fijos (p50 / p95 / p99)
+✅ Contadores de tokens y aciertos de caché
+✅ Exportación en formato de texto Prometheus (/api/metrics)
+"""
+
+import sys
+import os
+import time
+import uuid
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Límites de los buckets en segundos (de una query a un diagnóstico completo)
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0)
+
+DESCRIPCIONES = {
+    'kairos_etapa_segundos': 'Duración de cada etapa del pipeline',
+    'kairos_peticion_segundos': 'Duración de cada petición HTTP',
+    'kairos_tokens_total': 'Tokens consumidos en llamadas GPT',
+    'kairos_cache_total': 'Consultas a cachés por resultado',
+    'kairos_errores_total': 'Etapas terminadas con excepción',
+    'kairos_sesiones_descartadas_total': 'Sesiones quitadas de memoria por TTL o máximo (LRU)',
+    'kairos_sesiones_estado_bytes': 'Tamaño del estado serializado de las sesiones activas',
+    'kairos_prompt_tokens_total': 'Tokens de entrada estimados al armar cada prompt',
+    'kairos_prompt_plegados_total': 'Turnos de conversación plegados en el resumen clínico',
+    'kairos_costo_usd_total': 'Costo de las llamadas GPT según su usage (USD)',
+    'kairos_ia_rechazos_total': 'Llamadas GPT rechazadas por el gobernador (tope o ritmo)',
+    'kairos_ia_holgura': 'Consultas y presupuesto (soles) restantes antes de cada tope'
+}
+
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos"""
+
+    __slots__ = ('limites', 'conteos', 'suma', 'cuenta')
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_SEGUNDOS):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)   # último = +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor: float):
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+    def percentil(self, p: float) -> float:
+        """Estimación por interpolación lineal dentro del bucket"""
+        if not self.cuenta:
+            return 0.0
+
+        objetivo = p * self.cuenta
+        acumulado = 0
+        for i, conteo in enumerate(self.conteos):
+            if acumulado + conteo >= objetivo and conteo:
+                inferior = self.limites[i - 1] if i > 0 else 0.0
+                if i >= len(self.limites):
+                    return inferior
+                return inferior + (self.limites[i] - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+
+        return self.limites[-1]
+
+
+class RegistroMetricas:
+    """Histogramas, contadores y medidores del proceso"""
+
+    def __init__(self):
+        self._histogramas: Dict[Tuple[str, tuple], Histograma] = {}
+        self._contadores: Dict[Tuple[str, tuple], float] = {}
+        self._medidores: Dict[Tuple[str, tuple], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clave(nombre: str, etiquetas: Dict) -> Tuple[str, tuple]:
+        return nombre, tuple(sorted(etiquetas.items()))
+
+    def observar(self, nombre: str, valor: float, **etiquetas):
+        clave = self._clave(nombre, etiquetas)
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma()
+            histograma.observar(valor)
+
+    def contar(self, nombre: str, cantidad: float = 1, **etiquetas):
+        clave = self._clave(nombre, etiquetas)
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def fijar(self, nombre: str, valor: float, **etiquetas):
+        """Medidor (valor instantáneo, p. ej. conexiones en uso)"""
+        with self._lock:
+            self._medidores[self._clave(nombre, etiquetas)] = valor
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+            self._medidores.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # EXPORTACIÓN
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener_resumen(self) -> Dict:
+        """Percentiles por histograma (para /api/health y logs)"""
+        with self._lock:
+            resumen = {}
+            for (nombre, etiquetas), h in sorted(self._histogramas.items()):
+                clave = ','.join(str(v) for _, v in etiquetas) or nombre
+                resumen[clave] = {
+                    'cuenta': h.cuenta,
+                    'p50': round(h.percentil(0.50), 4),
+                    'p95': round(h.percentil(0.95), 4),
+                    'p99': round(h.percentil(0.99), 4),
+                    'promedio': round(h.suma / h.cuenta, 4) if h.cuenta else 0.0
+                }
+            return resumen
+
+    def exportar_prometheus(self) -> str:
+        """Formato de exposición de texto de Prometheus (0.0.4)"""
+        lineas: List[str] = []
+
+        with self._lock:
+            histogramas = sorted(self._histogramas.items())
+            contadores = sorted(self._contadores.items())
+            medidores = sorted(self._medidores.items())
+
+            nombre_actual = None
+            for (nombre, etiquetas), h in histogramas:
+                if nombre != nombre_actual:
+                    self._cabecera(lineas, nombre, 'histogram')
+                    nombre_actual = nombre
+
+                acumulado = 0
+                for limite, conteo in zip(h.limites + (float('inf'),), h.conteos):
+                    acumulado += conteo
+                    le = '+Inf' if limite == float('inf') else repr(limite)
+                    lineas.append(f"{nombre}_bucket{_etiquetas(etiquetas + (('le', le),))} {acumulado}")
+                lineas.append(f"{nombre}_sum{_etiquetas(etiquetas)} {h.suma:.6f}")
+                lineas.append(f"{nombre}_count{_etiquetas(etiquetas)} {h.cuenta}")
+
+        for tipo, valores in (('counter', contadores), ('gauge', medidores)):
+            nombre_actual = None
+            for (nombre, etiquetas), valor in valores:
+                if nombre != nombre_actual:
+                    self._cabecera(lineas, nombre, tipo)
+                    nombre_actual = nombre
+                lineas.append(f"{nombre}{_etiquetas(etiquetas)} {_numero(valor)}")
+
+        return '\n'.join(lineas) + '\n'
+
+    @staticmethod
+    def _cabecera(lineas: List[str], nombre: str, tipo: str):
+        if nombre in DESCRIPCIONES:
+            lineas.append(f"# HELP {nombre} {DESCRIPCIONES[nombre]}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+
+
+def _etiquetas(etiquetas: tuple) -> str:
+    if not etiquetas:
+        return ''
+    partes = []
+    for clave, valor in etiquetas:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else f"{valor:.6f}"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# TRAZAS (por petición)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class Traza:
+    """Tramos de una petición (se comparte entre hilos del ejecutor)"""
+
+    def __init__(self, nombre: str, **atributos):
+        self.id = uuid.uuid4().hex[:12]
+        self.nombre = nombre
+        self.atributos = atributos
+        self.inicio = time.perf_counter()
+        self.duracion = None
+        self.tramos: List[Tuple[str, float, Dict]] = []
+
+    def resumen(self) -> Dict:
+        """Tiempo total por etapa (una etapa puede repetirse)"""
+        etapas: Dict[str, Dict] = {}
+        for nombre, duracion, atributos in self.tramos:
+            etapa = etapas.setdefault(nombre, {'veces': 0, 'segundos': 0.0})
+            etapa['veces'] += 1
+            etapa['segundos'] += duracion
+            for clave in ('tokens_entrada', 'tokens_salida'):
+                if clave in atributos:
+                    etapa[clave] = etapa.get(clave, 0) + atributos[clave]
+            if 'cache' in atributos:
+                etapa['aciertos' if atributos['cache'] else 'fallos'] = \
+                    etapa.get('aciertos' if atributos['cache'] else 'fallos', 0) + 1
+
+        return {
+            'traza': self.id,
+            'nombre': self.nombre,
+            **self.atributos,
+            'segundos': round(self.duracion if self.duracion is not None
+                              else time.perf_counter() - self.inicio, 4),
+            'etapas': {k: dict(v, segundos=round(v['segundos'], 4)) for k, v in etapas.items()}
+        }
+
+
+_traza_actual = contextvars.ContextVar('kairos_traza', default=None)
+_etapa_actual = contextvars.ContextVar('kairos_etapa', default=None)
+
+registro = RegistroMetricas()
+
+
+def traza_actual() -> Optional[Traza]:
+    return _traza_actual.get()
+
+
+def etapa_actual() -> Optional[str]:
+    """Tramo más interno abierto en este contexto (p. ej. 'gpt.diagnostico')"""
+    return _etapa_actual.get()
+
+
+def iniciar_traza(nombre: str, **atributos) -> contextvars.Token:
+    """Abrir traza para el contexto actual (devolver el token a terminar_traza)"""
+    return _traza_actual.set(Traza(nombre, **atributos))
+
+
+def terminar_traza(token: contextvars.Token, finalizar: bool = True) -> Optional[Traza]:
+    """
+    Quitar la traza del contexto actual y cerrarla
+
+    Args:
+        finalizar: False si sigue abierta en otro contexto (respuesta en streaming);
+            se cierra después con finalizar_traza
+    """
+    traza = _traza_actual.get()
+    _traza_actual.reset(token)
+
+    if traza is None or not finalizar:
+        return traza
+
+    return finalizar_traza(traza)
+
+
+def finalizar_traza(traza: Traza) -> Traza:
+    """Fijar la duración; la registra (nivel INFO) si METRICAS_LOG_SESION está activo"""
+    traza.duracion = time.perf_counter() - traza.inicio
+
+    if Config.METRICAS_LOG_SESION and traza.tramos:
+        resumen = traza.resumen()
+        etapas = ', '.join(f"{k}={v['segundos']:.3f}s" for k, v in resumen['etapas'].items())
+        sesion = traza.atributos.get('sesion_id') or '-'
+        logger.info("📊 Traza %s [%s] %.3fs: %s", traza.nombre, sesion, resumen['segundos'], etapas)
+
+    return traza
+
+
+@contextmanager
+def tramo(etapa: str, **atributos):
+    """
+    Medir una etapa
+
+    Uso:
+        with tramo('gpt.diagnostico') as t:
+            ...
+            t['tokens_entrada'] = 120
+    """
+    etapa_token = _etapa_actual.set(etapa)
+
+    if not Config.METRICAS_ACTIVO:
+        try:
+            yield atributos
+        finally:
+            _etapa_actual.reset(etapa_token)
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield atributos
+    except Exception:
+        registro.contar('kairos_errores_total', etapa=etapa)
+        raise
+    finally:
+        _etapa_actual.reset(etapa_token)
+        duracion = time.perf_counter() - inicio
+        registro.observar('kairos_etapa_segundos', duracion, etapa=etapa)
+
+        traza = _traza_actual.get()
+        if traza is not None:
+            traza.tramos.append((etapa, duracion, atributos))
+
+
+def medir(etapa: str) -> Callable:
+    """Decorador: la función completa es un tramo"""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with tramo(etapa):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def observar_etapa(etapa: str, segundos: float):
+    """Registrar una duración medida a mano (p. ej. dentro de un generador)"""
+    if Config.METRICAS_ACTIVO:
+        registro.observar('kairos_etapa_segundos', segundos, etapa=etapa)
+
+
+def contar_tokens(modelo: str, uso: Optional[Dict], atributos: Dict = None):
+    """Registrar 'usage' de una respuesta de chat completions"""
+    if not uso or not Config.METRICAS_ACTIVO:
+        return
+
+    entrada = uso.get('prompt_tokens') or 0
+    salida = uso.get('completion_tokens') or 0
+
+    registro.contar('kairos_tokens_total', entrada, modelo=modelo, tipo='entrada')
+    registro.contar('kairos_tokens_total', salida, modelo=modelo, tipo='salida')
+
+    if atributos is not None:
+        atributos['tokens_entrada'] = entrada
+        atributos['tokens_salida'] = salida
+
+
+def contar_cache(cache: str, acierto: bool):
+    """Acierto o fallo de una caché (también queda en la traza)"""
+    if not Config.METRICAS_ACTIVO:
+        return
+
+    registro.contar('kairos_cache_total', cache=cache, resultado='acierto' if acierto else 'fallo')
+
+    traza = _traza_actual.get()
+    if traza is not None:
+        traza.tramos.append((f"cache.{cache}", 0.0, {'cache': acierto}))
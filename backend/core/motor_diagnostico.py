@@ -10,101 +10,102 @@ Motor de Diagnóstico V3.0
 import sys
 import os
 import json
+import time
+import threading
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 
-from backend.core.gpt_orchestrator import GPTOrchestrator
+from config.settings import Config
+from backend.core.gpt_orchestrator import obtener_orquestador
+from backend.core.ejecutor import obtener_ejecutor
+from backend.core.cache_diagnosticos import obtener_cache_diagnosticos, perfil_paciente
+from backend.core.metricas import medir, tramo, contar_cache
 from backend.database.productos_manager import ProductosManager
 from backend.database.plantas_medicinales_manager import PlantasMedicinalesManager
 from backend.database.remedios_caseros_manager import RemediosCaserosManager
 from backend.database.database_manager import DatabaseManager
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class MotorDiagnosticoV3:
     """Motor de diagnóstico que aprende y guarda en BD"""
     
     def __init__(self):
-        self.gpt = GPTOrchestrator()
+        self.gpt = obtener_orquestador()
         self.productos = ProductosManager()
         self.plantas = PlantasMedicinalesManager()
         self.remedios = RemediosCaserosManager()
         self.db = DatabaseManager()
+        self.ejecutor = obtener_ejecutor()
+        self.cache = obtener_cache_diagnosticos()
         
-        print("🧠 Motor de Diagnóstico V3.0 inicializado")
+        logger.info("🧠 Motor de Diagnóstico V3.0 inicializado")
     
+    @medir('diagnostico.total')
     def generar_diagnostico_completo(self, contexto: Dict) -> Tuple[bool, Dict]:
         """Generar diagnóstico completo con investigación"""
         
-        print(f"\n{'='*70}")
-        print("🧠 GENERANDO DIAGNÓSTICO COMPLETO")
-        print(f"{'='*70}\n")
+        logger.debug("🧠 GENERANDO DIAGNÓSTICO COMPLETO")
         
         mensajes = contexto.get('mensajes', [])
-        print(f"📋 Contexto recibido: {mensajes}")
+        logger.debug("📋 Contexto recibido: %s", mensajes)
         
         # ⭐ VALIDAR QUE HAYA CONTENIDO SUFICIENTE
         mensajes_usuario = [m for m in mensajes if m.get('role') == 'user']
         if len(mensajes_usuario) < 1:
-            print("❌ No hay mensajes de usuario")
+            logger.error("❌ No hay mensajes de usuario")
             return False, {'error': 'No hay información suficiente para diagnóstico'}
         
         # Verificar que haya más que saludos
         contenido_total = ' '.join([m.get('content', '') for m in mensajes_usuario])
         if len(contenido_total.strip()) < 10:
-            print(f"❌ Contenido muy corto: '{contenido_total}'")
+            logger.error("❌ Contenido muy corto: '%s'", contenido_total)
             return False, {'error': 'Información insuficiente para diagnóstico'}
         
-        print(f"✅ Contenido suficiente: {len(mensajes_usuario)} mensajes, {len(contenido_total)} caracteres")
+        logger.debug("✅ Contenido suficiente: %s mensajes, %s caracteres", len(mensajes_usuario), len(contenido_total))
+        
+        inicio = time.monotonic()
+        deadline = inicio + Config.DIAGNOSTICO_DEADLINE
         
         try:
-            # 1. Diagnóstico GPT
-            print("🤖 Paso 1: Llamando a GPT para diagnóstico...")
-            diagnostico_gpt = self.gpt.generar_diagnostico_final(contexto)
+            # 0. ¿Ya diagnosticamos síntomas casi iguales?
+            if Config.CACHE_DIAGNOSTICO_ACTIVO:
+                with tramo('diagnostico.cache'):
+                    resultado = self._buscar_en_cache(contexto, inicio)
+                contar_cache('diagnosticos', bool(resultado))
+                if resultado:
+                    return True, resultado
+            
+            # 1. Diagnóstico GPT (con su timeout, dentro del deadline total)
+            logger.debug("🤖 Paso 1: Llamando a GPT para diagnóstico...")
+            with tramo('diagnostico.gpt'):
+                futuro_diagnostico = self.ejecutor.enviar(self.gpt.generar_diagnostico_final, contexto)
+                diagnostico_gpt = self.ejecutor.esperar(futuro_diagnostico, 'diagnóstico', deadline)
             
             if not diagnostico_gpt:
-                print("❌ GPT no devolvió diagnóstico")
+                logger.error("❌ GPT no devolvió diagnóstico")
                 return False, {'error': 'GPT no pudo generar diagnóstico'}
             
-            print(f"✅ Diagnóstico GPT recibido: {diagnostico_gpt.get('diagnostico', 'N/A')}")
+            logger.debug("✅ Diagnóstico GPT recibido: %s", diagnostico_gpt.get('diagnostico', 'N/A'))
             
-            # 2. Generar receta
-            print("📝 Paso 2: Generando receta...")
-            receta = self.gpt.generar_receta_completa(
-                diagnostico_gpt['diagnostico'],
-                contexto
-            )
+            # 2-5. Receta, productos, plantas y remedios
+            with tramo('diagnostico.etapas'):
+                if Config.DIAGNOSTICO_CONCURRENTE:
+                    etapas = self._ejecutar_etapas_concurrentes(diagnostico_gpt, contexto, deadline)
+                else:
+                    etapas = self._ejecutar_etapas_secuenciales(diagnostico_gpt, contexto)
             
-            if not receta:
-                print("❌ GPT no devolvió receta")
+            if not etapas:
                 return False, {'error': 'No se pudo generar receta'}
             
-            print(f"✅ Receta generada: {receta}")
-            
-            # 3. Obtener detalles de productos
-            print("📦 Paso 3: Obteniendo productos...")
-            productos_detalle = self._obtener_productos_detalle(receta.get('productos', []))
-            print(f"✅ Productos: {len(productos_detalle)}")
-            
-            # 4. Obtener/Investigar plantas
-            print("🌿 Paso 4: Obteniendo plantas...")
-            plantas_detalle = self._obtener_o_investigar_plantas(
-                diagnostico_gpt['diagnostico'],
-                receta.get('plantas', [])
-            )
-            print(f"✅ Plantas: {len(plantas_detalle)}")
-            
-            # 5. Obtener/Investigar remedios
-            print("🍯 Paso 5: Obteniendo remedios...")
-            remedios_detalle = self._obtener_o_investigar_remedios(
-                diagnostico_gpt['diagnostico'],
-                receta.get('remedios', [])
-            )
-            print(f"✅ Remedios: {len(remedios_detalle)}")
+            productos_detalle, plantas_detalle, remedios_detalle = etapas
             
             # 6. Calcular tiempo de mejoría
-            print("⏱️ Paso 6: Calculando tiempo de mejoría...")
+            logger.debug("⏱️ Paso 6: Calculando tiempo de mejoría...")
             tiempo_mejoria = self._calcular_tiempo_mejoria(productos_detalle)
             
             # 7. Construir resultado completo
@@ -123,30 +124,194 @@ class MotorDiagnosticoV3:
                 'cuando_ver_medico': diagnostico_gpt.get('cuando_ver_medico', '')
             }
             
-            # 8. Guardar conocimiento
-            print("💾 Paso 7: Guardando conocimiento...")
-            self._guardar_conocimiento_completo(contexto, resultado)
+            # 8-9. Guardar conocimiento y combinación
+            if Config.DIAGNOSTICO_CONCURRENTE:
+                # El paciente no espera las escrituras: se hacen después de responder
+                contexto_copia = dict(contexto, mensajes=list(mensajes))
+                self.ejecutor.en_segundo_plano(self._guardar_aprendizaje, contexto_copia, dict(resultado))
+            else:
+                self._guardar_aprendizaje(contexto, resultado)
             
-            # 9. Guardar combinación
-            print("🔗 Paso 8: Guardando combinación...")
-            self._guardar_combinacion_recomendada(resultado)
+            logger.debug("✅ Diagnóstico completo generado exitosamente")
+            logger.debug("Productos: %s", len(productos_detalle))
+            logger.debug("Plantas: %s", len(plantas_detalle))
+            logger.debug("Remedios: %s", len(remedios_detalle))
+            logger.debug("Tiempo mejoría: %s", tiempo_mejoria)
+            logger.debug("Duración: %.1fs", time.monotonic() - inicio)
             
-            print(f"\n✅ Diagnóstico completo generado exitosamente")
-            print(f"   Productos: {len(productos_detalle)}")
-            print(f"   Plantas: {len(plantas_detalle)}")
-            print(f"   Remedios: {len(remedios_detalle)}")
-            print(f"   Tiempo mejoría: {tiempo_mejoria}\n")
+            self.cache.registrar_generacion(time.monotonic() - inicio)
             
             return True, resultado
             
         except Exception as e:
-            print(f"\n❌ ERROR GENERANDO DIAGNÓSTICO:")
-            print(f"   Tipo: {type(e).__name__}")
-            print(f"   Mensaje: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error generando diagnóstico: %s: %s", type(e).__name__, e)
             return False, {'error': f'Error: {str(e)}'}
     
+    def _buscar_en_cache(self, contexto: Dict, inicio: float) -> Optional[Dict]:
+        """
+        Reutilizar un diagnóstico guardado con síntomas similares
+        
+        Solo se reutiliza para el mismo perfil (edad, sexo, embarazo). Se
+        descarta el acierto si los productos recetados ya no están
+        disponibles (sin stock o eliminados del catálogo).
+        """
+        sintomas = self._extraer_sintomas(contexto.get('mensajes', []))
+        encontrado = self.cache.buscar(sintomas, perfil_paciente(contexto))
+        
+        if not encontrado:
+            return None
+        
+        datos, similitud = encontrado
+        
+        productos_detalle = self._obtener_productos_detalle(datos['productos'])
+        if datos['productos'] and not productos_detalle:
+            logger.warning("⚠️ Diagnóstico en caché con productos no disponibles, se consulta a GPT")
+            return None
+        
+        logger.debug("⚡ Diagnóstico desde caché: %s (similitud %.0f%%)", datos['diagnostico'], similitud * 100)
+        
+        resultado = {
+            'diagnostico': datos['diagnostico'],
+            'confianza': datos['confianza'],
+            'causas': datos['causas'],
+            'explicacion_causas': datos['explicacion_causas'],
+            'productos': productos_detalle,
+            'plantas': self._obtener_plantas_bd(datos['plantas']),
+            'remedios': self._obtener_remedios_bd(datos['remedios']),
+            'consejos_dieta': datos['consejos_dieta'],
+            'consejos_habitos': datos['consejos_habitos'],
+            'tiempo_mejoria': self._calcular_tiempo_mejoria(productos_detalle),
+            'advertencias': datos['advertencias'],
+            'cuando_ver_medico': datos['cuando_ver_medico'],
+            'desde_cache': True
+        }
+        
+        # Solo sumar uso a la combinación; el conocimiento ya existe
+        if Config.DIAGNOSTICO_CONCURRENTE:
+            self.ejecutor.en_segundo_plano(self._guardar_combinacion_recomendada, dict(resultado))
+        else:
+            self._guardar_combinacion_recomendada(resultado)
+        
+        self.cache.registrar_acierto(time.monotonic() - inicio)
+        
+        return resultado
+    
+    def _ejecutar_etapas_secuenciales(self, diagnostico_gpt: Dict,
+                                      contexto: Dict) -> Optional[Tuple[List, List, List]]:
+        """Receta → productos → plantas → remedios, uno tras otro"""
+        
+        # 2. Generar receta
+        logger.debug("📝 Paso 2: Generando receta...")
+        receta = self.gpt.generar_receta_completa(
+            diagnostico_gpt['diagnostico'],
+            contexto
+        )
+        
+        if not receta:
+            logger.error("❌ GPT no devolvió receta")
+            return None
+        
+        logger.debug("✅ Receta generada: %s", receta)
+        
+        # 3. Obtener detalles de productos
+        logger.debug("📦 Paso 3: Obteniendo productos...")
+        productos_detalle = self._obtener_productos_detalle(receta.get('productos', []))
+        logger.debug("✅ Productos: %s", len(productos_detalle))
+        
+        # 4. Obtener/Investigar plantas
+        logger.debug("🌿 Paso 4: Obteniendo plantas...")
+        plantas_detalle = self._obtener_o_investigar_plantas(
+            diagnostico_gpt['diagnostico'],
+            receta.get('plantas', []),
+            contexto.get('sesion_id')
+        )
+        logger.debug("✅ Plantas: %s", len(plantas_detalle))
+        
+        # 5. Obtener/Investigar remedios
+        logger.debug("🍯 Paso 5: Obteniendo remedios...")
+        remedios_detalle = self._obtener_o_investigar_remedios(
+            diagnostico_gpt['diagnostico'],
+            receta.get('remedios', []),
+            contexto.get('sesion_id')
+        )
+        logger.debug("✅ Remedios: %s", len(remedios_detalle))
+        
+        return productos_detalle, plantas_detalle, remedios_detalle
+    
+    def _ejecutar_etapas_concurrentes(self, diagnostico_gpt: Dict, contexto: Dict,
+                                      deadline: float) -> Optional[Tuple[List, List, List]]:
+        """
+        Receta e investigación de plantas/remedios en paralelo
+        
+        La investigación solo depende del diagnóstico. Si el catálogo ya
+        indica que hará falta, arranca junto con la receta; si no, se lanza
+        al conocer los IDs recetados. Cada etapa tiene su timeout y todas
+        respetan el deadline total.
+        """
+        diagnostico = diagnostico_gpt['diagnostico']
+        sesion_id = contexto.get('sesion_id')
+        
+        logger.debug("⚡ Pasos 2-5 en paralelo: receta + investigación")
+        futuro_receta = self.ejecutor.enviar(self.gpt.generar_receta_completa, diagnostico, contexto)
+        
+        # Investigación anticipada: con catálogo vacío siempre se necesita
+        futuro_plantas = None
+        if len(self.plantas.obtener_todas()) < 2:
+            futuro_plantas = self.ejecutor.enviar(self._buscar_plantas_en_web, diagnostico, sesion_id)
+        
+        futuro_remedios = None
+        if len(self.remedios.obtener_todos()) <= 1:
+            futuro_remedios = self.ejecutor.enviar(self._buscar_remedios_en_web, diagnostico, sesion_id)
+        
+        receta = self.ejecutor.esperar(futuro_receta, 'receta', deadline)
+        
+        if not receta:
+            logger.error("❌ GPT no devolvió receta")
+            return None
+        
+        logger.debug("✅ Receta generada: %s", receta)
+        
+        productos_detalle = self._obtener_productos_detalle(receta.get('productos', []))
+        plantas_detalle = self._obtener_plantas_bd(receta.get('plantas', []))
+        remedios_detalle = self._obtener_remedios_bd(receta.get('remedios', []))
+        
+        faltan_plantas = self._faltan_plantas(plantas_detalle)
+        faltan_remedios = self._faltan_remedios(remedios_detalle)
+        
+        # Lanzar la investigación que falte (plantas y remedios corren a la vez)
+        if faltan_plantas and futuro_plantas is None:
+            logger.debug("🌐 Buscando plantas REALES en internet para %s...", diagnostico)
+            futuro_plantas = self.ejecutor.enviar(self._buscar_plantas_en_web, diagnostico, sesion_id)
+        
+        if faltan_remedios and futuro_remedios is None:
+            logger.debug("🌐 Buscando remedios REALES en internet para %s...", diagnostico)
+            futuro_remedios = self.ejecutor.enviar(self._buscar_remedios_en_web, diagnostico, sesion_id)
+        
+        if faltan_plantas:
+            plantas_encontradas = self.ejecutor.esperar(
+                futuro_plantas, 'investigar plantas', deadline, por_defecto=[]
+            )
+            self._agregar_plantas_nuevas(plantas_detalle, plantas_encontradas, diagnostico)
+        
+        if faltan_remedios:
+            remedios_encontrados = self.ejecutor.esperar(
+                futuro_remedios, 'investigar remedios', deadline, por_defecto=[]
+            )
+            self._agregar_remedios_nuevos(remedios_detalle, remedios_encontrados, diagnostico)
+        
+        logger.debug("✅ Productos: %s | Plantas: %s | Remedios: %s", len(productos_detalle), len(plantas_detalle), len(remedios_detalle))
+        
+        return productos_detalle, plantas_detalle, remedios_detalle
+    
+    @medir('diagnostico.guardar')
+    def _guardar_aprendizaje(self, contexto: Dict, resultado: Dict):
+        """Guardar conocimiento y combinación del diagnóstico"""
+        logger.debug("💾 Guardando conocimiento...")
+        self._guardar_conocimiento_completo(contexto, resultado)
+        
+        logger.debug("🔗 Guardando combinación...")
+        self._guardar_combinacion_recomendada(resultado)
+    
     def _obtener_productos_detalle(self, ids: List[int]) -> List[Dict]:
         """Obtener detalles completos de productos"""
         productos = []
@@ -167,8 +332,25 @@ class MotorDiagnosticoV3:
         
         return productos
     
-    def _obtener_o_investigar_plantas(self, diagnostico: str, ids: List[int]) -> List[Dict]:
+    def _obtener_o_investigar_plantas(self, diagnostico: str, ids: List[int],
+                                      sesion_id: str = None) -> List[Dict]:
         """Obtener plantas de BD o investigar CON WEB SEARCH REAL"""
+        plantas_bd = self._obtener_plantas_bd(ids)
+        
+        # ⭐ Si hay menos de 2, INVESTIGAR CON WEB SEARCH
+        if self._faltan_plantas(plantas_bd):
+            logger.debug("🌐 Buscando plantas REALES en internet para %s...", diagnostico)
+            
+            # 1. BUSCAR EN WEB REAL
+            plantas_encontradas = self._buscar_plantas_en_web(diagnostico, sesion_id)
+            
+            # 2. Agregar las encontradas
+            self._agregar_plantas_nuevas(plantas_bd, plantas_encontradas, diagnostico)
+        
+        return plantas_bd
+    
+    def _obtener_plantas_bd(self, ids: List[int]) -> List[Dict]:
+        """Plantas recetadas que existen en el catálogo"""
         plantas_bd = []
         
         for planta_id in ids:
@@ -196,39 +378,57 @@ class MotorDiagnosticoV3:
                     'cuando_tomar': planta.get('mejor_momento_tomar', 'Después de comidas')
                 })
         
-        # ⭐ Si hay menos de 2, INVESTIGAR CON WEB SEARCH
-        if len(plantas_bd) < 2:
-            print(f"   🌐 Buscando plantas REALES en internet para {diagnostico}...")
-            
-            # 1. BUSCAR EN WEB REAL
-            plantas_encontradas = self._buscar_plantas_en_web(diagnostico)
-            
-            # 2. Agregar las encontradas
-            if plantas_encontradas:
-                for planta_nueva in plantas_encontradas[:2-len(plantas_bd)]:
-                    # Guardar en BD
-                    planta_id = self._guardar_planta_nueva(planta_nueva, diagnostico)
-                    if planta_id:
-                        planta_nueva['id'] = planta_id
-                        plantas_bd.append(planta_nueva)
-                        print(f"   ✅ Planta guardada: {planta_nueva['nombre_comun']}")
-        
         return plantas_bd
     
-    def _buscar_plantas_en_web(self, diagnostico: str) -> List[Dict]:
+    def _faltan_plantas(self, plantas_bd: List[Dict]) -> bool:
+        """¿Hay que investigar plantas nuevas?"""
+        return len(plantas_bd) < 2
+    
+    def _agregar_plantas_nuevas(self, plantas_bd: List[Dict], plantas_encontradas: List[Dict],
+                                diagnostico: str):
+        """Guardar en BD las plantas investigadas que falten"""
+        if not plantas_encontradas:
+            return
+        
+        for planta_nueva in plantas_encontradas[:2-len(plantas_bd)]:
+            # Guardar en BD
+            planta_id = self._guardar_planta_nueva(planta_nueva, diagnostico)
+            if planta_id:
+                planta_nueva['id'] = planta_id
+                plantas_bd.append(planta_nueva)
+                logger.debug("✅ Planta guardada: %s", planta_nueva['nombre_comun'])
+    
+    @medir('diagnostico.investigar_plantas')
+    def _buscar_plantas_en_web(self, diagnostico: str, sesion_id: str = None) -> List[Dict]:
         """Buscar plantas REALES con web search"""
         try:
             # Simular web_search (en tu caso usarías un wrapper que llame a una API)
             # Por limitaciones, GPT investiga libremente
-            plantas_nuevas = self.gpt.investigar_plantas_para_diagnostico(diagnostico)
+            plantas_nuevas = self.gpt.investigar_plantas_para_diagnostico(diagnostico, sesion_id)
             return plantas_nuevas
         
         except Exception as e:
-            print(f"❌ Error búsqueda web plantas: {e}")
+            logger.error("❌ Error búsqueda web plantas: %s", e)
             return []
     
-    def _obtener_o_investigar_remedios(self, diagnostico: str, ids: List[int]) -> List[Dict]:
+    def _obtener_o_investigar_remedios(self, diagnostico: str, ids: List[int],
+                                       sesion_id: str = None) -> List[Dict]:
         """Obtener remedios de BD o investigar CON WEB SEARCH REAL"""
+        remedios_bd = self._obtener_remedios_bd(ids)
+        
+        if self._faltan_remedios(remedios_bd):
+            logger.debug("🌐 Buscando remedios REALES en internet para %s...", diagnostico)
+            
+            # 1. BUSCAR EN WEB REAL
+            remedios_encontrados = self._buscar_remedios_en_web(diagnostico, sesion_id)
+            
+            # 2. Agregar los encontrados
+            self._agregar_remedios_nuevos(remedios_bd, remedios_encontrados, diagnostico)
+        
+        return remedios_bd
+    
+    def _obtener_remedios_bd(self, ids: List[int]) -> List[Dict]:
+        """Remedios recetados que existen en el catálogo"""
         remedios_bd = []
         
         for remedio_id in ids:
@@ -244,40 +444,42 @@ class MotorDiagnosticoV3:
                     'frecuencia': remedio.get('frecuencia', 'Diario')
                 })
         
+        return remedios_bd
+    
+    def _faltan_remedios(self, remedios_bd: List[Dict]) -> bool:
+        """¿Hay que investigar remedios nuevos?"""
         # ⭐ SIEMPRE investigar si hay menos de 2 remedios
         total_en_bd = len(self.remedios.obtener_todos())
-        print(f"   📊 Remedios en BD: {total_en_bd}")
+        logger.debug("📊 Remedios en BD: %s", total_en_bd)
         
-        if len(remedios_bd) < 2 or total_en_bd <= 1:
-            print(f"   🌐 Buscando remedios REALES en internet para {diagnostico}...")
-            
-            # 1. BUSCAR EN WEB REAL
-            remedios_encontrados = self._buscar_remedios_en_web(diagnostico)
-            
-            # 2. Agregar los encontrados
-            if remedios_encontrados:
-                print(f"   💡 Encontré {len(remedios_encontrados)} remedios nuevos")
-                for remedio_nuevo in remedios_encontrados[:2-len(remedios_bd)]:
-                    # Guardar en BD
-                    remedio_id = self._guardar_remedio_nuevo(remedio_nuevo, diagnostico)
-                    if remedio_id:
-                        remedio_nuevo['id'] = remedio_id
-                        remedios_bd.append(remedio_nuevo)
-                        print(f"   ✅ Remedio guardado: {remedio_nuevo['nombre']}")
-            else:
-                print(f"   ⚠️ No se encontraron remedios nuevos")
+        return len(remedios_bd) < 2 or total_en_bd <= 1
+    
+    def _agregar_remedios_nuevos(self, remedios_bd: List[Dict], remedios_encontrados: List[Dict],
+                                 diagnostico: str):
+        """Guardar en BD los remedios investigados que falten"""
+        if not remedios_encontrados:
+            logger.info("⚠️ No se encontraron remedios nuevos")
+            return
         
-        return remedios_bd
+        logger.debug("💡 Encontré %s remedios nuevos", len(remedios_encontrados))
+        for remedio_nuevo in remedios_encontrados[:2-len(remedios_bd)]:
+            # Guardar en BD
+            remedio_id = self._guardar_remedio_nuevo(remedio_nuevo, diagnostico)
+            if remedio_id:
+                remedio_nuevo['id'] = remedio_id
+                remedios_bd.append(remedio_nuevo)
+                logger.debug("✅ Remedio guardado: %s", remedio_nuevo['nombre'])
     
-    def _buscar_remedios_en_web(self, diagnostico: str) -> List[Dict]:
+    @medir('diagnostico.investigar_remedios')
+    def _buscar_remedios_en_web(self, diagnostico: str, sesion_id: str = None) -> List[Dict]:
         """Buscar remedios REALES con web search"""
         try:
             # Investigar con GPT (que tiene acceso a conocimiento actualizado)
-            remedios_nuevos = self.gpt.investigar_remedios_para_diagnostico(diagnostico)
+            remedios_nuevos = self.gpt.investigar_remedios_para_diagnostico(diagnostico, sesion_id)
             return remedios_nuevos
         
         except Exception as e:
-            print(f"❌ Error búsqueda web remedios: {e}")
+            logger.error("❌ Error búsqueda web remedios: %s", e)
             return []
     
     def _calcular_tiempo_mejoria(self, productos: List[Dict]) -> str:
@@ -341,12 +543,16 @@ class MotorDiagnosticoV3:
                 planta.get('cuando_tomar', 'Después de comidas')
             )
             
-            return self.db.ejecutar_insert(query, params)
+            planta_id = self.db.ejecutar_insert(query, params)
+            
+            # La planta nueva debe verse en el catálogo compartido
+            if planta_id:
+                self.plantas.catalogo_compartido.actualizar_item('plantas', planta_id)
+            
+            return planta_id
         
         except Exception as e:
-            print(f"❌ Error guardando planta: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error guardando planta: %s", e)
             return None
     
     def _guardar_remedio_nuevo(self, remedio: Dict, diagnostico: str) -> Optional[int]:
@@ -371,12 +577,16 @@ class MotorDiagnosticoV3:
                 remedio.get('frecuencia', 'Diario')
             )
             
-            return self.db.ejecutar_insert(query, params)
+            remedio_id = self.db.ejecutar_insert(query, params)
+            
+            # El remedio nuevo debe verse en el catálogo compartido
+            if remedio_id:
+                self.remedios.catalogo_compartido.actualizar_item('remedios', remedio_id)
+            
+            return remedio_id
         
         except Exception as e:
-            print(f"❌ Error guardando remedio: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error guardando remedio: %s", e)
             return None
     
     def _guardar_conocimiento_completo(self, contexto: Dict, resultado: Dict):
@@ -390,7 +600,20 @@ class MotorDiagnosticoV3:
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'gpt', NOW())
             """
             
+            # Con las columnas de la caché se guarda también lo necesario para reutilizarlo
+            completo = self.cache.asegurar_esquema()
+            if completo:
+                query = """
+                INSERT INTO conocimientos_completos 
+                (sintomas_usuario, diagnostico, confianza, causas, productos_recomendados,
+                 plantas_recomendadas, remedios_recomendados, consejos_dieta, consejos_habitos,
+                 conversacion_json, explicacion_causas, advertencias, cuando_ver_medico,
+                 perfil_paciente, origen, fecha_agregado)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'gpt', NOW())
+                """
+            
             sintomas = self._extraer_sintomas(contexto.get('mensajes', []))
+            perfil = perfil_paciente(contexto)
             productos_ids = ','.join([str(p['id']) for p in resultado['productos']])
             plantas_ids = ','.join([str(p['id']) for p in resultado['plantas']])
             remedios_ids = ','.join([str(r['id']) for r in resultado['remedios']])
@@ -408,13 +631,20 @@ class MotorDiagnosticoV3:
                 json.dumps(contexto.get('mensajes', []), ensure_ascii=False)
             )
             
-            self.db.ejecutar_comando(query, params)
-            print("   ✅ Conocimiento guardado en BD")
+            if completo:
+                params += (
+                    resultado.get('explicacion_causas') or '',
+                    json.dumps(resultado.get('advertencias') or [], ensure_ascii=False),
+                    resultado.get('cuando_ver_medico') or '',
+                    perfil
+                )
+            
+            if self.db.ejecutar_comando(query, params) and completo:
+                self.cache.agregar(sintomas, perfil, resultado)
+            logger.info("✅ Conocimiento guardado en BD")
         
         except Exception as e:
-            print(f"❌ Error guardando conocimiento: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error guardando conocimiento: %s", e)
     
     def _guardar_combinacion_recomendada(self, resultado: Dict):
         """Guardar en combinaciones_recomendadas"""
@@ -442,7 +672,7 @@ class MotorDiagnosticoV3:
                 WHERE id = %s
                 """
                 self.db.ejecutar_comando(update_query, (existe[0]['id'],))
-                print(f"   ✅ Combinación actualizada (veces_usado +1)")
+                logger.debug("✅ Combinación actualizada (veces_usado +1)")
             else:
                 # Insertar nueva
                 insert_query = """
@@ -460,26 +690,26 @@ class MotorDiagnosticoV3:
                 )
                 
                 self.db.ejecutar_comando(insert_query, params)
-                print(f"   ✅ Combinación guardada en BD")
+                logger.debug("✅ Combinación guardada en BD")
         
         except Exception as e:
-            print(f"❌ Error guardando combinación: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error guardando combinación: %s", e)
     
     def _extraer_sintomas(self, mensajes: List[Dict]) -> str:
-        """Extraer síntomas de la conversación"""
+        """Extraer síntomas de la conversación (todos los mensajes del paciente)"""
         sintomas = []
         for msg in mensajes:
             if msg.get('role') == 'user':
                 sintomas.append(msg.get('content', ''))
         
-        return ' | '.join(sintomas[:3])  # Primeros 3 mensajes
+        return ' | '.join(sintomas)
     
-    def responder_duda_post_diagnostico(self, pregunta: str, diagnostico: Dict) -> str:
+    def responder_duda_post_diagnostico(self, pregunta: str, diagnostico: Dict,
+                                        sesion_id: str = None) -> str:
         """Responder dudas sobre el diagnóstico"""
         
         contexto = {
+            'sesion_id': sesion_id,
             'diagnostico': diagnostico['diagnostico'],
             'productos': [p['nombre'] for p in diagnostico['productos']],
             'plantas': [p['nombre_comun'] for p in diagnostico['plantas']],
@@ -491,6 +721,20 @@ class MotorDiagnosticoV3:
         return respuesta
 
 
+# Singleton
+_motor = None
+_motor_lock = threading.Lock()
+
+def obtener_motor() -> MotorDiagnosticoV3:
+    """Obtener motor compartido del proceso (las sesiones solo guardan su estado)"""
+    global _motor
+    if _motor is None:
+        with _motor_lock:
+            if _motor is None:
+                _motor = MotorDiagnosticoV3()
+    return _motor
+
+
 if __name__ == "__main__":
     print("="*70)
     print("TEST MOTOR DIAGNÓSTICO V3.0")
@@ -0,0 +1,58 @@
+"""
+Normalización de texto compartida
+✅ Minúsculas + sin tildes (unidecode)
+✅ Correcciones ortográficas en UNA pasada (regex compilada por palabra completa)
+✅ Resultados memorizados para entradas repetidas
+✅ Usada por IntentDetector, IntentClassifier, ResponseGenerator y KairosLearner
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from unidecode import unidecode
+
+# Correcciones por palabra completa ('q' no toca 'quien', 'pa' no toca 'papa')
+CORRECCIONES = {
+    'cabesa': 'cabeza',
+    'cansao': 'cansado',
+    'jodido': 'muy mal',
+    'fregado': 'muy mal',
+    'pa': 'para',
+    'q': 'que',
+    'xq': 'porque',
+    'k': 'que',
+    'veses': 'veces'
+}
+
+# Más largas primero para que la alternancia prefiera la coincidencia completa
+_PATRON_CORRECCIONES = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, CORRECCIONES), key=len, reverse=True)) + r')\b'
+)
+
+_PATRON_PUNTUACION = re.compile(r'[^\w\s]')
+
+TAMANO_MEMORIA = 4096
+
+
+@lru_cache(maxsize=TAMANO_MEMORIA)
+def normalizar_basico(texto: str) -> str:
+    """Minúsculas, sin espacios en los extremos y sin tildes"""
+    return unidecode((texto or '').lower().strip())
+
+
+@lru_cache(maxsize=TAMANO_MEMORIA)
+def normalizar(texto: str) -> str:
+    """normalizar_basico + correcciones ortográficas comunes"""
+    return _PATRON_CORRECCIONES.sub(lambda m: CORRECCIONES[m.group(1)], normalizar_basico(texto))
+
+
+def limpiar_puntuacion(texto: str) -> str:
+    """Reemplazar puntuación por espacios y colapsar espacios repetidos"""
+    return ' '.join(_PATRON_PUNTUACION.sub(' ', texto).split())
+
+
+def quitar_palabras(texto: str, palabras: Iterable[str]) -> str:
+    """Eliminar palabras (stopwords) de un texto ya normalizado"""
+    palabras = palabras if isinstance(palabras, (set, frozenset)) else set(palabras)
+    return ' '.join(p for p in texto.split() if p not in palabras)
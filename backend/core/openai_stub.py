@@ -0,0 +1,248 @@
+"""
+Stub local de OpenAI para pruebas y benchmarks
+✅ Responde /v1/chat/completions sin salir a internet
+✅ Latencia y tasa de errores configurables
+✅ Devuelve JSON válido para cada tipo de prompt de Kairos
+✅ Soporta stream=True (eventos SSE como OpenAI)
+
+Uso como servidor:
+    python backend/core/openai_stub.py --puerto 8089 --latencia 0.3
+    OPENAI_BASE_URL=http://localhost:8089/v1 python backend/api/app.py
+
+Uso en proceso (sin red):
+    configurar_cliente_llm(ClienteLLM(transporte=TransporteStub()))
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+
+def generar_contenido(mensajes: list) -> str:
+    """Contenido de respuesta según el prompt recibido"""
+    prompt = ' '.join(m.get('content', '') for m in mensajes)
+
+    if '"accion"' in prompt:
+        return json.dumps({'accion': 'preguntar', 'razon': 'Respuesta del stub'})
+
+    if '"explicacion_causas"' in prompt:
+        return json.dumps({
+            'diagnostico': 'Cefalea tensional',
+            'confianza': 0.8,
+            'causas': ['Estrés', 'Falta de sueño'],
+            'explicacion_causas': 'Respuesta del stub',
+            'consejos_dieta': ['Tomar agua'],
+            'consejos_habitos': ['Dormir 8 horas'],
+            'advertencias': [],
+            'cuando_ver_medico': 'Si persiste más de 3 días'
+        }, ensure_ascii=False)
+
+    if '"razon_producto"' in prompt:
+        return json.dumps({'productos': [1], 'plantas': [1], 'remedios': [1],
+                           'razon_producto': 'Respuesta del stub'})
+
+    if '"nombre_comun"' in prompt:
+        return json.dumps([{
+            'nombre_comun': 'Manzanilla',
+            'nombre_cientifico': 'Matricaria chamomilla',
+            'propiedades': 'Relajante',
+            'dosis': '2 tazas al día',
+            'forma_uso': 'Infusión',
+            'preparacion': 'Reposar 5 minutos',
+            'cuando_tomar': 'Noche'
+        }], ensure_ascii=False)
+
+    if '"ingredientes"' in prompt:
+        return json.dumps([{
+            'nombre': 'Agua tibia con limón',
+            'descripcion': 'Respuesta del stub',
+            'ingredientes': 'Agua, limón',
+            'preparacion': 'Mezclar',
+            'como_usar': 'Beber en ayunas',
+            'frecuencia': 'Diario'
+        }], ensure_ascii=False)
+
+    if '"productos"' in prompt:
+        return json.dumps({'productos': []})
+
+    return 'Entiendo. ¿Desde hace cuánto tiempo tienes esa molestia?'
+
+
+def generar_respuesta(payload: Dict) -> Dict:
+    """Cuerpo con el formato de chat completions"""
+    mensajes = payload.get('messages', [])
+    contenido = generar_contenido(mensajes)
+
+    tokens_entrada = sum(len(m.get('content', '')) for m in mensajes) // 4
+    tokens_salida = len(contenido) // 4
+
+    return {
+        'id': f"stub-{int(time.time() * 1000)}",
+        'object': 'chat.completion',
+        'model': payload.get('model', 'stub'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': contenido},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': tokens_entrada,
+            'completion_tokens': tokens_salida,
+            'total_tokens': tokens_entrada + tokens_salida
+        }
+    }
+
+
+def generar_eventos_stream(payload: Dict):
+    """Líneas SSE con el contenido partido en fragmentos"""
+    contenido = generar_contenido(payload.get('messages', []))
+
+    palabras = contenido.split(' ')
+    for i, palabra in enumerate(palabras):
+        fragmento = palabra if i == 0 else ' ' + palabra
+        evento = {
+            'object': 'chat.completion.chunk',
+            'model': payload.get('model', 'stub'),
+            'choices': [{'index': 0, 'delta': {'content': fragmento}, 'finish_reason': None}]
+        }
+        yield f"data: {json.dumps(evento, ensure_ascii=False)}"
+
+    if (payload.get('stream_options') or {}).get('include_usage'):
+        tokens_entrada = sum(len(m.get('content', '')) for m in payload.get('messages', [])) // 4
+        tokens_salida = len(contenido) // 4
+        evento = {
+            'object': 'chat.completion.chunk',
+            'model': payload.get('model', 'stub'),
+            'choices': [],
+            'usage': {
+                'prompt_tokens': tokens_entrada,
+                'completion_tokens': tokens_salida,
+                'total_tokens': tokens_entrada + tokens_salida
+            }
+        }
+        yield f"data: {json.dumps(evento, ensure_ascii=False)}"
+
+    yield "data: [DONE]"
+
+
+class TransporteStub:
+    """Transporte en proceso: mismo contrato que TransporteHTTP, sin red"""
+
+    def __init__(self, latencia: float = 0.0, tasa_error: float = 0.0):
+        self.latencia = latencia
+        self.tasa_error = tasa_error
+        self.llamadas = 0
+
+    def enviar(self, ruta: str, headers: Dict, payload: Dict,
+               timeout: float) -> Tuple[int, Optional[Dict], Dict]:
+        self.llamadas += 1
+
+        if self.latencia:
+            time.sleep(min(self.latencia, timeout))
+
+        if self.tasa_error and random.random() < self.tasa_error:
+            return 503, {'error': {'message': 'stub: error simulado'}}, {}
+
+        return 200, generar_respuesta(payload), {}
+
+    def enviar_stream(self, ruta: str, headers: Dict, payload: Dict,
+                      timeout: float) -> Tuple[int, object, Dict]:
+        status, datos, headers_resp = self.enviar(ruta, headers, payload, timeout)
+
+        if status != 200:
+            return status, datos, headers_resp
+
+        return 200, generar_eventos_stream(payload), {}
+
+    def cerrar(self):
+        pass
+
+
+class _ManejadorStub(BaseHTTPRequestHandler):
+    """Handler HTTP del servidor stub"""
+
+    latencia = 0.0
+    tasa_error = 0.0
+
+    def do_POST(self):
+        largo = int(self.headers.get('Content-Length', 0))
+
+        try:
+            payload = json.loads(self.rfile.read(largo) or b'{}')
+        except ValueError:
+            self._responder(400, {'error': {'message': 'JSON inválido'}})
+            return
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._responder(404, {'error': {'message': 'Ruta no soportada'}})
+            return
+
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if self.tasa_error and random.random() < self.tasa_error:
+            self._responder(503, {'error': {'message': 'stub: error simulado'}})
+            return
+
+        if payload.get('stream'):
+            self._responder_stream(payload)
+            return
+
+        self._responder(200, generar_respuesta(payload))
+
+    def _responder_stream(self, payload: Dict):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        for linea in generar_eventos_stream(payload):
+            self.wfile.write(f"{linea}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+    def _responder(self, status: int, cuerpo: Dict):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor(puerto: int = 8089, latencia: float = 0.0,
+                     tasa_error: float = 0.0) -> ThreadingHTTPServer:
+    """Crear servidor stub (llamar serve_forever() para atender)"""
+    _ManejadorStub.latencia = latencia
+    _ManejadorStub.tasa_error = tasa_error
+    return ThreadingHTTPServer(('127.0.0.1', puerto), _ManejadorStub)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Stub local de OpenAI')
+    parser.add_argument('--puerto', type=int, default=8089)
+    parser.add_argument('--latencia', type=float, default=0.0, help='Segundos por respuesta')
+    parser.add_argument('--tasa-error', type=float, default=0.0, help='Fracción de respuestas 503')
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.puerto, args.latencia, args.tasa_error)
+
+    print("="*60)
+    print(f"🧪 STUB OPENAI en http://127.0.0.1:{args.puerto}/v1")
+    print(f"   Latencia: {args.latencia}s | Errores: {args.tasa_error*100:.0f}%")
+    print("="*60)
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -6,6 +6,51 @@ import requests
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
+# Precios actualizados (Nov 2024), USD por token
+PRECIOS_MODELOS = {
+    'gpt-4o-mini': {
+        'input': 0.150 / 1_000_000,
+        'output': 0.600 / 1_000_000
+    },
+    'gpt-4o': {
+        'input': 2.50 / 1_000_000,
+        'output': 10.00 / 1_000_000
+    },
+    'gpt-4-turbo': {
+        'input': 10.00 / 1_000_000,
+        'output': 30.00 / 1_000_000
+    },
+    'gpt-4': {
+        'input': 30.00 / 1_000_000,
+        'output': 60.00 / 1_000_000
+    },
+    'gpt-3.5-turbo': {
+        'input': 0.50 / 1_000_000,
+        'output': 1.50 / 1_000_000
+    }
+}
+
+MODELO_POR_DEFECTO = 'gpt-4o-mini'
+
+# Nombres más largos primero: 'gpt-4o-mini-2024-07-18' -> gpt-4o-mini, no gpt-4o
+_PREFIJOS = sorted(PRECIOS_MODELOS, key=len, reverse=True)
+
+
+def precio_modelo(modelo: str) -> Dict[str, float]:
+    """Precio por token de entrada y salida (versiones con fecha incluidas)"""
+    modelo = (modelo or '').lower()
+    for prefijo in _PREFIJOS:
+        if modelo.startswith(prefijo):
+            return PRECIOS_MODELOS[prefijo]
+    return PRECIOS_MODELOS[MODELO_POR_DEFECTO]
+
+
+def calcular_costo(tokens_input: int, tokens_output: int, modelo: str = MODELO_POR_DEFECTO) -> float:
+    """Costo en USD de una llamada según su 'usage'"""
+    precio = precio_modelo(modelo)
+    return tokens_input * precio['input'] + tokens_output * precio['output']
+
+
 class OpenAIUsageChecker:
     """Consultar uso real de API OpenAI"""
     
@@ -123,45 +168,9 @@ class OpenAIUsageChecker:
     
     def calcular_costo_consulta(self, tokens_input: int, tokens_output: int, modelo: str = 'gpt-4o-mini') -> float:
         """
-        Calcular costo exacto de una consulta
-        
-        Precios actualizados (Nov 2024):
-        - GPT-4o Mini: $0.150 / 1M input, $0.600 / 1M output
-        - GPT-4o: $2.50 / 1M input, $10.00 / 1M output
-        - GPT-4 Turbo: $10.00 / 1M input, $30.00 / 1M output
-        - GPT-4: $30.00 / 1M input, $60.00 / 1M output
+        Calcular costo exacto de una consulta (USD)
         """
-        
-        precios = {
-            'gpt-4o-mini': {
-                'input': 0.150 / 1_000_000,
-                'output': 0.600 / 1_000_000
-            },
-            'gpt-4o': {
-                'input': 2.50 / 1_000_000,
-                'output': 10.00 / 1_000_000
-            },
-            'gpt-4-turbo': {
-                'input': 10.00 / 1_000_000,
-                'output': 30.00 / 1_000_000
-            },
-            'gpt-4': {
-                'input': 30.00 / 1_000_000,
-                'output': 60.00 / 1_000_000
-            },
-            'gpt-3.5-turbo': {
-                'input': 0.50 / 1_000_000,
-                'output': 1.50 / 1_000_000
-            }
-        }
-        
-        if modelo not in precios:
-            modelo = 'gpt-4o-mini'  # Default
-        
-        costo_input = tokens_input * precios[modelo]['input']
-        costo_output = tokens_output * precios[modelo]['output']
-        
-        return costo_input + costo_output
+        return calcular_costo(tokens_input, tokens_output, modelo)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,110 @@
+"""
+Perfil de arranque (costo de importación por módulo)
+✅ Importa un módulo en un proceso nuevo con python -X importtime (arranque en frío real)
+✅ Costo propio y acumulado por módulo, y total por paquete
+✅ Detecta dependencias pesadas cargadas sin necesidad (pandas, sklearn, ...)
+
+Uso:
+    python backend/core/perfil_arranque.py                  (backend.api.app)
+    python backend/core/perfil_arranque.py backend.core.learner
+"""
+
+import sys
+import os
+import json
+import subprocess
+from typing import Dict, List
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from config.settings import Config
+
+# Solo deben cargarse cuando se usa su función (entrenar, aprender, investigar en la web)
+PESADOS = ('pandas', 'sklearn', 'scipy', 'numpy', 'wikipediaapi', 'duckduckgo_search', 'nltk')
+
+_MARCA = '@@perfil_arranque@@'
+
+_CODIGO = f"""
+import sys, time, json, importlib
+sys.path.insert(0, {BASE_DIR!r})
+inicio = time.perf_counter()
+importlib.import_module(sys.argv[1])
+segundos = time.perf_counter() - inicio
+pesados = [m for m in {PESADOS!r} if m in sys.modules]
+print({_MARCA!r} + json.dumps({{'segundos': segundos, 'pesados': pesados}}))
+"""
+
+
+def perfilar(modulo: str = 'backend.api.app', timeout: float = 120) -> Dict:
+    """
+    Importar `modulo` en frío y medir
+
+    Returns:
+        {'modulo', 'segundos', 'pesados', 'modulos': [{'nombre', 'propio_ms', 'acumulado_ms'}],
+         'paquetes': {paquete: propio_ms}}
+    """
+    entorno = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CODIGO, modulo],
+        capture_output=True, text=True, timeout=timeout, cwd=BASE_DIR, env=entorno
+    )
+
+    resultado = None
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(_MARCA):
+            resultado = json.loads(linea[len(_MARCA):])
+
+    if resultado is None:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+
+    modulos: List[Dict] = []
+    paquetes: Dict[str, float] = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        nombre = nombre.strip()
+        propio_ms = int(propio) / 1000
+        modulos.append({'nombre': nombre, 'propio_ms': propio_ms, 'acumulado_ms': int(acumulado) / 1000})
+        paquete = nombre.split('.')[0] if not nombre.startswith('backend.') else '.'.join(nombre.split('.')[:3])
+        paquetes[paquete] = paquetes.get(paquete, 0.0) + propio_ms
+
+    return {
+        'modulo': modulo,
+        'segundos': resultado['segundos'],
+        'pesados': resultado['pesados'],
+        'modulos': modulos,
+        'paquetes': dict(sorted(paquetes.items(), key=lambda p: p[1], reverse=True))
+    }
+
+
+def dentro_de_presupuesto(perfil: Dict, presupuesto_ms: float = None) -> bool:
+    presupuesto_ms = presupuesto_ms if presupuesto_ms is not None else Config.ARRANQUE_PRESUPUESTO_MS
+    return perfil['segundos'] * 1000 <= presupuesto_ms
+
+
+def imprimir_perfil(perfil: Dict, top: int = 15):
+    print("=" * 70)
+    print(f"⏱️ ARRANQUE EN FRÍO: {perfil['modulo']} = {perfil['segundos'] * 1000:.0f} ms "
+          f"(presupuesto {Config.ARRANQUE_PRESUPUESTO_MS:.0f} ms)")
+    print("=" * 70)
+
+    print("\nPor paquete (costo propio):")
+    for paquete, ms in list(perfil['paquetes'].items())[:top]:
+        print(f"  {ms:8.1f} ms  {paquete}")
+
+    print("\nMódulos más lentos (costo propio):")
+    for m in sorted(perfil['modulos'], key=lambda m: m['propio_ms'], reverse=True)[:top]:
+        print(f"  {m['propio_ms']:8.1f} ms  {m['nombre']}  (acumulado {m['acumulado_ms']:.1f} ms)")
+
+    if perfil['pesados']:
+        print(f"\n⚠️ Dependencias pesadas cargadas: {', '.join(perfil['pesados'])}")
+    else:
+        print("\n✅ Sin dependencias pesadas al arrancar")
+
+
+if __name__ == "__main__":
+    perfil = perfilar(sys.argv[1] if len(sys.argv) > 1 else 'backend.api.app')
+    imprimir_perfil(perfil)
+    sys.exit(0 if dentro_de_presupuesto(perfil) else 1)
@@ -0,0 +1,217 @@
+"""
+Presupuesto de tokens de los prompts GPT
+✅ Conversación compacta: una línea por turno, sin timestamps ni JSON con sangría
+✅ Conteo local de tokens (tiktoken si está instalado, si no estimación)
+✅ Presupuesto de entrada por llamada (incluye identidad y la plantilla del prompt)
+✅ Turnos antiguos se pliegan en un resumen clínico (ContextManager), de a uno
+"""
+
+import sys
+import os
+import re
+import math
+from typing import Dict, Optional, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.context_manager import ContextManager
+from backend.core.metricas import registro
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+ETIQUETAS = {'user': 'Paciente', 'assistant': 'Kairos'}
+
+# Codificación de los modelos gpt-4o / gpt-4o-mini
+CODIFICACION = 'o200k_base'
+
+_PIEZAS = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_codificador = None
+_codificador_cargado = False
+_detector = None
+
+
+def _obtener_codificador():
+    """tiktoken (opcional) se carga en la primera cuenta, no al importar"""
+    global _codificador, _codificador_cargado
+    if not _codificador_cargado:
+        _codificador_cargado = True
+        try:
+            import tiktoken
+            _codificador = tiktoken.get_encoding(CODIFICACION)
+        except Exception as e:
+            logger.info("ℹ️ tiktoken no disponible (%s): tokens estimados", e.__class__.__name__)
+    return _codificador
+
+
+def _obtener_detector():
+    """IntentDetector para el resumen (solo se crea si hay que plegar turnos)"""
+    global _detector
+    if _detector is None:
+        from backend.core.intent_detector import IntentDetector
+        _detector = IntentDetector()
+    return _detector
+
+
+def contar_tokens(texto: str) -> int:
+    """Tokens de un texto (solo el codificador queda en memoria, no los textos)"""
+    if not texto:
+        return 0
+
+    codificador = _obtener_codificador()
+    if codificador is not None:
+        return len(codificador.encode(texto))
+
+    # Estimación: palabras y signos, o ~4 caracteres por token en palabras largas
+    return max(len(_PIEZAS.findall(texto)), math.ceil(len(texto) / 4))
+
+
+def serializar_turno(mensaje: Dict) -> str:
+    etiqueta = ETIQUETAS.get(mensaje.get('role'), mensaje.get('role', ''))
+    return f"{etiqueta}: {' '.join(str(mensaje.get('content', '')).split())}"
+
+
+def serializar_turnos(mensajes: Sequence[Dict]) -> str:
+    """Conversación compacta (solo rol y contenido)"""
+    return '\n'.join(serializar_turno(m) for m in mensajes)
+
+
+def serializar_datos(datos: Dict, omitir: Sequence[str] = ('mensajes',)) -> str:
+    """Datos del contexto como líneas 'clave: valor' (los dicts anidados se aplanan)"""
+    lineas = []
+    for clave, valor in datos.items():
+        if clave in omitir or valor is None or valor == '':
+            continue
+        if isinstance(valor, dict):
+            lineas.append(serializar_datos(valor, omitir))
+        elif isinstance(valor, (list, tuple)):
+            if valor:
+                lineas.append(f"{clave}: {', '.join(map(str, valor))}")
+        else:
+            lineas.append(f"{clave}: {valor}")
+    return '\n'.join(linea for linea in lineas if linea)
+
+
+class _Plegado:
+    """Resumen clínico que crece de a un turno (sin rehacerlo desde el inicio)"""
+
+    def __init__(self, usuario: Optional[Dict] = None):
+        usuario = usuario or {}
+        self.contexto = ContextManager()
+        self.contexto.actualizar_paciente(nombre=usuario.get('nombre'), edad=usuario.get('edad'))
+        self.pregunta = None
+
+    def agregar(self, mensaje: Dict):
+        contenido = ' '.join(str(mensaje.get('content', '')).split())
+
+        if mensaje.get('role') == 'assistant':
+            self.pregunta = contenido
+            return
+        if mensaje.get('role') != 'user':
+            return
+
+        deteccion = _obtener_detector().detectar(contenido)
+
+        # Saludos y charla no van al resumen
+        if deteccion['es_conversacional'] and not deteccion['sintomas']:
+            self.pregunta = None
+            return
+
+        # El síntoma principal es el primer mensaje con contenido médico
+        if deteccion['es_consulta_medica']:
+            if self.contexto.contexto['medico']['sintoma_principal']:
+                for sintoma in deteccion['sintomas']:
+                    self.contexto.agregar_sintoma_adicional(sintoma)
+            else:
+                self.contexto.agregar_sintoma_principal(contenido)
+
+        self.contexto.actualizar_desde_entidades(deteccion['entidades'])
+        self.contexto.agregar_pregunta_respuesta(self.pregunta or '', contenido)
+        self.pregunta = None
+
+    def resumen(self) -> str:
+        return self.contexto.obtener_resumen_clinico()
+
+
+def resumen_clinico(mensajes: Sequence[Dict], usuario: Optional[Dict] = None) -> str:
+    """Resumen de los turnos plegados (ContextManager.obtener_resumen_clinico)"""
+    plegado = _Plegado(usuario)
+    for mensaje in mensajes:
+        plegado.agregar(mensaje)
+    return plegado.resumen()
+
+
+def _recortar(texto: str, tokens: int) -> str:
+    """Cortar un texto para que quepa en `tokens` (se conserva el final)"""
+    total = contar_tokens(texto)
+    if total <= tokens:
+        return texto
+    caracteres = max(0, int(len(texto) * tokens / total) - 3)
+    return '...' + texto[len(texto) - caracteres:] if caracteres else ''
+
+
+def _unir(resumen: str, conversacion: str) -> str:
+    return f"RESUMEN DE LO ANTERIOR:\n{resumen}\n\nÚLTIMOS MENSAJES:\n{conversacion}"
+
+
+def ensamblar_conversacion(mensajes: Sequence[Dict], usuario: Optional[Dict] = None,
+                           fijos: Sequence[str] = (), presupuesto: int = None,
+                           max_turnos: int = None, llamada: str = 'gpt') -> str:
+    """
+    Conversación para el prompt dentro del presupuesto de entrada
+
+    Args:
+        fijos: textos que van en la misma llamada (identidad y plantilla del
+            prompt armada sin conversación)
+        presupuesto: tokens de entrada de toda la llamada
+        max_turnos: turnos recientes literales como máximo (el resto va al resumen)
+
+    Returns:
+        Turnos recientes, precedidos del resumen clínico si hubo que plegar
+    """
+    presupuesto = presupuesto if presupuesto is not None else Config.PROMPT_PRESUPUESTO_TOKENS
+    tokens_fijos = sum(contar_tokens(texto) for texto in fijos)
+    disponible = max(presupuesto - tokens_fijos, 0)
+
+    mensajes = list(mensajes)
+    corte = max(len(mensajes) - max_turnos, 0) if max_turnos else 0
+    lineas = [serializar_turno(m) for m in mensajes[corte:]]
+    tokens_lineas = [contar_tokens(linea) + 1 for linea in lineas]
+
+    resumen = ''
+    tokens_resumen = 0
+    tokens_recientes = sum(tokens_lineas)
+    plegado = None
+    if corte:
+        plegado = _Plegado(usuario)
+        for mensaje in mensajes[:corte]:
+            plegado.agregar(mensaje)
+        resumen = plegado.resumen()
+        tokens_resumen = contar_tokens(_unir(resumen, ''))
+
+    # Plegar el turno más antiguo hasta que quepa (el último siempre se conserva)
+    inicio = 0
+    while len(lineas) - inicio > 1 and tokens_resumen + tokens_recientes > disponible:
+        plegado = plegado or _Plegado(usuario)
+        plegado.agregar(mensajes[corte])
+        corte += 1
+        tokens_recientes -= tokens_lineas[inicio]
+        inicio += 1
+        resumen = plegado.resumen()
+        tokens_resumen = contar_tokens(_unir(resumen, ''))
+
+    lineas, tokens_lineas = lineas[inicio:], tokens_lineas[inicio:]
+
+    if lineas and tokens_resumen + sum(tokens_lineas) > disponible:
+        lineas[-1] = _recortar(lineas[-1], max(disponible - tokens_resumen, 0))
+        tokens_lineas[-1] = contar_tokens(lineas[-1])
+
+    conversacion = '\n'.join(lineas)
+    if resumen:
+        conversacion = _unir(resumen, conversacion)
+        registro.contar('kairos_prompt_plegados_total', corte, llamada=llamada)
+        logger.debug("🗜️ %s: %d turnos plegados en resumen", llamada, corte)
+
+    registro.contar('kairos_prompt_tokens_total', tokens_fijos + tokens_resumen + sum(tokens_lineas),
+                    llamada=llamada)
+    return conversacion
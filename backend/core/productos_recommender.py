@@ -6,14 +6,33 @@ Asegura que Kairos SOLO recete productos que existen en inventario
 import sys
 import os
 from typing import Dict, List, Optional
-import requests
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
 
 from backend.database.productos_manager import ProductosManager
+from backend.database.catalogo_manager import registrar_formato
 from backend.core.ia_config_manager import IAConfigManager
+from backend.core.llm_client import obtener_cliente_llm
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+
+def _fragmento_producto(p: Dict) -> str:
+    """Producto tal como se describe en el prompt (sin el número de la lista)"""
+    return '\n'.join([
+        p['nombre'],
+        f"   Para qué sirve: {p['para_que_sirve']}",
+        f"   Beneficios: {p['beneficios_principales']}",
+        f"   Precio: S/. {float(p['precio']):.2f}",
+        ""
+    ])
+
+
+registrar_formato('productos', 'recomendador', _fragmento_producto)
+
 
 class ProductosRecommender:
     """
@@ -31,42 +50,25 @@ class ProductosRecommender:
         
         self.productos = ProductosManager()
         self.ia_config = IAConfigManager()
+        self.llm = obtener_cliente_llm()
         
-        # Cargar catálogo
-        self.catalogo = self._cargar_catalogo()
-        
-        print("💊 Productos Recommender inicializado")
-        print(f"   Productos en catálogo: {len(self.catalogo)}")
+        logger.info("💊 Productos Recommender inicializado")
+        logger.debug("Productos en catálogo: %s", len(self.catalogo))
+    
+    @property
+    def catalogo(self) -> List[Dict]:
+        """Catálogo con stock, construido desde el catálogo compartido"""
+        return self._cargar_catalogo()
     
     def _cargar_catalogo(self) -> List[Dict]:
-        """Cargar catálogo completo de productos desde BD"""
-        
-        query = """
-        SELECT 
-            id,
-            nombre,
-            categoria,
-            presentacion,
-            para_que_sirve,
-            beneficios_principales,
-            sintomas_que_trata,
-            perfil_paciente_ideal,
-            dosis_recomendada,
-            mejor_momento_tomar,
-            duracion_tratamiento,
-            precio,
-            precio_oferta,
-            stock
-        FROM productos_naturales
-        WHERE stock > 0
-        ORDER BY nombre
-        """
-        
-        from backend.database.db_manager import DatabaseManager
-        db = DatabaseManager()
+        """Productos con stock disponible (sin consultar BD)"""
         
         try:
-            productos_bd = db.ejecutar_query(query)
+            productos_bd = [
+                p for p in self.productos.obtener_todos()
+                if (p.get('stock') or 0) > 0
+            ]
+            productos_bd.sort(key=lambda p: p['nombre'])
             
             catalogo = []
             for p in productos_bd:
@@ -90,7 +92,7 @@ class ProductosRecommender:
             return catalogo
             
         except Exception as e:
-            print(f"   ⚠️ Error cargando catálogo: {e}")
+            logger.warning("⚠️ Error cargando catálogo: %s", e)
             return []
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -111,7 +113,7 @@ class ProductosRecommender:
         sintoma_principal = contexto_medico.get('sintoma_principal', '')
         sintomas_adicionales = contexto_medico.get('sintomas_adicionales', [])
         
-        print(f"   🔍 Analizando: {sintoma_principal}")
+        logger.debug("🔍 Analizando: %s", sintoma_principal)
         
         # Método 1: Reglas basadas en síntomas (rápido, sin GPT)
         productos_reglas = self._recomendar_por_reglas(
@@ -120,7 +122,7 @@ class ProductosRecommender:
         )
         
         if productos_reglas:
-            print(f"   ✅ Recomendación por reglas: {len(productos_reglas)} productos")
+            logger.debug("✅ Recomendación por reglas: %s productos", len(productos_reglas))
             return productos_reglas
         
         # Método 2: GPT con catálogo limitado (inteligente)
@@ -128,11 +130,11 @@ class ProductosRecommender:
             productos_gpt = self._recomendar_con_gpt(contexto_medico)
             
             if productos_gpt:
-                print(f"   ✅ Recomendación por GPT: {len(productos_gpt)} productos")
+                logger.debug("✅ Recomendación por GPT: %s productos", len(productos_gpt))
                 return productos_gpt
         
         # Fallback: Producto más vendido o general
-        print(f"   ⚠️ Usando recomendación fallback")
+        logger.warning("⚠️ Usando recomendación fallback")
         return self._recomendar_fallback()
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -240,26 +242,20 @@ RESPUESTA:"""
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],
-                    'messages': [
-                        {'role': 'system', 'content': 'Eres médico experto en medicina natural.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.5,
-                    'max_tokens': 300
-                },
-                timeout=15
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': 'Eres médico experto en medicina natural.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.5,
+                max_tokens=300,
+                timeout=15,
+                etapa='gpt.recomendador'
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 respuesta_texto = data['choices'][0]['message']['content'].strip()
                 
                 # Limpiar JSON
@@ -279,27 +275,20 @@ RESPUESTA:"""
                             'prioridad': 1
                         })
                 
-                self.ia_config.incrementar_consulta(0.005)
-                
                 return recomendaciones
             
         except Exception as e:
-            print(f"   ❌ Error GPT: {e}")
+            logger.error("❌ Error GPT: %s", e)
         
         return []
     
     def _formatear_catalogo_para_gpt(self) -> str:
-        """Formatear catálogo para enviar a GPT"""
+        """Formatear catálogo para enviar a GPT (fragmentos precalculados por producto)"""
         
-        lineas = []
-        for i, p in enumerate(self.catalogo, 1):
-            lineas.append(f"{i}. {p['nombre']}")
-            lineas.append(f"   Para qué sirve: {p['para_que_sirve']}")
-            lineas.append(f"   Beneficios: {p['beneficios']}")
-            lineas.append(f"   Precio: S/. {p['precio']:.2f}")
-            lineas.append("")
+        catalogo = self.catalogo
+        fragmentos = self.productos.catalogo_compartido.fragmentos('productos', 'recomendador', catalogo)
         
-        return '\n'.join(lineas)
+        return '\n'.join(f"{i}. {fragmento}" for i, fragmento in enumerate(fragmentos, 1))
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # MÉTODO 3: FALLBACK
@@ -7,7 +7,6 @@ Aprende automáticamente
 import sys
 import os
 from typing import Dict, Optional
-import requests
 import json
 from datetime import datetime
 
@@ -16,7 +15,18 @@ sys.path.insert(0, BASE_DIR)
 sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
 
 from backend.core.ia_config_manager import IAConfigManager
-from backend.database.db_manager import DatabaseManager
+from backend.core.llm_client import obtener_cliente_llm
+from backend.core.normalizacion import normalizar_basico, quitar_palabras
+from backend.core.indice_respuestas import obtener_indice_respuestas
+from backend.core.metricas import contar_cache
+from backend.database.database_manager import DatabaseManager
+from backend.database.escritura_diferida import obtener_escritura_diferida, ahora_sql
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Palabras que no forman parte del patrón de búsqueda
+PALABRAS_COMUNES_PATRON = {'el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'a'}
 
 class ResponseGenerator:
     """
@@ -33,12 +43,18 @@ class ResponseGenerator:
         """Inicializar generador"""
         
         self.ia_config = IAConfigManager()
+        self.llm = obtener_cliente_llm()
         self.db = DatabaseManager()
         
         # Crear tabla de respuestas aprendidas si no existe
         self._crear_tabla_respuestas()
         
-        print("💬 Response Generator inicializado")
+        # Índice en memoria de patrones aprendidos (una carga por proceso)
+        self.indice = obtener_indice_respuestas()
+        if not self.indice.cargado:
+            self.indice.cargar(self.db)
+        
+        logger.info("💬 Response Generator inicializado")
     
     def _crear_tabla_respuestas(self):
         """Crear tabla para almacenar respuestas aprendidas"""
@@ -64,9 +80,9 @@ class ResponseGenerator:
         
         try:
             self.db.ejecutar_query(query)
-            print("   ✅ Tabla respuestas_aprendidas verificada")
+            logger.debug("✅ Tabla respuestas_aprendidas verificada")
         except Exception as e:
-            print(f"   ⚠️ Error creando tabla: {e}")
+            logger.warning("⚠️ Error creando tabla: %s", e)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # GENERACIÓN PRINCIPAL
@@ -154,37 +170,24 @@ class ResponseGenerator:
                                     intencion: str,
                                     contexto: str) -> Optional[Dict]:
         """
-        Buscar respuesta similar en BD
+        Buscar respuesta similar (índice en memoria de respuestas_aprendidas)
         Usa similitud de texto
         """
         
         # Normalizar mensaje para búsqueda
         patron = self._normalizar_patron(mensaje)
         
-        query = """
-        SELECT id, respuesta_generada, veces_usado, calificacion_promedio
-        FROM respuestas_aprendidas
-        WHERE activo = TRUE
-          AND intencion = %s
-          AND (
-              patron_mensaje LIKE %s
-              OR patron_mensaje = %s
-          )
-        ORDER BY veces_usado DESC, calificacion_promedio DESC
-        LIMIT 1
-        """
-        
-        resultado = self.db.ejecutar_query(
-            query,
-            (intencion, f"%{patron}%", patron)
-        )
+        # Similitud coseno sobre n-gramas (captura paráfrasis, no solo substrings)
+        resultados = self.indice.buscar(patron, intencion)
+        contar_cache('respuestas_aprendidas', bool(resultados))
         
-        if resultado:
-            print(f"   ✅ Respuesta aprendida encontrada (usada {resultado[0]['veces_usado']} veces)")
+        if resultados:
+            fila, similitud = resultados[0]
+            logger.debug("✅ Respuesta aprendida encontrada (similitud %.0f%%, usada %s veces)", similitud * 100, fila['veces_usado'])
             return {
-                'id': resultado[0]['id'],
-                'respuesta': resultado[0]['respuesta_generada'],
-                'veces_usado': resultado[0]['veces_usado']
+                'id': fila['id'],
+                'respuesta': fila['respuesta'],
+                'veces_usado': fila['veces_usado']
             }
         
         return None
@@ -192,32 +195,19 @@ class ResponseGenerator:
     def _normalizar_patron(self, mensaje: str) -> str:
         """Normalizar mensaje para búsqueda"""
         
-        from unidecode import unidecode
-        
-        # Minúsculas
-        patron = mensaje.lower().strip()
-        
-        # Quitar acentos
-        patron = unidecode(patron)
-        
-        # Quitar palabras comunes
-        palabras_comunes = ['el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'a']
-        palabras = patron.split()
-        palabras = [p for p in palabras if p not in palabras_comunes]
-        
-        return ' '.join(palabras)
+        # Minúsculas, sin acentos y sin palabras comunes
+        # (sin correcciones: los patrones guardados en BD se generaron así)
+        return quitar_palabras(normalizar_basico(mensaje), PALABRAS_COMUNES_PATRON)
     
     def _marcar_uso(self, id_respuesta: int):
-        """Marcar que una respuesta aprendida fue usada"""
+        """Marcar que una respuesta aprendida fue usada (contador diferido)"""
         
-        query = """
-        UPDATE respuestas_aprendidas
-        SET veces_usado = veces_usado + 1,
-            ultima_vez_usado = NOW()
-        WHERE id = %s
-        """
-        
-        self.db.ejecutar_query(query, (id_respuesta,))
+        obtener_escritura_diferida().incrementar(
+            'respuestas_aprendidas', id_respuesta,
+            {'veces_usado': 1},
+            asignar={'ultima_vez_usado': ahora_sql()}
+        )
+        self.indice.marcar_uso(id_respuesta)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # GENERACIÓN CON GPT
@@ -248,44 +238,35 @@ INSTRUCCIONES:
 
 RESPUESTA:"""
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {config['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config['modelo'],
-                    'messages': [
-                        {'role': 'system', 'content': system_prompt},
-                        {'role': 'user', 'content': prompt_usuario}
-                    ],
-                    'temperature': 0.8,
-                    'max_tokens': 200
-                },
-                timeout=15
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': prompt_usuario}
+                ],
+                temperatura=0.8,
+                max_tokens=200,
+                timeout=15,
+                etapa='gpt.generador_respuestas'
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 respuesta = data['choices'][0]['message']['content'].strip()
                 
                 # Limpiar formato
                 respuesta = respuesta.replace('**', '').replace('*', '')
                 respuesta = respuesta.replace('#', '').replace('```', '')
                 
-                # Incrementar contador
-                self.ia_config.incrementar_consulta(0.003)
-                
-                print(f"   ✅ Respuesta GPT generada")
+                logger.debug("✅ Respuesta GPT generada")
                 
                 return respuesta
             else:
-                print(f"   ❌ Error GPT: {response.status_code}")
+                logger.error("❌ Error GPT: sin respuesta")
                 return None
                 
         except Exception as e:
-            print(f"   ❌ Error consultando GPT: {e}")
+            logger.error("❌ Error consultando GPT: %s", e)
             return None
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -308,13 +289,16 @@ RESPUESTA:"""
         """
         
         try:
-            self.db.ejecutar_query(
+            id_respuesta = self.db.ejecutar_insert(
                 query,
                 (patron, intencion, contexto[:500], respuesta)
             )
-            print(f"   💾 Respuesta guardada para aprendizaje")
+            
+            if id_respuesta:
+                self.indice.agregar(id_respuesta, patron, intencion, respuesta)
+                logger.debug("💾 Respuesta guardada para aprendizaje")
         except Exception as e:
-            print(f"   ⚠️ Error guardando respuesta: {e}")
+            logger.warning("⚠️ Error guardando respuesta: %s", e)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # FALLBACK
@@ -353,15 +337,16 @@ RESPUESTA:"""
         WHERE id = %s
         """
         
-        self.db.ejecutar_query(query, (calificacion, id_respuesta))
-        print(f"   ⭐ Respuesta calificada: {calificacion}/5")
+        self.db.ejecutar_comando(query, (calificacion, id_respuesta))
+        logger.debug("⭐ Respuesta calificada: %s/5", calificacion)
     
     def desactivar_respuesta(self, id_respuesta: int):
         """Desactivar una respuesta que no funcionó bien"""
         
         query = "UPDATE respuestas_aprendidas SET activo = FALSE WHERE id = %s"
-        self.db.ejecutar_query(query, (id_respuesta,))
-        print(f"   🚫 Respuesta {id_respuesta} desactivada")
+        self.db.ejecutar_comando(query, (id_respuesta,))
+        self.indice.quitar(id_respuesta)
+        logger.info("🚫 Respuesta %s desactivada", id_respuesta)
     
     def obtener_estadisticas(self) -> Dict:
         """Obtener estadísticas del sistema de aprendizaje"""
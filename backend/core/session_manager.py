@@ -2,31 +2,48 @@
 Session Manager V3.0
 ✅ Muestra receta COMPLETA (causas, dieta, hábitos, tiempo)
 ✅ Detalles de productos (dosis, momento, duración)
+✅ Estado compacto por sesión; BD, orquestador y motor compartidos por el proceso
+✅ Estado serializable (a_dict / desde_dict) para atender turnos desde cualquier worker
 """
 
 import sys
 import os
+import threading
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, BASE_DIR)
 
-from backend.core.gpt_orchestrator import GPTOrchestrator
-from backend.core.motor_diagnostico import MotorDiagnosticoV3
+from backend.core.gpt_orchestrator import obtener_orquestador
+from backend.core.motor_diagnostico import obtener_motor
+from backend.core.metricas import medir
 from backend.database.database_manager import DatabaseManager
+from backend.database.escritura_diferida import obtener_escritura_diferida, ahora_sql
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class SessionManager:
     """Session Manager V3.0"""
     
+    # Solo el estado del paciente vive en cada sesión
+    __slots__ = ('evento', 'ubicacion', 'dispositivo', 'sesion_id', 'estado', 'usuario_data',
+                 'mensajes_conversacion', 'diagnostico_actual', 'fecha_inicio', 'preguntas_realizadas')
+    
+    # Servicios pesados: una instancia por proceso para todas las sesiones
+    db = None
+    orchestrator = None
+    motor = None
+    _servicios_lock = threading.Lock()
+    
     def __init__(self, evento: str, ubicacion: str, dispositivo: str):
         self.evento = evento
         self.ubicacion = ubicacion
         self.dispositivo = dispositivo
         
-        self.db = DatabaseManager()
-        self.orchestrator = GPTOrchestrator()
-        self.motor = MotorDiagnosticoV3()
+        self._iniciar_servicios()
         
         self.sesion_id = None
         self.estado = 'iniciando'
@@ -34,16 +51,47 @@ class SessionManager:
         self.mensajes_conversacion = []
         self.diagnostico_actual = None
         self.fecha_inicio = None
+        self.preguntas_realizadas = 0
+        
+        logger.debug("🤖 SESSION MANAGER V3.0")
+    
+    def a_dict(self) -> Dict:
+        """Estado de la sesión (JSON) para el almacén de sesiones"""
+        estado = {campo: getattr(self, campo) for campo in self.__slots__}
+        estado['fecha_inicio'] = self.fecha_inicio.isoformat() if self.fecha_inicio else None
+        return estado
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict) -> 'SessionManager':
+        """Reconstruir sesión guardada (sin crear servicios nuevos)"""
+        cls._iniciar_servicios()
+        
+        sesion = cls.__new__(cls)
+        for campo in cls.__slots__:
+            setattr(sesion, campo, estado.get(campo))
         
-        print(f"\n{'='*70}")
-        print("🤖 SESSION MANAGER V3.0")
-        print(f"{'='*70}\n")
+        sesion.mensajes_conversacion = sesion.mensajes_conversacion or []
+        sesion.preguntas_realizadas = sesion.preguntas_realizadas or 0
+        if sesion.fecha_inicio:
+            sesion.fecha_inicio = datetime.fromisoformat(sesion.fecha_inicio)
+        
+        return sesion
+    
+    @classmethod
+    def _iniciar_servicios(cls):
+        """Crear BD, orquestador y motor compartidos (solo la primera sesión)"""
+        if cls.motor is None:
+            with cls._servicios_lock:
+                if cls.motor is None:
+                    cls.db = DatabaseManager()
+                    cls.orchestrator = obtener_orquestador()
+                    cls.motor = obtener_motor()
     
     def nueva_sesion(self) -> Tuple[bool, str, Dict]:
         """Crear nueva sesión"""
         
         timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        random_id = hex(hash(timestamp) & 0xffffff)[2:]
+        random_id = uuid.uuid4().hex[:6]  # único entre workers que comparten el almacén
         self.sesion_id = f"KAIROS-{timestamp}-{random_id}"
         
         self.fecha_inicio = datetime.now()
@@ -79,49 +127,96 @@ class SessionManager:
         
         return True, {'usuario_id': usuario_id, 'es_nuevo': es_nuevo, 'nombre': nombre}
     
+    @medir('sesion.mensaje')
     def procesar_mensaje(self, mensaje_usuario: str) -> Dict:
         """Procesar mensaje del usuario"""
         
-        self.mensajes_conversacion.append({
-            'role': 'user',
-            'content': mensaje_usuario,
-            'timestamp': datetime.now().isoformat()
-        })
+        self._registrar_mensaje_usuario(mensaje_usuario)
         
         # ⭐ Si ya hay diagnóstico, es chat post-diagnóstico
         if self.diagnostico_actual:
             return self._procesar_duda_post_diagnostico(mensaje_usuario)
         
-        contexto = {'mensajes': self.mensajes_conversacion, 'usuario': self.usuario_data}
+        contexto = {'mensajes': self.mensajes_conversacion, 'usuario': self.usuario_data, 'sesion_id': self.sesion_id}
+        
+        decision = self.orchestrator.decidir_accion(contexto)
+        
+        # Respuesta al paciente (transición o siguiente pregunta)
+        respuesta = self.orchestrator.generar_respuesta(decision, contexto)
+        
+        return self._completar_turno(mensaje_usuario, decision, respuesta)
+    
+    def procesar_mensaje_stream(self, mensaje_usuario: str) -> Iterator[Dict]:
+        """
+        Procesar mensaje entregando la respuesta por fragmentos
+        
+        Yields:
+            {'evento': 'fragmento', 'texto': ...} mientras GPT escribe
+            {'evento': 'fin', 'resultado': ...} con el mismo dict que procesar_mensaje
+        """
+        
+        self._registrar_mensaje_usuario(mensaje_usuario)
+        
+        if self.diagnostico_actual:
+            resultado = self._procesar_duda_post_diagnostico(mensaje_usuario)
+            yield {'evento': 'fragmento', 'texto': resultado['respuesta']}
+            yield {'evento': 'fin', 'resultado': resultado}
+            return
+        
+        contexto = {'mensajes': self.mensajes_conversacion, 'usuario': self.usuario_data, 'sesion_id': self.sesion_id}
         
         decision = self.orchestrator.decidir_accion(contexto)
         
+        fragmentos = []
+        for fragmento in self.orchestrator.generar_respuesta_stream(decision, contexto):
+            fragmentos.append(fragmento)
+            yield {'evento': 'fragmento', 'texto': fragmento}
+        
+        respuesta = ''.join(fragmentos).strip()
+        
+        if decision['accion'] == 'diagnosticar':
+            # El paciente ya lee/escucha la transición mientras se genera el diagnóstico
+            yield {'evento': 'diagnosticando'}
+        
+        yield {'evento': 'fin', 'resultado': self._completar_turno(mensaje_usuario, decision, respuesta)}
+    
+    def _registrar_mensaje_usuario(self, mensaje_usuario: str):
+        """Agregar mensaje del usuario al historial"""
+        self.mensajes_conversacion.append({
+            'role': 'user',
+            'content': mensaje_usuario,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def _completar_turno(self, mensaje_usuario: str, decision: Dict, respuesta: str) -> Dict:
+        """Guardar la respuesta y, si GPT decidió diagnosticar, generar el diagnóstico"""
+        
+        if decision['accion'] == 'preguntar':
+            self.preguntas_realizadas += 1
+        
+        self.mensajes_conversacion.append({
+            'role': 'assistant',
+            'content': respuesta,
+            'timestamp': datetime.now().isoformat()
+        })
+        
         # ⭐ CAMBIO CRÍTICO: Si GPT decide diagnosticar, generar INMEDIATAMENTE
         if decision['accion'] == 'diagnosticar':
-            # 1. Respuesta de transición
-            respuesta_transicion = self.orchestrator.generar_respuesta(decision, contexto)
-            
-            self.mensajes_conversacion.append({
-                'role': 'assistant',
-                'content': respuesta_transicion,
-                'timestamp': datetime.now().isoformat()
-            })
-            
             # Guardar mensaje de transición
-            self._guardar_mensaje_conversacion(mensaje_usuario, respuesta_transicion, 'diagnosticando')
+            self._guardar_mensaje_conversacion(mensaje_usuario, respuesta, 'diagnosticando')
             
-            # 2. Generar diagnóstico INMEDIATAMENTE
-            print("\n🧠 Generando diagnóstico automáticamente...")
+            # Generar diagnóstico INMEDIATAMENTE
+            logger.debug("🧠 Generando diagnóstico automáticamente...")
             exito, diagnostico = self.generar_diagnostico_y_receta()
             
             if exito:
-                # 3. Devolver TODO junto
+                # Devolver TODO junto
                 return {
-                    'respuesta': respuesta_transicion,
+                    'respuesta': respuesta,
                     'tipo': 'diagnostico_completo',
                     'listo_diagnostico': True,
                     'diagnostico': diagnostico,  # ⭐ Incluir el diagnóstico completo
-                    'preguntas_realizadas': self.orchestrator.preguntas_realizadas
+                    'preguntas_realizadas': self.preguntas_realizadas
                 }
             else:
                 return {
@@ -131,47 +226,36 @@ class SessionManager:
                     'error': diagnostico.get('error', 'Error desconocido')
                 }
         
-        # ⭐ Si no es diagnosticar, flujo normal (preguntar)
-        respuesta = self.orchestrator.generar_respuesta(decision, contexto)
-        
-        self.mensajes_conversacion.append({
-            'role': 'assistant',
-            'content': respuesta,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        # Guardar en BD
+        # ⭐ Flujo normal (preguntar): guardar en BD
         self._guardar_mensaje_conversacion(mensaje_usuario, respuesta, decision.get('accion', ''))
         
         return {
             'respuesta': respuesta,
             'tipo': decision['accion'],
             'listo_diagnostico': False,
-            'preguntas_realizadas': self.orchestrator.preguntas_realizadas
+            'preguntas_realizadas': self.preguntas_realizadas
         }
     
     def _guardar_mensaje_conversacion(self, mensaje_usuario: str, respuesta: str, intencion: str):
-        """Guardar en tabla conversaciones (turno por turno)"""
+        """Guardar en tabla conversaciones (turno por turno, en lote y fuera de la petición)"""
         try:
-            query = """
-            INSERT INTO conversaciones 
-            (usuario_id, sesion_id, mensaje_usuario, intencion_detectada, 
-             respuesta_kairos, fecha, canal)
-            VALUES (%s, %s, %s, %s, %s, NOW(), 'feria')
-            """
+            columnas = ('usuario_id', 'sesion_id', 'mensaje_usuario', 'intencion_detectada',
+                        'respuesta_kairos', 'fecha', 'canal')
             
             params = (
                 self.usuario_data['id'],
                 self.sesion_id,
                 mensaje_usuario,
                 intencion,
-                respuesta
+                respuesta,
+                ahora_sql(),
+                'feria'
             )
             
-            self.db.ejecutar_comando(query, params)
+            obtener_escritura_diferida().insertar('conversaciones', columnas, params)
         
         except Exception as e:
-            print(f"❌ Error guardando conversación: {e}")
+            logger.error("❌ Error guardando conversación: %s", e)
     
     def _procesar_duda_post_diagnostico(self, pregunta: str) -> Dict:
         """Procesar dudas después del diagnóstico"""
@@ -184,13 +268,14 @@ class SessionManager:
                 'listo_imprimir': True
             }
         
-        respuesta = self.motor.responder_duda_post_diagnostico(pregunta, self.diagnostico_actual)
+        respuesta = self.motor.responder_duda_post_diagnostico(pregunta, self.diagnostico_actual, self.sesion_id)
         
         self.mensajes_conversacion.append({'role': 'user', 'content': pregunta, 'timestamp': datetime.now().isoformat()})
         self.mensajes_conversacion.append({'role': 'assistant', 'content': respuesta, 'timestamp': datetime.now().isoformat()})
         
         return {'respuesta': respuesta, 'tipo': 'respuesta_duda', 'listo_diagnostico': True, 'listo_imprimir': False}
     
+    @medir('sesion.diagnostico')
     def generar_diagnostico_y_receta(self) -> Tuple[bool, Dict]:
         """Generar diagnóstico y receta"""
         
@@ -9,6 +9,9 @@ Busca en MÚLTIPLES FUENTES GRATIS:
 import os
 import requests
 from typing import List, Dict, Optional
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class WebSearcher:
     """Buscador multi-fuente para investigación médica"""
@@ -19,7 +22,7 @@ class WebSearcher:
     def buscar(self, query: str, num_resultados: int = 5) -> str:
         """Buscar en múltiples fuentes y combinar"""
         
-        print(f"   🔍 Buscando: {query}")
+        logger.debug("🔍 Buscando: %s", query)
         
         resultados_totales = []
         
@@ -62,13 +65,13 @@ class WebSearcher:
             if page.exists():
                 # Extraer resumen (primeros 500 caracteres)
                 resumen = page.summary[:500] + "..."
-                print(f"   ✅ Wikipedia encontró: {page.title}")
+                logger.debug("✅ Wikipedia encontró: %s", page.title)
                 return f"• {page.title}\n  {resumen}"
             
         except ImportError:
-            print(f"   ⚠️ Instala: pip install wikipedia-api")
+            logger.warning("⚠️ Instala: pip install wikipedia-api")
         except Exception as e:
-            print(f"   ⚠️ Wikipedia: {e}")
+            logger.warning("⚠️ Wikipedia: %s", e)
         
         return ""
     
@@ -87,13 +90,13 @@ class WebSearcher:
                 
                 if resultados:
                     texto = "\n\n".join(resultados)
-                    print(f"   ✅ DuckDuckGo: {len(resultados)} resultados")
+                    logger.debug("✅ DuckDuckGo: %s resultados", len(resultados))
                     return texto
         
         except ImportError:
-            print(f"   ⚠️ Instala: pip install duckduckgo-search")
+            logger.warning("⚠️ Instala: pip install duckduckgo-search")
         except Exception as e:
-            print(f"   ⚠️ DuckDuckGo: {e}")
+            logger.warning("⚠️ DuckDuckGo: %s", e)
         
         return ""
     
@@ -122,17 +125,17 @@ class WebSearcher:
                 
                 if resultados:
                     texto = "\n\n".join(resultados)
-                    print(f"   ✅ Bing: {len(resultados)} resultados")
+                    logger.debug("✅ Bing: %s resultados", len(resultados))
                     return texto
             
         except Exception as e:
-            print(f"   ⚠️ Bing: {e}")
+            logger.warning("⚠️ Bing: %s", e)
         
         return ""
     
     def _simulacion_sin_api(self, query: str) -> str:
         """Sin APIs - GPT investiga libremente"""
-        print(f"   ⚠️ Sin búsqueda web - GPT investiga")
+        logger.warning("⚠️ Sin búsqueda web - GPT investiga")
         
         return f"""Investiga en tu conocimiento médico sobre: {query}
 
@@ -0,0 +1,640 @@
+"""
+Catálogo compartido de Kairos
+✅ Carga productos, plantas y remedios UNA sola vez por proceso
+✅ Índices en memoria por ID y por síntoma
+✅ Índice TF-IDF disperso (composición, indicaciones) para preseleccionar candidatos de la receta
+✅ Fragmentos de prompt por item precalculados por snapshot (cadenas internadas)
+✅ Invalidación por versión (configuracion_sistema) o por TTL
+✅ Thread-safe: todas las sesiones leen la misma copia
+"""
+
+import sys
+import os
+import re
+import math
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from unidecode import unidecode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.database.database_manager import DatabaseManager
+from backend.core.metricas import medir
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Consultas de carga por tipo de catálogo
+QUERIES_CATALOGO = {
+    'productos': """
+    SELECT * FROM productos_naturales
+    WHERE activo = TRUE
+    ORDER BY nivel_prioridad DESC, veces_recomendado DESC
+    """,
+
+    'plantas': """
+    SELECT
+        id,
+        nombre_comun,
+        nombre_cientifico,
+        categoria,
+        descripcion,
+        propiedades_curativas,
+        sintomas_que_trata,
+        formas_preparacion,
+        dosis_recomendada,
+        frecuencia_uso,
+        duracion_tratamiento,
+        mejor_momento_tomar,
+        contraindicaciones,
+        efectos_secundarios,
+        advertencias,
+        veces_recomendado,
+        activo
+    FROM plantas_medicinales
+    WHERE activo = TRUE
+    ORDER BY veces_recomendado DESC
+    """,
+
+    'remedios': """
+    SELECT
+        id,
+        nombre,
+        categoria,
+        descripcion,
+        ingredientes_json,
+        ingredientes_texto,
+        sintomas_que_trata,
+        propiedades,
+        preparacion_paso_a_paso,
+        como_aplicar,
+        frecuencia,
+        duracion_tratamiento,
+        mejor_momento,
+        contraindicaciones,
+        advertencias,
+        temperatura,
+        veces_recomendado,
+        activo
+    FROM remedios_caseros
+    WHERE activo = TRUE
+    ORDER BY veces_recomendado DESC
+    """
+}
+
+# Combinaciones validadas entre items (índice de pares)
+QUERY_COMBINACIONES = """
+SELECT * FROM combinaciones_recomendadas
+WHERE activo = 1
+  AND tipo_combinacion IN ('producto_planta', 'planta_planta')
+  AND item_1_id IS NOT NULL AND item_2_id IS NOT NULL
+ORDER BY id
+"""
+
+# Campo secundario donde también se buscan síntomas (además de sintomas_que_trata)
+CAMPO_SECUNDARIO = {
+    'productos': 'para_que_sirve',
+    'plantas': 'propiedades_curativas',
+    'remedios': 'descripcion'
+}
+
+# Peso de un término según el campo donde aparece
+PESO_SINTOMA = 2
+PESO_SECUNDARIO = 1
+
+# Campos (y peso) del índice TF-IDF con el que se preseleccionan candidatos para la receta
+CAMPOS_RECUPERACION = {
+    'productos': {'nombre': 1, 'categoria': 1, 'para_que_sirve': 2, 'sintomas_que_trata': 2,
+                  'composicion_activos': 2, 'mecanismo_accion': 1},
+    'plantas': {'nombre_comun': 1, 'categoria': 1, 'descripcion': 1, 'propiedades_curativas': 2,
+                'sintomas_que_trata': 2},
+    'remedios': {'nombre': 1, 'categoria': 1, 'descripcion': 1, 'ingredientes_texto': 1,
+                 'propiedades': 2, 'sintomas_que_trata': 2}
+}
+
+# Formatos de fragmento de prompt: (tipo, nombre) -> función(item) -> str
+FORMATOS_FRAGMENTO: Dict[Tuple[str, str], Callable[[Dict], str]] = {}
+
+
+def registrar_formato(tipo: str, nombre: str, funcion: Callable[[Dict], str]):
+    """Registrar cómo se describe un item en un prompt (se precalcula en cada carga)"""
+    FORMATOS_FRAGMENTO[(tipo, nombre)] = funcion
+
+
+# Palabras que no se indexan
+PALABRAS_VACIAS = {
+    'de', 'del', 'la', 'las', 'el', 'los', 'lo', 'un', 'una', 'y', 'o', 'e', 'en',
+    'con', 'sin', 'para', 'por', 'al', 'a', 'que', 'se', 'su', 'sus', 'es', 'muy', 'mas'
+}
+
+
+def terminos_busqueda(texto: str) -> List[str]:
+    """Términos sin tildes, en minúsculas, sin palabras vacías y sin plural simple"""
+    terminos = []
+
+    for palabra in re.findall(r'[a-z0-9]+', unidecode(texto or '').lower()):
+        if len(palabra) < 3 or palabra in PALABRAS_VACIAS:
+            continue
+        if len(palabra) > 5 and palabra.endswith('es') and palabra[-3] in 'rlnd':
+            palabra = palabra[:-2]      # dolores -> dolor
+        elif len(palabra) > 4 and palabra.endswith('s'):
+            palabra = palabra[:-1]      # migranas -> migrana
+        terminos.append(palabra)
+
+    return terminos
+
+
+class _IndiceTfidf:
+    """
+    Vectores TF-IDF (L2) de cada item en un índice invertido disperso
+
+    término -> {id: peso}; puntuar una consulta solo recorre las listas
+    de sus términos, así el costo no crece con el tamaño del catálogo.
+    """
+
+    def __init__(self, tipo: str, items: List[Dict]):
+        campos = CAMPOS_RECUPERACION[tipo]
+
+        frecuencias = {}
+        for item in items:
+            tf = {}
+            for campo, peso in campos.items():
+                for termino in terminos_busqueda(_texto_campo(item.get(campo))):
+                    tf[termino] = tf.get(termino, 0) + peso
+            frecuencias[item['id']] = tf
+
+        total = len(items)
+        documentos = {}
+        for tf in frecuencias.values():
+            for termino in tf:
+                documentos[termino] = documentos.get(termino, 0) + 1
+
+        self.idf = {t: math.log((1 + total) / (1 + df)) + 1 for t, df in documentos.items()}
+        self.indice: Dict[str, Dict[int, float]] = {}
+
+        for item_id, tf in frecuencias.items():
+            vector = {t: (1 + math.log(f)) * self.idf[t] for t, f in tf.items()}
+            norma = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+            for termino, valor in vector.items():
+                self.indice.setdefault(termino, {})[item_id] = valor / norma
+
+    def puntuar(self, texto: str) -> Dict[int, float]:
+        """Similitud coseno de la consulta con cada item que comparte algún término"""
+        tf = {}
+        for termino in terminos_busqueda(texto):
+            if termino in self.idf:
+                tf[termino] = tf.get(termino, 0) + 1
+
+        consulta = {t: (1 + math.log(f)) * self.idf[t] for t, f in tf.items()}
+        norma = math.sqrt(sum(v * v for v in consulta.values())) or 1.0
+
+        puntajes = {}
+        for termino, valor in consulta.items():
+            for item_id, peso in self.indice[termino].items():
+                puntajes[item_id] = puntajes.get(item_id, 0.0) + peso * valor / norma
+
+        return puntajes
+
+
+def _texto_campo(valor) -> str:
+    if isinstance(valor, (list, tuple)):
+        return ' '.join(str(v) for v in valor)
+    return str(valor) if valor is not None else ''
+
+
+class _CatalogoTipo:
+    """
+    Snapshot inmutable de un tipo de catálogo con sus índices
+
+    Índice invertido: término -> {id: peso}. Las actualizaciones crean
+    un snapshot nuevo que solo reindexa el item cambiado (copy-on-write),
+    así los lectores nunca ven un índice a medio modificar.
+    """
+
+    def __init__(self, tipo: str, items: List[Dict]):
+        self.tipo = tipo
+        self.items = items
+        self.por_id = {item['id']: item for item in items}
+        self.posicion = {item['id']: i for i, item in enumerate(items)}
+
+        self.indice = {}            # termino -> {id: peso}
+        self.terminos_item = {}     # id -> {termino: peso} (para desindexar)
+
+        for item in items:
+            self._indexar(item)
+
+        self._tfidf = _IndiceTfidf(tipo, items)
+
+        # nombre de formato -> {id: fragmento}; vive lo que vive el snapshot (versión)
+        self._fragmentos: Dict[str, Dict[int, str]] = {}
+        for (tipo_formato, nombre) in list(FORMATOS_FRAGMENTO):
+            if tipo_formato == tipo:
+                self.fragmentos(nombre)
+
+    def fragmentos(self, nombre: str) -> Dict[int, str]:
+        """Fragmentos de un formato para todos los items (calculados una vez por snapshot)"""
+        cache = self._fragmentos.get(nombre)
+        if cache is None:
+            funcion = FORMATOS_FRAGMENTO[(self.tipo, nombre)]
+            cache = {item['id']: sys.intern(funcion(item)) for item in self.items}
+            self._fragmentos[nombre] = cache
+        return cache
+
+    @property
+    def tfidf(self) -> _IndiceTfidf:
+        """Índice TF-IDF (los snapshots de con_item lo construyen en su primer uso)"""
+        if self._tfidf is None:
+            self._tfidf = _IndiceTfidf(self.tipo, self.items)
+        return self._tfidf
+
+    @staticmethod
+    def _terminos_de(tipo: str, item: Dict) -> Dict[str, int]:
+        pesos = {}
+
+        for termino in terminos_busqueda(item.get(CAMPO_SECUNDARIO[tipo])):
+            pesos[termino] = PESO_SECUNDARIO
+
+        for termino in terminos_busqueda(item.get('sintomas_que_trata')):
+            pesos[termino] = PESO_SINTOMA
+
+        return pesos
+
+    def _indexar(self, item: Dict):
+        pesos = self._terminos_de(self.tipo, item)
+        self.terminos_item[item['id']] = pesos
+
+        for termino, peso in pesos.items():
+            self.indice.setdefault(termino, {})[item['id']] = peso
+
+    def con_item(self, item: Dict) -> '_CatalogoTipo':
+        """Snapshot nuevo con el item agregado o reemplazado"""
+        nuevo = _CatalogoTipo.__new__(_CatalogoTipo)
+        nuevo.tipo = self.tipo
+        nuevo._tfidf = None     # el IDF cambia con cada item
+        nuevo.indice = dict(self.indice)
+        nuevo.terminos_item = dict(self.terminos_item)
+
+        item_id = item['id']
+
+        if item_id in self.por_id:
+            nuevo.items = list(self.items)
+            nuevo.items[self.posicion[item_id]] = item
+            nuevo.posicion = self.posicion
+        else:
+            nuevo.items = self.items + [item]
+            nuevo.posicion = dict(self.posicion)
+            nuevo.posicion[item_id] = len(self.items)
+
+        nuevo.por_id = dict(self.por_id)
+        nuevo.por_id[item_id] = item
+
+        # Copiar solo las listas de postings que cambian
+        anteriores = self.terminos_item.get(item_id, {})
+        pesos = self._terminos_de(self.tipo, item)
+
+        for termino in set(anteriores) | set(pesos):
+            postings = dict(nuevo.indice.get(termino, {}))
+            postings.pop(item_id, None)
+            if termino in pesos:
+                postings[item_id] = pesos[termino]
+
+            if postings:
+                nuevo.indice[termino] = postings
+            else:
+                nuevo.indice.pop(termino, None)
+
+        nuevo.terminos_item[item_id] = pesos
+
+        # Fragmentos: copiar y reformatear solo el item cambiado
+        nuevo._fragmentos = {}
+        for nombre, cache in self._fragmentos.items():
+            cache = dict(cache)
+            cache[item_id] = sys.intern(FORMATOS_FRAGMENTO[(self.tipo, nombre)](item))
+            nuevo._fragmentos[nombre] = cache
+
+        return nuevo
+
+    def sin_item(self, item_id: int) -> '_CatalogoTipo':
+        """Snapshot nuevo sin el item (desactivado o eliminado)"""
+        if item_id not in self.por_id:
+            return self
+        return _CatalogoTipo(self.tipo, [i for i in self.items if i['id'] != item_id])
+
+
+class _IndiceCombinaciones:
+    """Snapshot de combinaciones_recomendadas indexado por par de items"""
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.indice = {}    # (tipo_combinacion, ((tipo, id), (tipo, id)) ordenado) -> fila
+
+        for fila in items:
+            try:
+                clave = self.clave(fila['tipo_combinacion'], fila['item_1_tipo'], fila['item_1_id'],
+                                   fila['item_2_tipo'], fila['item_2_id'])
+            except (KeyError, TypeError, ValueError):
+                continue    # Filas sin par completo (combinaciones por diagnóstico: item_* en NULL)
+
+            # La primera (id menor) gana, como en la consulta original
+            self.indice.setdefault(clave, fila)
+
+    @staticmethod
+    def clave(tipo_combinacion: str, tipo_1: str, id_1: int, tipo_2: str, id_2: int):
+        """Clave independiente del orden de los items"""
+        return tipo_combinacion, tuple(sorted(((tipo_1, int(id_1)), (tipo_2, int(id_2)))))
+
+
+def _construir_snapshot(tipo: str, items: List[Dict]):
+    if tipo == 'combinaciones':
+        return _IndiceCombinaciones(items)
+    return _CatalogoTipo(tipo, items)
+
+
+class CatalogoManager:
+    """
+    Catálogo en memoria compartido por todas las sesiones
+
+    Los managers de productos/plantas/remedios leen desde aquí,
+    así crear una sesión nueva no ejecuta consultas de catálogo.
+    """
+
+    def __init__(self, ttl_segundos: int = None, verificar_version_cada: int = None,
+                 reintento_segundos: int = None):
+        """
+        Inicializar catálogo
+
+        Args:
+            ttl_segundos: Tiempo máximo antes de recargar desde BD
+            verificar_version_cada: Segundos entre verificaciones de versión
+            reintento_segundos: Espera antes de reintentar una recarga fallida
+        """
+        self.ttl_segundos = ttl_segundos if ttl_segundos is not None else Config.CATALOGO_TTL
+        self.reintento_segundos = (reintento_segundos if reintento_segundos is not None
+                                   else Config.CATALOGO_REINTENTO)
+        self.verificar_version_cada = (verificar_version_cada if verificar_version_cada is not None
+                                       else Config.CATALOGO_VERSION_CHECK)
+
+        self.db = DatabaseManager()
+        self._lock = threading.RLock()
+
+        self._datos = {}            # tipo -> _CatalogoTipo (o _IndiceCombinaciones)
+        self._cargado_en = {}       # tipo -> timestamp de carga
+        self._version = None        # valor de configuracion_sistema.catalogo_version
+        self._ultima_verificacion = 0.0
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CARGA E INVALIDACIÓN
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def cargar_todo(self):
+        """Cargar todos los catálogos (usar al iniciar el proceso)"""
+        self._version = self._leer_version()
+        self._ultima_verificacion = time.time()
+
+        for tipo in list(QUERIES_CATALOGO) + ['combinaciones']:
+            self.recargar(tipo)
+
+    def recargar(self, tipo: str):
+        """Recargar un tipo de catálogo desde BD"""
+        with self._lock:
+            try:
+                items = self.db.ejecutar_query(QUERIES_CATALOGO.get(tipo, QUERY_COMBINACIONES))
+            except Exception as e:
+                logger.error("❌ Error cargando catálogo %s: %s", tipo, e)
+                items = None
+
+            if items is None:
+                # Error de BD: conservar la copia anterior si existe y no reintentar
+                # en cada lectura, solo pasados `reintento_segundos`
+                if tipo not in self._datos:
+                    self._datos[tipo] = _construir_snapshot(tipo, [])
+                reintento = min(self.reintento_segundos, self.ttl_segundos)
+                self._cargado_en[tipo] = time.time() - self.ttl_segundos + reintento
+                return
+
+            self._datos[tipo] = _construir_snapshot(tipo, items)
+            self._cargado_en[tipo] = time.time()
+
+            logger.info("📚 Catálogo %s: %s activos", tipo, len(items))
+
+    def actualizar_item(self, tipo: str, item_id: int):
+        """
+        Releer un solo item desde BD y reindexarlo (sin recargar el catálogo)
+
+        Usar tras insertar o editar un producto, planta o remedio.
+        """
+        query = f"SELECT * FROM ({QUERIES_CATALOGO[tipo]}) AS catalogo WHERE catalogo.id = %s"
+
+        try:
+            filas = self.db.ejecutar_query(query, (item_id,))
+        except Exception as e:
+            logger.error("❌ Error actualizando %s %s: %s", tipo, item_id, e)
+            filas = None
+
+        if filas is None:
+            self.invalidar(tipo)
+            return
+
+        with self._lock:
+            actual = self._datos.get(tipo)
+            if actual is None:
+                return
+
+            self._datos[tipo] = actual.con_item(filas[0]) if filas else actual.sin_item(item_id)
+
+    def invalidar(self, tipo: str = None):
+        """
+        Invalidar catálogo (se recarga en el próximo acceso)
+
+        Args:
+            tipo: productos, plantas, remedios, combinaciones o None para todos
+        """
+        with self._lock:
+            tipos = [tipo] if tipo else list(self._cargado_en.keys())
+            for t in tipos:
+                self._cargado_en[t] = 0.0
+
+    def _leer_version(self) -> Optional[str]:
+        """Leer versión del catálogo (el panel admin la incrementa al editar)"""
+        try:
+            return self.db.obtener_configuracion('catalogo_version')
+        except Exception:
+            return None
+
+    def _verificar_version(self):
+        """Invalidar todo si cambió la versión en BD"""
+        ahora = time.time()
+
+        if ahora - self._ultima_verificacion < self.verificar_version_cada:
+            return
+
+        with self._lock:
+            if ahora - self._ultima_verificacion < self.verificar_version_cada:
+                return
+
+            self._ultima_verificacion = ahora
+            version = self._leer_version()
+
+            if version != self._version:
+                logger.info("🔄 Versión de catálogo cambió (%s → %s)", self._version, version)
+                self._version = version
+                self.invalidar()
+
+    def _obtener(self, tipo: str) -> _CatalogoTipo:
+        """Obtener snapshot vigente de un tipo (recarga si expiró)"""
+        self._verificar_version()
+
+        cargado = self._cargado_en.get(tipo)
+
+        if cargado is None or time.time() - cargado > self.ttl_segundos:
+            with self._lock:
+                cargado = self._cargado_en.get(tipo)
+                if cargado is None or time.time() - cargado > self.ttl_segundos:
+                    self.recargar(tipo)
+
+        return self._datos[tipo]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CONSULTAS
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener_todos(self, tipo: str) -> List[Dict]:
+        """Todos los items activos de un tipo"""
+        return self._obtener(tipo).items
+
+    def obtener_por_id(self, tipo: str, item_id: int) -> Optional[Dict]:
+        """Item por ID"""
+        return self._obtener(tipo).por_id.get(item_id)
+
+    def obtener_dict(self, tipo: str) -> Dict[int, Dict]:
+        """Items indexados por ID"""
+        return self._obtener(tipo).por_id
+
+    @medir('catalogo.buscar')
+    def buscar_por_sintoma(self, tipo: str, sintoma: str) -> List[Dict]:
+        """
+        Buscar items que traten un síntoma
+
+        Usa el índice invertido: cada término de la consulta es un acceso
+        al diccionario. Resultados ordenados por relevancia (términos
+        coincidentes, con más peso en sintomas_que_trata), luego por
+        nivel_prioridad y por último por orden del catálogo.
+        """
+        datos = self._obtener(tipo)
+
+        puntajes = {}
+        for termino in set(terminos_busqueda(sintoma)):
+            for item_id, peso in datos.indice.get(termino, {}).items():
+                puntajes[item_id] = puntajes.get(item_id, 0) + peso
+
+        ids = sorted(puntajes, key=lambda i: (
+            -puntajes[i],
+            -(datos.por_id[i].get('nivel_prioridad') or 0),
+            datos.posicion[i]
+        ))
+
+        return [datos.por_id[i] for i in ids]
+
+    @medir('catalogo.recuperar')
+    def recuperar(self, tipo: str, consulta: str, k: int) -> List[Tuple[Dict, float]]:
+        """
+        Top-k items más parecidos a la consulta (diagnóstico + síntomas)
+
+        Ranking por similitud TF-IDF sobre CAMPOS_RECUPERACION, luego
+        nivel_prioridad y orden del catálogo. Si pocos items comparten
+        términos se completa con los primeros del catálogo (puntaje 0),
+        así la receta siempre tiene candidatos.
+        """
+        datos = self._obtener(tipo)
+        puntajes = datos.tfidf.puntuar(consulta)
+
+        ids = sorted(puntajes, key=lambda i: (
+            -puntajes[i],
+            -(datos.por_id[i].get('nivel_prioridad') or 0),
+            datos.posicion[i]
+        ))[:k]
+
+        resultado = [(datos.por_id[i], round(puntajes[i], 4)) for i in ids]
+
+        if len(resultado) < k:
+            elegidos = set(ids)
+            resultado += [(item, 0.0) for item in datos.items
+                          if item['id'] not in elegidos][:k - len(resultado)]
+
+        return resultado
+
+    def fragmentos(self, tipo: str, nombre: str, items: List[Dict]) -> List[str]:
+        """
+        Fragmentos de prompt ya formateados para estos items (mismo orden)
+
+        Los items que no están en el catálogo (p. ej. recién investigados)
+        se formatean al momento.
+        """
+        datos = self._obtener(tipo)
+        cache = datos.fragmentos(nombre)
+
+        resultado = []
+        for item in items:
+            fragmento = cache.get(item['id'])
+            if fragmento is None:
+                fragmento = FORMATOS_FRAGMENTO[(tipo, nombre)](datos.por_id.get(item['id'], item))
+            resultado.append(fragmento)
+        return resultado
+
+    def obtener_combinacion(self, tipo_combinacion: str, tipo_1: str, id_1: int,
+                            tipo_2: str, id_2: int) -> Optional[Dict]:
+        """Combinación validada entre dos items (en cualquier orden)"""
+        indice = self._obtener('combinaciones').indice
+        return indice.get(_IndiceCombinaciones.clave(tipo_combinacion, tipo_1, id_1, tipo_2, id_2))
+
+    def obtener_estadisticas(self) -> Dict:
+        """Resumen del catálogo en memoria"""
+        return {
+            'version': self._version,
+            'ttl_segundos': self.ttl_segundos,
+            'tipos': {
+                tipo: {
+                    'items': len(datos.items),
+                    'terminos_indexados': len(datos.indice),
+                    'terminos_tfidf': len(datos.tfidf.idf) if isinstance(datos, _CatalogoTipo) else 0,
+                    'edad_segundos': round(time.time() - self._cargado_en.get(tipo, 0), 1)
+                }
+                for tipo, datos in self._datos.items()
+            }
+        }
+
+
+# Singleton
+_catalogo = None
+_catalogo_lock = threading.Lock()
+
+def obtener_catalogo() -> CatalogoManager:
+    """Obtener instancia compartida del catálogo (carga en el primer uso)"""
+    global _catalogo
+    if _catalogo is None:
+        with _catalogo_lock:
+            if _catalogo is None:
+                catalogo = CatalogoManager()
+                catalogo.cargar_todo()
+                _catalogo = catalogo
+    return _catalogo
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("TEST CATÁLOGO COMPARTIDO")
+    print("="*60)
+
+    catalogo = obtener_catalogo()
+
+    stats = catalogo.obtener_estadisticas()
+    for tipo, info in stats['tipos'].items():
+        print(f"   {tipo}: {info['items']} items, {info['terminos_indexados']} términos")
+
+    print("\n🔍 Test búsqueda 'dolor':")
+    for p in catalogo.buscar_por_sintoma('productos', 'dolor'):
+        print(f"   • {p['nombre']}")
+
+    print("\n" + "="*60)
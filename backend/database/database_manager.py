@@ -3,9 +3,9 @@ Gestor de Base de Datos MySQL para Kairos
 Creado desde cero - Versión 2.0
 """
 
-import mysql.connector
 from mysql.connector import Error
 import json
+import threading
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import sys
@@ -14,10 +14,18 @@ import os
 # Agregar path para imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from config.settings import Config
+from backend.database.pool_conexiones import obtener_pool, cerrar_pool
+from backend.core.metricas import medir
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class DatabaseManager:
     """
-    Gestor de conexión y operaciones con MySQL
+    Gestor de operaciones con MySQL
+    
+    Todas las instancias comparten el pool de conexiones del proceso:
+    cada query toma una conexión prestada y la devuelve al terminar.
     """
     
     def __init__(self):
@@ -29,33 +37,38 @@ class DatabaseManager:
             'database': Config.DB_NAME,
             'port': Config.DB_PORT
         }
-        self.conexion = None
-        self.conectar()
+        self.pool = obtener_pool(self.config)
+        
+        # Último ID insertado y último error de lote, por hilo (las conexiones no son fijas)
+        self._local = threading.local()
     
     def conectar(self) -> bool:
         """
-        Establecer conexión con MySQL
+        Verificar que MySQL responde
         
         Returns:
-            bool: True si conectó exitosamente
+            bool: True si se pudo obtener una conexión válida
         """
+        return self.esta_conectado()
+    
+    def esta_conectado(self) -> bool:
+        """Comprobar conexión con MySQL usando el pool"""
         try:
-            self.conexion = mysql.connector.connect(**self.config)
-            
-            if self.conexion.is_connected():
-                print(f"✅ Conectado a {self.config['database']}")
-                return True
-            
+            with self.pool.conexion() as conexion:
+                return conexion.is_connected()
         except Error as e:
-            print(f"❌ Error al conectar: {e}")
+            logger.error("❌ Error al conectar: %s", e)
             return False
     
     def desconectar(self):
-        """Cerrar conexión"""
-        if self.conexion and self.conexion.is_connected():
-            self.conexion.close()
-            print("🔌 Desconectado de MySQL")
+        """Liberar gestor (las conexiones pertenecen al pool compartido)"""
+        pass
     
+    def cerrar_pool(self):
+        """Cerrar todas las conexiones del proceso (al apagar)"""
+        cerrar_pool()
+    
+    @medir('bd.consulta')
     def ejecutar_query(self, query: str, parametros: tuple = None) -> Optional[List[Dict]]:
         """
         Ejecutar query SELECT
@@ -68,22 +81,24 @@ class DatabaseManager:
             Lista de diccionarios con resultados
         """
         try:
-            cursor = self.conexion.cursor(dictionary=True)
-            
-            if parametros:
-                cursor.execute(query, parametros)
-            else:
-                cursor.execute(query)
-            
-            resultados = cursor.fetchall()
-            cursor.close()
+            with self.pool.conexion() as conexion:
+                cursor = conexion.cursor(dictionary=True)
+                
+                if parametros:
+                    cursor.execute(query, parametros)
+                else:
+                    cursor.execute(query)
+                
+                resultados = cursor.fetchall()
+                cursor.close()
             
             return resultados
             
         except Error as e:
-            print(f"❌ Error en query: {e}")
+            logger.error("❌ Error en query: %s", e)
             return None
     
+    @medir('bd.comando')
     def ejecutar_comando(self, query: str, parametros: tuple = None) -> bool:
         """
         Ejecutar comando INSERT/UPDATE/DELETE
@@ -96,36 +111,119 @@ class DatabaseManager:
             bool: True si ejecutó correctamente
         """
         try:
-            cursor = self.conexion.cursor()
+            with self.pool.conexion() as conexion:
+                try:
+                    cursor = conexion.cursor()
+                    
+                    if parametros:
+                        cursor.execute(query, parametros)
+                    else:
+                        cursor.execute(query)
+                    
+                    conexion.commit()
+                    self._local.ultimo_id = cursor.lastrowid or 0
+                    cursor.close()
+                    
+                except Error:
+                    conexion.rollback()
+                    raise
             
-            if parametros:
-                cursor.execute(query, parametros)
-            else:
-                cursor.execute(query)
+            return True
             
-            self.conexion.commit()
-            cursor.close()
+        except Error as e:
+            logger.error("❌ Error en comando: %s", e)
+            return False
+    
+    @medir('bd.lote')
+    def ejecutar_lote(self, query: str, lista_parametros: List[tuple]) -> bool:
+        """
+        Ejecutar el mismo comando para muchas filas (executemany, un commit)
+        
+        Returns:
+            bool: True si ejecutó correctamente
+        """
+        if not lista_parametros:
+            return True
+        
+        self._local.ultimo_error = None
+        
+        try:
+            with self.pool.conexion() as conexion:
+                try:
+                    cursor = conexion.cursor()
+                    cursor.executemany(query, lista_parametros)
+                    conexion.commit()
+                    cursor.close()
+                    
+                except Error:
+                    conexion.rollback()
+                    raise
             
             return True
             
         except Error as e:
-            print(f"❌ Error en comando: {e}")
-            self.conexion.rollback()
+            self._local.ultimo_error = e
+            logger.error("❌ Error en lote: %s", e)
             return False
     
+    def ejecutar_insert(self, query: str, parametros: tuple = None) -> Optional[int]:
+        """
+        Ejecutar INSERT y devolver el ID generado
+        
+        Returns:
+            int: ID insertado o None si falló
+        """
+        if self.ejecutar_comando(query, parametros):
+            return self.obtener_ultimo_id() or None
+        return None
+    
     def obtener_ultimo_id(self) -> int:
         """
-        Obtener último ID insertado
+        Obtener último ID insertado por este hilo
         
         Returns:
             int: ID del último registro
         """
-        cursor = self.conexion.cursor()
-        cursor.execute("SELECT LAST_INSERT_ID() as id")
-        resultado = cursor.fetchone()
-        cursor.close()
-        return resultado[0] if resultado else 0
+        return getattr(self._local, 'ultimo_id', 0)
+    
+    def obtener_ultimo_error(self) -> Optional[Error]:
+        """Error del último ejecutar_lote de este hilo (None si terminó bien)"""
+        return getattr(self._local, 'ultimo_error', None)
     
+    def obtener_estadisticas_pool(self) -> Dict:
+        """Estado del pool de conexiones"""
+        return self.pool.obtener_estadisticas()
+
+    def asegurar_columnas(self, tabla: str, columnas: Dict[str, str]) -> bool:
+        """
+        Agregar a una tabla existente las columnas que le falten
+
+        Args:
+            tabla: Nombre de la tabla
+            columnas: {nombre: definición SQL}
+
+        Returns:
+            bool: True si todas las columnas existen al terminar
+        """
+        filas = self.ejecutar_query("""
+        SELECT COLUMN_NAME AS columna FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (tabla,))
+
+        if not filas:
+            return False
+
+        existentes = {fila['columna'] for fila in filas}
+
+        for columna, definicion in columnas.items():
+            if columna in existentes:
+                continue
+            if not self.ejecutar_comando(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}"):
+                return False
+            logger.info("🛠️ Columna %s.%s agregada", tabla, columna)
+
+        return True
+
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # FUNCIONES ESPECÍFICAS - USUARIOS
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -169,7 +267,7 @@ class DatabaseManager:
         
         if self.ejecutar_comando(query, parametros):
             usuario_id = self.obtener_ultimo_id()
-            print(f"✅ Usuario creado: {nombre} (ID: {usuario_id})")
+            logger.debug("✅ Usuario creado: %s (ID: %s)", nombre, usuario_id)
             return usuario_id
         
         return 0
@@ -334,21 +432,18 @@ class DatabaseManager:
                 datos.get('modo', 'feria')
             )
             
-            cursor = self.conexion.cursor()
-            cursor.execute(query, params)
-            self.conexion.commit()
+            consulta_id = self.ejecutar_insert(query, params)
             
-            consulta_id = cursor.lastrowid
-            cursor.close()
+            if not consulta_id:
+                logger.error("❌ Error guardando consulta")
+                return 0
             
-            print(f"✅ Consulta guardada en BD (ID: {consulta_id})")
+            logger.debug("✅ Consulta guardada en BD (ID: %s)", consulta_id)
             
             return consulta_id
         
         except Exception as e:
-            print(f"❌ Error guardando consulta: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error guardando consulta: %s", e)
             return 0
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -485,7 +580,7 @@ if __name__ == "__main__":
     # Crear instancia
     db = DatabaseManager()
     
-    if db.conexion and db.conexion.is_connected():
+    if db.esta_conectado():
         print("\n✅ Conexión exitosa\n")
         
         # Probar buscar usuario
@@ -507,7 +602,7 @@ if __name__ == "__main__":
             print(f"   {key}: {value}")
         
         # Cerrar
-        db.desconectar()
+        db.cerrar_pool()
     
     else:
         print("\n❌ No se pudo conectar")
@@ -0,0 +1,444 @@
+"""
+Escritura diferida (write-behind) para MySQL
+✅ INSERTs por turno encolados y enviados en lote (executemany)
+✅ Contadores acumulados en memoria: un solo UPDATE ... + n por fila
+✅ Vaciado por tamaño de lote o por intervalo, en un hilo de fondo
+✅ Memoria acotada (máximo de pendientes)
+✅ Respaldo en SQLite local si MySQL no responde; se reenvía al volver
+✅ Filas con error de datos (FK, longitud...) se apartan sin bloquear la cola
+"""
+
+import sys
+import os
+import json
+import atexit
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from mysql.connector.errors import DatabaseError, OperationalError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+# Bloqueos que se resuelven solos (lock wait timeout, deadlock): se reintentan
+ERRORES_TRANSITORIOS = {1205, 1213}
+
+
+def ahora_sql() -> str:
+    """Fecha actual en formato DATETIME (se fija al encolar, no al vaciar)"""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def es_error_de_datos(error) -> bool:
+    """
+    Error de la fila y no de la conexión (FK, valor demasiado largo, columna...)
+
+    Reintentarlo no sirve: InterfaceError, OperationalError, PoolError y
+    los bloqueos transitorios se tratan como MySQL no disponible.
+    """
+    return (isinstance(error, DatabaseError) and not isinstance(error, OperationalError)
+            and getattr(error, 'errno', None) not in ERRORES_TRANSITORIOS)
+
+
+class EscrituraDiferida:
+    """
+    Uso:
+        escritura = obtener_escritura_diferida()
+        escritura.insertar('conversaciones', ('usuario_id', 'mensaje_usuario'), (1, 'hola'))
+        escritura.incrementar('productos_naturales', 5, {'veces_recomendado': 1})
+    """
+
+    def __init__(self, db=None, lote: int = None, intervalo: float = None,
+                 max_pendientes: int = None, ruta_sqlite: str = None,
+                 activo: bool = None):
+        """
+        Args:
+            db: DatabaseManager (por defecto uno nuevo sobre el pool compartido)
+            lote: Pendientes que disparan un vaciado inmediato
+            intervalo: Segundos máximos entre vaciados
+            max_pendientes: Tope de operaciones en memoria
+            ruta_sqlite: Archivo de respaldo si MySQL falla ('' = sin respaldo)
+            activo: False = escribir directo en MySQL (comportamiento anterior)
+        """
+        if db is None:
+            from backend.database.database_manager import DatabaseManager
+            db = DatabaseManager()
+
+        self.db = db
+        self.lote = lote or Config.ESCRITURA_DIFERIDA_LOTE
+        self.intervalo = intervalo if intervalo is not None else Config.ESCRITURA_DIFERIDA_INTERVALO
+        self.max_pendientes = max_pendientes or Config.ESCRITURA_DIFERIDA_MAX
+        self.activo = activo if activo is not None else Config.ESCRITURA_DIFERIDA_ACTIVO
+
+        # (tabla, columnas) -> lista de filas
+        self._inserciones: Dict[Tuple[str, Tuple[str, ...]], List[tuple]] = {}
+        # (tabla, columna_id, id, incrementos, asignaciones) -> [sumas, valores]
+        self._contadores: Dict[tuple, list] = {}
+        self._total = 0
+
+        self._lock = threading.Lock()
+        self._vaciado_lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+
+        # Métricas
+        self.vaciados = 0
+        self.filas_escritas = 0
+        self.filas_respaldadas = 0
+        self.descartadas = 0
+        self.rechazadas = 0
+
+        ruta = ruta_sqlite if ruta_sqlite is not None else Config.ESCRITURA_DIFERIDA_SQLITE
+        self._sqlite = None
+        if self.activo and ruta:
+            self._abrir_sqlite(ruta)
+
+        if self.activo:
+            self._hilo = threading.Thread(target=self._bucle, name='kairos-escritura', daemon=True)
+            self._hilo.start()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # ENCOLAR
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def insertar(self, tabla: str, columnas: Tuple[str, ...], valores: tuple):
+        """Encolar un INSERT (las columnas son constantes del código)"""
+        if not self.activo:
+            self._enviar_inserciones(tabla, tuple(columnas), [tuple(valores)])
+            return
+
+        with self._lock:
+            if self._total >= self.max_pendientes:
+                self._descartar_mas_antigua()
+
+            self._inserciones.setdefault((tabla, tuple(columnas)), []).append(tuple(valores))
+            self._total += 1
+            lleno = self._total >= self.lote
+
+        if lleno:
+            self._despertar.set()
+
+    def incrementar(self, tabla: str, id_fila: int, incrementos: Dict[str, float],
+                    asignar: Dict = None, columna_id: str = 'id'):
+        """
+        Acumular contadores de una fila
+
+        Args:
+            incrementos: {columna: cantidad} -> columna = columna + suma
+            asignar: {columna: valor} -> se escribe el último valor recibido
+        """
+        asignar = asignar or {}
+        clave = (tabla, columna_id, id_fila, tuple(sorted(incrementos)), tuple(sorted(asignar)))
+
+        if not self.activo:
+            self._enviar_contadores([(clave, [dict(incrementos), dict(asignar)])])
+            return
+
+        with self._lock:
+            acumulado = self._contadores.get(clave)
+
+            if acumulado is None:
+                if self._total >= self.max_pendientes:
+                    self._descartar_mas_antigua()
+                self._contadores[clave] = [dict(incrementos), dict(asignar)]
+                self._total += 1
+            else:
+                for columna, cantidad in incrementos.items():
+                    acumulado[0][columna] += cantidad
+                acumulado[1].update(asignar)
+
+            lleno = self._total >= self.lote
+
+        if lleno:
+            self._despertar.set()
+
+    def _descartar_mas_antigua(self):
+        """Memoria llena (MySQL y SQLite caídos): perder el INSERT más antiguo, o el contador si no hay"""
+        clave = next(iter(self._inserciones), None)
+        if clave is not None:
+            filas = self._inserciones[clave]
+            filas.pop(0)
+            if not filas:
+                del self._inserciones[clave]
+        else:
+            clave = next(iter(self._contadores), None)
+            if clave is None:
+                return
+            del self._contadores[clave]
+
+        self._total -= 1
+        self.descartadas += 1
+        if self.descartadas % 100 == 1:
+            logger.warning("⚠️ Escritura diferida llena: %s escrituras descartadas", self.descartadas)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # VACIADO
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+
+            try:
+                self.vaciar()
+            except Exception as e:
+                logger.error("❌ Error en escritura diferida: %s", e)
+
+    def vaciar(self) -> int:
+        """
+        Enviar todo lo pendiente a MySQL
+
+        Returns:
+            int: Operaciones enviadas (o respaldadas en SQLite)
+        """
+        with self._vaciado_lock:
+            with self._lock:
+                inserciones, self._inserciones = self._inserciones, {}
+                contadores, self._contadores = self._contadores, {}
+                total, self._total = self._total, 0
+
+            if not total:
+                self._reenviar_respaldo()
+                return 0
+
+            for (tabla, columnas), filas in inserciones.items():
+                pendientes = self._enviar_inserciones(tabla, columnas, filas)
+                if pendientes:
+                    self._respaldar('insercion', tabla, columnas, pendientes)
+
+            for clave, acumulado in self._enviar_contadores(list(contadores.items())):
+                self._respaldar('contador', clave[0], clave, [acumulado])
+
+            self.vaciados += 1
+            self._reenviar_respaldo()
+            return total
+
+    def _enviar_inserciones(self, tabla: str, columnas: Tuple[str, ...], filas: List[tuple]) -> List[tuple]:
+        """
+        Returns:
+            Filas que no se pudieron enviar por falta de conexión
+        """
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            tabla, ', '.join(columnas), ', '.join(['%s'] * len(columnas))
+        )
+        return filas[self._enviar_lote(tabla, query, filas):]
+
+    def _enviar_lote(self, tabla: str, query: str, filas: List[tuple]) -> int:
+        """
+        Enviar un lote; si falla por los datos, fila por fila apartando las inválidas
+
+        Returns:
+            Filas resueltas desde el inicio (escritas o apartadas); el resto
+            queda pendiente porque MySQL no responde
+        """
+        if self.db.ejecutar_lote(query, filas):
+            self.filas_escritas += len(filas)
+            return len(filas)
+
+        if not es_error_de_datos(self._ultimo_error()):
+            return 0
+
+        if len(filas) == 1:
+            self._rechazar(tabla, query, filas[0])
+            return 1
+
+        # Una fila inválida hace fallar todo el executemany
+        for resueltas, fila in enumerate(filas):
+            if self.db.ejecutar_lote(query, [fila]):
+                self.filas_escritas += 1
+            elif es_error_de_datos(self._ultimo_error()):
+                self._rechazar(tabla, query, fila)
+            else:
+                return resueltas
+
+        return len(filas)
+
+    def _ultimo_error(self):
+        obtener = getattr(self.db, 'obtener_ultimo_error', None)
+        return obtener() if obtener else None
+
+    def _enviar_contadores(self, contadores: List[tuple]) -> List[tuple]:
+        """
+        Agrupar por forma del UPDATE y enviar cada grupo en lote
+
+        Returns:
+            Contadores que no se pudieron enviar
+        """
+        grupos: Dict[tuple, List[tuple]] = {}
+
+        for contador in contadores:
+            tabla, columna_id, _, incs, asigs = contador[0]
+            grupos.setdefault((tabla, columna_id, incs, asigs), []).append(contador)
+
+        fallidos = []
+        for (tabla, columna_id, incs, asigs), grupo in grupos.items():
+            sets = [f"{c} = {c} + %s" for c in incs] + [f"{c} = %s" for c in asigs]
+            query = f"UPDATE {tabla} SET {', '.join(sets)} WHERE {columna_id} = %s"
+
+            filas = [
+                tuple(sumas[c] for c in incs) + tuple(valores[c] for c in asigs) + (clave[2],)
+                for clave, (sumas, valores) in grupo
+            ]
+
+            fallidos.extend(grupo[self._enviar_lote(tabla, query, filas):])
+
+        return fallidos
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # RESPALDO SQLITE
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _abrir_sqlite(self, ruta: str):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            self._sqlite = sqlite3.connect(ruta, check_same_thread=False)
+            self._sqlite.execute("""
+            CREATE TABLE IF NOT EXISTS escritura_pendiente (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT NOT NULL,
+                tabla TEXT NOT NULL,
+                clave TEXT NOT NULL,
+                filas TEXT NOT NULL
+            )
+            """)
+            self._sqlite.execute("""
+            CREATE TABLE IF NOT EXISTS escritura_rechazada (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla TEXT NOT NULL,
+                consulta TEXT NOT NULL,
+                fila TEXT NOT NULL,
+                error TEXT,
+                fecha TEXT NOT NULL
+            )
+            """)
+            self._sqlite.commit()
+
+            pendientes = self._sqlite.execute("SELECT COUNT(*) FROM escritura_pendiente").fetchone()[0]
+            if pendientes:
+                logger.info("💾 Escritura diferida: %s lotes pendientes de reenviar", pendientes)
+                self._despertar.set()
+
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Escritura diferida sin respaldo SQLite: %s", e)
+            self._sqlite = None
+
+    def _respaldar(self, tipo: str, tabla: str, clave: tuple, filas: list):
+        if not self._sqlite:
+            self.descartadas += len(filas)
+            logger.error("❌ MySQL no disponible: %s escrituras en %s perdidas", len(filas), tabla)
+            return
+        try:
+            self._sqlite.execute(
+                "INSERT INTO escritura_pendiente (tipo, tabla, clave, filas) VALUES (?, ?, ?, ?)",
+                (tipo, tabla, json.dumps(clave), json.dumps(filas, ensure_ascii=False, default=str))
+            )
+            self._sqlite.commit()
+            self.filas_respaldadas += len(filas)
+            logger.warning("💾 MySQL no disponible: %s escrituras en %s guardadas en SQLite", len(filas), tabla)
+        except (sqlite3.Error, TypeError) as e:
+            self.descartadas += len(filas)
+            logger.error("❌ Error respaldando escrituras en SQLite: %s", e)
+
+    def _rechazar(self, tabla: str, query: str, fila: tuple):
+        """Apartar una fila que MySQL rechaza por sus datos (no se reintenta)"""
+        error = self._ultimo_error()
+        self.rechazadas += 1
+        logger.error("❌ Escritura en %s rechazada por MySQL: %s", tabla, error)
+
+        if not self._sqlite:
+            return
+        try:
+            self._sqlite.execute(
+                "INSERT INTO escritura_rechazada (tabla, consulta, fila, error, fecha) VALUES (?, ?, ?, ?, ?)",
+                (tabla, query, json.dumps(fila, ensure_ascii=False, default=str), str(error), ahora_sql())
+            )
+            self._sqlite.commit()
+        except (sqlite3.Error, TypeError) as e:
+            logger.error("❌ Error guardando escritura rechazada en SQLite: %s", e)
+
+    def _reenviar_respaldo(self):
+        """Reenviar a MySQL lo guardado en SQLite (en orden de llegada)"""
+        if not self._sqlite:
+            return
+        try:
+            registros = self._sqlite.execute(
+                "SELECT id, tipo, tabla, clave, filas FROM escritura_pendiente ORDER BY id LIMIT 50"
+            ).fetchall()
+        except sqlite3.Error:
+            return
+
+        for id_registro, tipo, tabla, clave, filas in registros:
+            clave, filas = json.loads(clave), json.loads(filas)
+
+            if tipo == 'insercion':
+                pendientes = self._enviar_inserciones(tabla, tuple(clave), [tuple(f) for f in filas])
+            else:
+                clave = (clave[0], clave[1], clave[2], tuple(clave[3]), tuple(clave[4]))
+                pendientes = [acumulado for _, acumulado in self._enviar_contadores([(clave, filas[0])])]
+
+            self.filas_respaldadas -= len(filas) - len(pendientes)
+
+            if pendientes:
+                # MySQL sigue caído: se guarda solo lo no enviado y se reintenta en el próximo vaciado
+                if len(pendientes) < len(filas):
+                    self._sqlite.execute(
+                        "UPDATE escritura_pendiente SET filas = ? WHERE id = ?",
+                        (json.dumps(pendientes, ensure_ascii=False, default=str), id_registro)
+                    )
+                    self._sqlite.commit()
+                return
+
+            self._sqlite.execute("DELETE FROM escritura_pendiente WHERE id = ?", (id_registro,))
+            self._sqlite.commit()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # CIERRE Y MÉTRICAS
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def cerrar(self):
+        """Detener el hilo y vaciar lo pendiente (al apagar)"""
+        if self._hilo is None:
+            return
+
+        self._detener.set()
+        self._despertar.set()
+        self._hilo.join(timeout=self.intervalo + 5)
+        self._hilo = None
+        self.vaciar()
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return self._total
+
+    def obtener_estadisticas(self) -> Dict:
+        return {
+            'activo': self.activo,
+            'pendientes': self.pendientes(),
+            'vaciados': self.vaciados,
+            'filas_escritas': self.filas_escritas,
+            'filas_respaldadas': max(self.filas_respaldadas, 0),
+            'descartadas': self.descartadas,
+            'rechazadas': self.rechazadas
+        }
+
+
+# Singleton
+_escritura = None
+_escritura_lock = threading.Lock()
+
+def obtener_escritura_diferida() -> EscrituraDiferida:
+    """Obtener cola de escritura compartida del proceso"""
+    global _escritura
+    if _escritura is None:
+        with _escritura_lock:
+            if _escritura is None:
+                _escritura = EscrituraDiferida()
+                atexit.register(_escritura.cerrar)
+    return _escritura
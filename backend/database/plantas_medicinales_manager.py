@@ -9,85 +9,39 @@ from typing import List, Dict, Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from backend.database.database_manager import DatabaseManager
+from backend.database.catalogo_manager import obtener_catalogo
 
 class PlantasMedicinalesManager:
-    """Gestor de plantas medicinales desde BD"""
+    """Gestor de plantas medicinales (lee del catálogo compartido)"""
     
     def __init__(self):
         self.db = DatabaseManager()
-        self.catalogo = None
-        self._cargar_desde_bd()
+        self.catalogo_compartido = obtener_catalogo()
+    
+    @property
+    def catalogo(self) -> List[Dict]:
+        """Plantas activas desde el catálogo compartido"""
+        return self.catalogo_compartido.obtener_todos('plantas')
     
     def _cargar_desde_bd(self):
-        """Cargar plantas desde BD"""
-        try:
-            query = """
-            SELECT 
-                id,
-                nombre_comun,
-                nombre_cientifico,
-                categoria,
-                descripcion,
-                propiedades_curativas,
-                sintomas_que_trata,
-                formas_preparacion,
-                dosis_recomendada,
-                frecuencia_uso,
-                duracion_tratamiento,
-                mejor_momento_tomar,
-                contraindicaciones,
-                efectos_secundarios,
-                advertencias,
-                veces_recomendado,
-                activo
-            FROM plantas_medicinales 
-            WHERE activo = TRUE 
-            ORDER BY veces_recomendado DESC
-            """
-            
-            plantas = self.db.ejecutar_query(query)
-            
-            if plantas:
-                self.catalogo = plantas
-                print(f"🌿 Plantas Medicinales Manager inicializado ({len(plantas)} plantas)")
-            else:
-                self.catalogo = []
-        
-        except Exception as e:
-            print(f"❌ Error cargando plantas: {e}")
-            self.catalogo = []
+        """Forzar recarga de plantas desde BD"""
+        self.catalogo_compartido.recargar('plantas')
     
     def obtener_todas(self) -> List[Dict]:
         """Obtener todas las plantas activas"""
-        return self.catalogo if self.catalogo else []
+        return self.catalogo
     
     def obtener_por_id(self, planta_id: int) -> Optional[Dict]:
         """Obtener planta por ID"""
-        if not self.catalogo:
-            return None
-        
-        for planta in self.catalogo:
-            if planta['id'] == planta_id:
-                return planta
-        
-        return None
+        return self.catalogo_compartido.obtener_por_id('plantas', planta_id)
     
     def buscar_por_sintoma(self, sintoma: str) -> List[Dict]:
         """Buscar plantas por síntoma"""
-        if not self.catalogo:
-            return []
-        
-        sintoma_lower = sintoma.lower()
-        resultados = []
-        
-        for planta in self.catalogo:
-            sintomas = (planta.get('sintomas_que_trata') or '').lower()
-            propiedades = (planta.get('propiedades_curativas') or '').lower()
-            
-            if sintoma_lower in sintomas or sintoma_lower in propiedades:
-                resultados.append(planta)
-        
-        return resultados
+        return self.catalogo_compartido.buscar_por_sintoma('plantas', sintoma)
+    
+    def recuperar(self, consulta: str, k: int) -> List[Dict]:
+        """Top-k plantas para la consulta (índice TF-IDF del catálogo)"""
+        return [item for item, _ in self.catalogo_compartido.recuperar('plantas', consulta, k)]
     
     def incrementar_uso(self, planta_id: int):
         """Incrementar contador de uso"""
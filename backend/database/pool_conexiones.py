@@ -0,0 +1,257 @@
+"""
+Pool de conexiones MySQL para Kairos
+✅ Conexiones reutilizables entre sesiones e hilos
+✅ Tamaño y timeout de espera configurables
+✅ Verificación (ping) al prestar una conexión inactiva
+✅ Reconexión automática si MySQL cortó la conexión
+"""
+
+import sys
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config.settings import Config
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones MySQL thread-safe
+
+    Las conexiones se crean bajo demanda hasta `tamano`. Si todas están
+    prestadas, se espera hasta `timeout` segundos antes de fallar.
+    """
+
+    def __init__(self, config: Dict, tamano: int = None, timeout: float = None,
+                 ping_inactiva: float = None):
+        """
+        Inicializar pool
+
+        Args:
+            config: Parámetros de mysql.connector.connect
+            tamano: Máximo de conexiones abiertas
+            timeout: Segundos de espera para obtener conexión
+            ping_inactiva: Segundos de inactividad tras los que se verifica la conexión
+        """
+        self.config = config
+        self.tamano = tamano or Config.DB_POOL_SIZE
+        self.timeout = timeout if timeout is not None else Config.DB_POOL_TIMEOUT
+        self.ping_inactiva = ping_inactiva if ping_inactiva is not None else Config.DB_POOL_PING
+
+        # LIFO: se reutilizan primero las conexiones más recientes (más "calientes")
+        self._disponibles = []
+        # Avisa a quien espera al devolver una conexión o al liberarse un cupo
+        self._condicion = threading.Condition()
+        self._creadas = 0
+        self._cerrado = False
+
+        # Métricas
+        self.prestamos = 0
+        self.esperas = 0
+        self.reconexiones = 0
+        self.agotado = 0
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # PRÉSTAMO Y DEVOLUCIÓN
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def obtener(self, timeout: float = None):
+        """
+        Obtener conexión del pool
+
+        Raises:
+            PoolError: Si no hay conexión disponible dentro del timeout
+        """
+        if self._cerrado:
+            raise PoolError("Pool de conexiones cerrado")
+
+        timeout = self.timeout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        espero = False
+
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise PoolError("Pool de conexiones cerrado")
+
+                # 1. Conexión libre
+                if self._disponibles:
+                    conexion, ultimo_uso = self._disponibles.pop()
+                    break
+
+                # 2. Crear una nueva si hay cupo
+                if self._creadas < self.tamano:
+                    self._creadas += 1
+                    conexion = None
+                    break
+
+                # 3. Esperar a que otra petición devuelva una o se libere un cupo
+                if not espero:
+                    espero = True
+                    self.esperas += 1
+
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.agotado += 1
+                    raise PoolError(
+                        f"Pool agotado: {self.tamano} conexiones en uso tras {timeout}s"
+                    )
+                self._condicion.wait(restante)
+
+        self.prestamos += 1
+
+        if conexion is None:
+            try:
+                return self._crear_conexion()
+            except Error:
+                self._liberar_cupo()
+                raise
+
+        return self._verificar(conexion, ultimo_uso)
+
+    def devolver(self, conexion):
+        """Devolver conexión al pool"""
+        if conexion is None:
+            return
+
+        if self._cerrado:
+            self._cerrar_conexion(conexion)
+            return
+
+        try:
+            # No dejar transacciones abiertas (evita lecturas con snapshot viejo)
+            if conexion.in_transaction:
+                conexion.rollback()
+        except Error:
+            self._descartar(conexion)
+            return
+
+        with self._condicion:
+            self._disponibles.append((conexion, time.time()))
+            self._condicion.notify()
+
+    @contextmanager
+    def conexion(self, timeout: float = None):
+        """Context manager: obtiene y devuelve una conexión"""
+        conexion = self.obtener(timeout)
+        try:
+            yield conexion
+        finally:
+            self.devolver(conexion)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # INTERNOS
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _crear_conexion(self):
+        """Abrir conexión física nueva"""
+        conexion = mysql.connector.connect(**self.config)
+
+        if self._creadas == 1:
+            logger.info("✅ Conectado a %s (pool de %s)", self.config['database'], self.tamano)
+
+        return conexion
+
+    def _verificar(self, conexion, ultimo_uso: float):
+        """Ping a conexiones inactivas; reconectar si MySQL la cerró"""
+        if time.time() - ultimo_uso < self.ping_inactiva:
+            return conexion
+
+        try:
+            conexion.ping(reconnect=True, attempts=2, delay=0)
+            return conexion
+
+        except Error:
+            # Reemplazarla en el mismo cupo
+            self.reconexiones += 1
+            self._cerrar_conexion(conexion)
+            try:
+                return self._crear_conexion()
+            except Error:
+                self._liberar_cupo()
+                raise
+
+    def _descartar(self, conexion):
+        """Cerrar conexión rota y liberar su cupo"""
+        self._cerrar_conexion(conexion)
+        self._liberar_cupo()
+
+    def _liberar_cupo(self):
+        """Descontar una conexión abierta y despertar a quien espera para que cree otra"""
+        with self._condicion:
+            self._creadas -= 1
+            self._condicion.notify()
+
+    def _cerrar_conexion(self, conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # ADMINISTRACIÓN
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def cerrar(self):
+        """Cerrar todas las conexiones libres (las prestadas se cierran al devolverse)"""
+        with self._condicion:
+            self._cerrado = True
+            libres, self._disponibles = self._disponibles, []
+            self._condicion.notify_all()
+
+        for conexion, _ in libres:
+            self._descartar(conexion)
+
+        logger.info("🔌 Pool MySQL cerrado")
+
+    def obtener_estadisticas(self) -> Dict:
+        """Estado del pool"""
+        libres = len(self._disponibles)
+        return {
+            'tamano': self.tamano,
+            'abiertas': self._creadas,
+            'libres': libres,
+            'en_uso': self._creadas - libres,
+            'prestamos': self.prestamos,
+            'esperas': self.esperas,
+            'reconexiones': self.reconexiones,
+            'agotado': self.agotado
+        }
+
+
+# Singleton
+_pool = None
+_pool_lock = threading.Lock()
+
+def obtener_pool(config: Dict = None) -> PoolConexiones:
+    """Obtener pool compartido del proceso"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexiones(config or {
+                    'host': Config.DB_HOST,
+                    'user': Config.DB_USER,
+                    'password': Config.DB_PASSWORD,
+                    'database': Config.DB_NAME,
+                    'port': Config.DB_PORT
+                })
+    return _pool
+
+def cerrar_pool():
+    """Cerrar el pool compartido (al apagar el proceso)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
@@ -9,81 +9,61 @@ import sys
 import os
 from typing import List, Dict, Optional
 import json
-import requests
 
 # Agregar path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.database.database_manager import DatabaseManager
+from backend.database.catalogo_manager import obtener_catalogo
+from backend.database.escritura_diferida import obtener_escritura_diferida
 from backend.core.ia_config_manager import IAConfigManager
+from backend.core.llm_client import obtener_cliente_llm
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class ProductosManager:
-    """Gestor de productos desde BD MySQL"""
+    """Gestor de productos (lee del catálogo compartido)"""
     
     def __init__(self):
         self.db = DatabaseManager()
         self.ia_config = IAConfigManager()
-        self.catalogo = None
-        self.productos_dict = {}
-        
-        # Cargar desde BD
-        self._cargar_desde_bd()
+        self.llm = obtener_cliente_llm()
+        self.catalogo_compartido = obtener_catalogo()
+    
+    @property
+    def catalogo(self) -> List[Dict]:
+        """Productos activos desde el catálogo compartido"""
+        return self.catalogo_compartido.obtener_todos('productos')
+    
+    @property
+    def productos_dict(self) -> Dict[int, Dict]:
+        """Productos indexados por ID"""
+        return self.catalogo_compartido.obtener_dict('productos')
     
     def _cargar_desde_bd(self):
-        """Cargar productos desde MySQL"""
-        try:
-            query = """
-            SELECT * FROM productos_naturales 
-            WHERE activo = TRUE 
-            ORDER BY nivel_prioridad DESC, veces_recomendado DESC
-            """
-            
-            productos = self.db.ejecutar_query(query)
-            
-            if productos:
-                self.catalogo = productos
-                self.productos_dict = {p['id']: p for p in productos}
-                
-                print(f"📦 Productos cargados desde BD: {len(productos)} activos")
-                for p in productos:
-                    print(f"   - {p['nombre']} (S/. {float(p['precio']):.0f})")
-            else:
-                print("⚠️ No hay productos en BD")
-                self.catalogo = []
-        
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            self.catalogo = []
+        """Forzar recarga de productos desde BD"""
+        self.catalogo_compartido.recargar('productos')
     
     def obtener_todos(self) -> List[Dict]:
         """Todos los productos activos"""
-        return self.catalogo if self.catalogo else []
+        return self.catalogo
     
     def obtener_por_id(self, producto_id: int) -> Optional[Dict]:
         """Producto por ID"""
-        return self.productos_dict.get(producto_id)
+        return self.catalogo_compartido.obtener_por_id('productos', producto_id)
     
     def buscar_por_sintoma(self, sintoma: str) -> List[Dict]:
         """Buscar por síntoma"""
-        if not self.catalogo:
-            return []
-        
-        sintoma_lower = sintoma.lower()
-        resultados = []
-        
-        for p in self.catalogo:
-            sintomas = (p.get('sintomas_que_trata') or '').lower()
-            para_que = (p.get('para_que_sirve') or '').lower()
-            
-            if sintoma_lower in sintomas or sintoma_lower in para_que:
-                resultados.append(p)
-        
-        return resultados
+        return self.catalogo_compartido.buscar_por_sintoma('productos', sintoma)
+    
+    def recuperar(self, consulta: str, k: int) -> List[Dict]:
+        """Top-k productos para la consulta (índice TF-IDF del catálogo)"""
+        return [item for item, _ in self.catalogo_compartido.recuperar('productos', consulta, k)]
     
     def incrementar_recomendacion(self, producto_id: int):
-        """Incrementar recomendaciones"""
-        query = "UPDATE productos_naturales SET veces_recomendado = veces_recomendado + 1 WHERE id = %s"
-        self.db.ejecutar_comando(query, (producto_id,))
+        """Incrementar recomendaciones (contador diferido)"""
+        obtener_escritura_diferida().incrementar('productos_naturales', producto_id, {'veces_recomendado': 1})
     
     def enriquecer_producto_con_gpt(self, producto_id: int) -> bool:
         """Enriquecer info con GPT"""
@@ -94,7 +74,7 @@ class ProductosManager:
         if not producto or (producto.get('para_que_sirve') and producto.get('sintomas_que_trata')):
             return True
         
-        print(f"🔍 Buscando info: {producto['nombre']}")
+        logger.debug("🔍 Buscando info: %s", producto['nombre'])
         
         prompt = f"""Información sobre: {producto['nombre']}
 
@@ -110,23 +90,19 @@ SOLO JSON:
         try:
             config = self.ia_config.obtener_config()
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={'Authorization': f"Bearer {config['api_key']}", 'Content-Type': 'application/json'},
-                json={
-                    'model': config['modelo'],
-                    'messages': [
-                        {'role': 'system', 'content': 'Eres experto en medicina natural. SOLO JSON.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 600
-                },
+            data = self.llm.chat(
+                api_key=config['api_key'],
+                modelo=config['modelo'],
+                mensajes=[
+                    {'role': 'system', 'content': 'Eres experto en medicina natural. SOLO JSON.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperatura=0.3,
+                max_tokens=600,
                 timeout=25
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 contenido = data['choices'][0]['message']['content'].strip()
                 contenido = contenido.replace('```json', '').replace('```', '').strip()
                 
@@ -151,12 +127,12 @@ SOLO JSON:
                     producto_id
                 ))
                 
-                print(f"✅ Enriquecido: {producto['nombre']}")
-                self._cargar_desde_bd()
+                logger.debug("✅ Enriquecido: %s", producto['nombre'])
+                self.catalogo_compartido.actualizar_item('productos', producto_id)
                 return True
         
         except Exception as e:
-            print(f"❌ Error: {e}")
+            logger.error("❌ Error: %s", e)
         
         return False
 
@@ -9,86 +9,39 @@ from typing import List, Dict, Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from backend.database.database_manager import DatabaseManager
+from backend.database.catalogo_manager import obtener_catalogo
 
 class RemediosCaserosManager:
-    """Gestor de remedios caseros desde BD"""
+    """Gestor de remedios caseros (lee del catálogo compartido)"""
     
     def __init__(self):
         self.db = DatabaseManager()
-        self.catalogo = None
-        self._cargar_desde_bd()
+        self.catalogo_compartido = obtener_catalogo()
+    
+    @property
+    def catalogo(self) -> List[Dict]:
+        """Remedios activos desde el catálogo compartido"""
+        return self.catalogo_compartido.obtener_todos('remedios')
     
     def _cargar_desde_bd(self):
-        """Cargar remedios desde BD"""
-        try:
-            query = """
-            SELECT 
-                id,
-                nombre,
-                categoria,
-                descripcion,
-                ingredientes_json,
-                ingredientes_texto,
-                sintomas_que_trata,
-                propiedades,
-                preparacion_paso_a_paso,
-                como_aplicar,
-                frecuencia,
-                duracion_tratamiento,
-                mejor_momento,
-                contraindicaciones,
-                advertencias,
-                temperatura,
-                veces_recomendado,
-                activo
-            FROM remedios_caseros 
-            WHERE activo = TRUE 
-            ORDER BY veces_recomendado DESC
-            """
-            
-            remedios = self.db.ejecutar_query(query)
-            
-            if remedios:
-                self.catalogo = remedios
-                print(f"🍯 Remedios Caseros Manager inicializado ({len(remedios)} remedios)")
-            else:
-                self.catalogo = []
-        
-        except Exception as e:
-            print(f"❌ Error cargando remedios: {e}")
-            self.catalogo = []
+        """Forzar recarga de remedios desde BD"""
+        self.catalogo_compartido.recargar('remedios')
     
     def obtener_todos(self) -> List[Dict]:
         """Obtener todos los remedios activos"""
-        return self.catalogo if self.catalogo else []
+        return self.catalogo
     
     def obtener_por_id(self, remedio_id: int) -> Optional[Dict]:
         """Obtener remedio por ID"""
-        if not self.catalogo:
-            return None
-        
-        for remedio in self.catalogo:
-            if remedio['id'] == remedio_id:
-                return remedio
-        
-        return None
+        return self.catalogo_compartido.obtener_por_id('remedios', remedio_id)
     
     def buscar_por_sintoma(self, sintoma: str) -> List[Dict]:
         """Buscar remedios por síntoma"""
-        if not self.catalogo:
-            return []
-        
-        sintoma_lower = sintoma.lower()
-        resultados = []
-        
-        for remedio in self.catalogo:
-            sintomas = (remedio.get('sintomas_que_trata') or '').lower()
-            descripcion = (remedio.get('descripcion') or '').lower()
-            
-            if sintoma_lower in sintomas or sintoma_lower in descripcion:
-                resultados.append(remedio)
-        
-        return resultados
+        return self.catalogo_compartido.buscar_por_sintoma('remedios', sintoma)
+    
+    def recuperar(self, consulta: str, k: int) -> List[Dict]:
+        """Top-k remedios para la consulta (índice TF-IDF del catálogo)"""
+        return [item for item, _ in self.catalogo_compartido.recuperar('remedios', consulta, k)]
     
     def incrementar_uso(self, remedio_id: int):
         """Incrementar contador de uso"""
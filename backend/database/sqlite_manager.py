@@ -14,6 +14,9 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.insert(0, BASE_DIR)
 
 from backend.database.database_manager import DatabaseManager
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
 
 class SQLiteManager:
     """
@@ -47,8 +50,8 @@ class SQLiteManager:
         # Crear base de datos y tablas
         self._crear_tablas()
         
-        print(f"✅ SQLite Manager inicializado")
-        print(f"   Base de datos: {self.db_path}")
+        logger.info("✅ SQLite Manager inicializado")
+        logger.debug("Base de datos: %s", self.db_path)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # CONEXIÓN Y ESTRUCTURA
@@ -271,7 +274,7 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"✅ Usuario offline creado: {nombre} (ID: {usuario_id})")
+        logger.debug("✅ Usuario offline creado: %s (ID: %s)", nombre, usuario_id)
         
         return usuario_id
     
@@ -304,7 +307,7 @@ class SQLiteManager:
             return True
             
         except Exception as e:
-            print(f"❌ Error guardando sesión offline: {e}")
+            logger.error("❌ Error guardando sesión offline: %s", e)
             return False
             
         finally:
@@ -354,7 +357,7 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"✅ Consulta offline guardada (ID: {consulta_id})")
+        logger.debug("✅ Consulta offline guardada (ID: %s)", consulta_id)
         
         return consulta_id
     
@@ -436,11 +439,11 @@ class SQLiteManager:
             ))
             
             conn.commit()
-            print(f"✅ Conocimiento guardado en caché: {conocimiento['condicion']}")
+            logger.info("✅ Conocimiento guardado en caché: %s", conocimiento['condicion'])
             return True
             
         except Exception as e:
-            print(f"❌ Error guardando conocimiento: {e}")
+            logger.error("❌ Error guardando conocimiento: %s", e)
             return False
             
         finally:
@@ -461,9 +464,7 @@ class SQLiteManager:
         Returns:
             Dict con resultado de sincronización
         """
-        print(f"\n{'='*70}")
-        print("📥 SINCRONIZANDO DESDE MYSQL → SQLITE")
-        print(f"{'='*70}\n")
+        logger.info("📥 SINCRONIZANDO DESDE MYSQL → SQLITE")
         
         inicio = datetime.now()
         
@@ -483,24 +484,21 @@ class SQLiteManager:
             duracion = (datetime.now() - inicio).total_seconds()
             self._registrar_log_sync('completa', 'mysql_to_sqlite', resultado, duracion)
             
-            print(f"\n{'='*70}")
-            print("✅ SINCRONIZACIÓN COMPLETADA")
-            print(f"{'='*70}")
-            print(f"   Productos: {resultado['productos']} registros")
-            print(f"   Conocimientos: {resultado['conocimientos']} registros")
-            print(f"   Duración: {duracion:.1f}s")
-            print(f"{'='*70}\n")
+            logger.info("✅ SINCRONIZACIÓN COMPLETADA")
+            logger.debug("Productos: %s registros", resultado['productos'])
+            logger.debug("Conocimientos: %s registros", resultado['conocimientos'])
+            logger.debug("Duración: %.1fs", duracion)
             
             return resultado
             
         except Exception as e:
-            print(f"❌ Error en sincronización: {e}")
+            logger.error("❌ Error en sincronización: %s", e)
             return {'error': str(e)}
     
     def _sincronizar_productos_desde_mysql(self, mysql: DatabaseManager) -> int:
         """Sincronizar productos desde MySQL"""
         
-        print("📦 Sincronizando productos...")
+        logger.info("📦 Sincronizando productos...")
         
         # Obtener productos de MySQL
         productos = mysql.ejecutar_query("""
@@ -508,7 +506,7 @@ class SQLiteManager:
         """)
         
         if not productos:
-            print("   ⚠️ No hay productos en MySQL")
+            logger.warning("⚠️ No hay productos en MySQL")
             return 0
         
         conn = self.conectar()
@@ -549,22 +547,20 @@ class SQLiteManager:
                 sincronizados += 1
                 
             except Exception as e:
-                print(f"   ⚠️ Error en producto '{p.get('nombre', 'desconocido')}': {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("⚠️ Error en producto '%s': %s", p.get('nombre', 'desconocido'), e, exc_info=True)
                 continue
         
         conn.commit()
         conn.close()
         
-        print(f"   ✅ {sincronizados} productos sincronizados")
+        logger.info("✅ %s productos sincronizados", sincronizados)
         
         return sincronizados
     
     def _sincronizar_conocimientos_desde_mysql(self, mysql: DatabaseManager) -> int:
         """Sincronizar conocimientos desde MySQL"""
         
-        print("🧠 Sincronizando conocimientos...")
+        logger.info("🧠 Sincronizando conocimientos...")
         
         # Obtener conocimientos más usados
         conocimientos = mysql.ejecutar_query("""
@@ -574,7 +570,7 @@ class SQLiteManager:
         """)
         
         if not conocimientos:
-            print("   ⚠️ No hay conocimientos en MySQL")
+            logger.warning("⚠️ No hay conocimientos en MySQL")
             return 0
         
         conn = self.conectar()
@@ -604,7 +600,7 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"   ✅ {len(conocimientos)} conocimientos sincronizados")
+        logger.info("✅ %s conocimientos sincronizados", len(conocimientos))
         
         return len(conocimientos)
     
@@ -616,9 +612,7 @@ class SQLiteManager:
         Returns:
             Dict con resultado de sincronización
         """
-        print(f"\n{'='*70}")
-        print("📤 SINCRONIZANDO DESDE SQLITE → MYSQL")
-        print(f"{'='*70}\n")
+        logger.info("📤 SINCRONIZANDO DESDE SQLITE → MYSQL")
         
         inicio = datetime.now()
         
@@ -637,25 +631,22 @@ class SQLiteManager:
             duracion = (datetime.now() - inicio).total_seconds()
             self._registrar_log_sync('pendientes', 'sqlite_to_mysql', resultado, duracion)
             
-            print(f"\n{'='*70}")
-            print("✅ SINCRONIZACIÓN COMPLETADA")
-            print(f"{'='*70}")
-            print(f"   Usuarios: {resultado['usuarios']} registros")
-            print(f"   Consultas: {resultado['consultas']} registros")
-            print(f"   Sesiones: {resultado['sesiones']} registros")
-            print(f"   Duración: {duracion:.1f}s")
-            print(f"{'='*70}\n")
+            logger.info("✅ SINCRONIZACIÓN COMPLETADA")
+            logger.debug("Usuarios: %s registros", resultado['usuarios'])
+            logger.debug("Consultas: %s registros", resultado['consultas'])
+            logger.debug("Sesiones: %s registros", resultado['sesiones'])
+            logger.debug("Duración: %.1fs", duracion)
             
             return resultado
             
         except Exception as e:
-            print(f"❌ Error en sincronización: {e}")
+            logger.error("❌ Error en sincronización: %s", e)
             return {'error': str(e)}
     
     def _sincronizar_usuarios_hacia_mysql(self, mysql: DatabaseManager) -> int:
         """Sincronizar usuarios hacia MySQL"""
         
-        print("👥 Sincronizando usuarios...")
+        logger.info("👥 Sincronizando usuarios...")
         
         conn = self.conectar()
         cursor = conn.cursor()
@@ -665,7 +656,7 @@ class SQLiteManager:
         usuarios = cursor.fetchall()
         
         if not usuarios:
-            print("   ℹ️ No hay usuarios pendientes")
+            logger.debug("ℹ️ No hay usuarios pendientes")
             conn.close()
             return 0
         
@@ -702,14 +693,14 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"   ✅ {sincronizados} usuarios sincronizados")
+        logger.info("✅ %s usuarios sincronizados", sincronizados)
         
         return sincronizados
     
     def _sincronizar_consultas_hacia_mysql(self, mysql: DatabaseManager) -> int:
         """Sincronizar consultas hacia MySQL"""
         
-        print("🏥 Sincronizando consultas...")
+        logger.info("🏥 Sincronizando consultas...")
         
         conn = self.conectar()
         cursor = conn.cursor()
@@ -718,7 +709,7 @@ class SQLiteManager:
         consultas = cursor.fetchall()
         
         if not consultas:
-            print("   ℹ️ No hay consultas pendientes")
+            logger.debug("ℹ️ No hay consultas pendientes")
             conn.close()
             return 0
         
@@ -752,14 +743,14 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"   ✅ {sincronizados} consultas sincronizadas")
+        logger.info("✅ %s consultas sincronizadas", sincronizados)
         
         return sincronizados
     
     def _sincronizar_sesiones_hacia_mysql(self, mysql: DatabaseManager) -> int:
         """Sincronizar sesiones hacia MySQL"""
         
-        print("📋 Sincronizando sesiones...")
+        logger.info("📋 Sincronizando sesiones...")
         
         conn = self.conectar()
         cursor = conn.cursor()
@@ -768,7 +759,7 @@ class SQLiteManager:
         sesiones = cursor.fetchall()
         
         if not sesiones:
-            print("   ℹ️ No hay sesiones pendientes")
+            logger.debug("ℹ️ No hay sesiones pendientes")
             conn.close()
             return 0
         
@@ -798,7 +789,7 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"   ✅ {sincronizados} sesiones sincronizadas")
+        logger.info("✅ %s sesiones sincronizadas", sincronizados)
         
         return sincronizados
     
@@ -892,7 +883,7 @@ class SQLiteManager:
         conn.commit()
         conn.close()
         
-        print(f"✅ {eliminados} registros antiguos eliminados")
+        logger.debug("✅ %s registros antiguos eliminados", eliminados)
         
         return eliminados
 
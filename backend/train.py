@@ -161,10 +161,11 @@ class TrainerKairos:
             ejemplo = self.datos[self.datos['intencion'] == intencion].iloc[0]
             ejemplos_prueba.append((ejemplo['entrada'], ejemplo['intencion']))
         
-        # Probar cada uno
+        # Probar todos en un solo lote
+        predicciones = self.classifier.predecir_lote([texto for texto, _ in ejemplos_prueba])
+        
         aciertos = 0
-        for texto, intencion_real in ejemplos_prueba:
-            intencion_pred, confianza, _ = self.classifier.predecir(texto)
+        for (texto, intencion_real), (intencion_pred, confianza, _) in zip(ejemplos_prueba, predicciones):
             
             resultado = "✅" if intencion_pred == intencion_real else "❌"
             
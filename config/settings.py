@@ -15,10 +15,111 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'kairos_medico')
     DB_PORT = int(os.getenv('DB_PORT', 3306))
     
+    # Pool de conexiones MySQL
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+    DB_POOL_PING = float(os.getenv('DB_POOL_PING', 30))  # segundos inactiva antes de verificar
+    
     # API
+    API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 5000))
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     
+    # Servidor de producción (wsgi.py / gunicorn.conf.py)
+    # Procesos: con sesiones en memoria solo 1 (cada worker tendría las suyas)
+    API_WORKERS = int(os.getenv('API_WORKERS', 2 if os.getenv('SESIONES_BACKEND', 'memoria') == 'sqlite' else 1))
+    API_HILOS = int(os.getenv('API_HILOS', 8))  # hilos por proceso
+    API_TIMEOUT = int(os.getenv('API_TIMEOUT', 120))  # máximo por petición (diagnóstico incluido)
+    API_APAGADO_TIMEOUT = int(os.getenv('API_APAGADO_TIMEOUT', 60))  # espera de diagnósticos en curso
+    ARRANQUE_PRESUPUESTO_MS = float(os.getenv('ARRANQUE_PRESUPUESTO_MS', 3000))  # test_arranque.py
+    
+    # Catálogo compartido (segundos)
+    CATALOGO_TTL = int(os.getenv('CATALOGO_TTL', 900))
+    CATALOGO_VERSION_CHECK = int(os.getenv('CATALOGO_VERSION_CHECK', 30))
+    CATALOGO_REINTENTO = int(os.getenv('CATALOGO_REINTENTO', 30))
+    
+    # Diagnóstico (etapas en paralelo, tiempos en segundos)
+    DIAGNOSTICO_CONCURRENTE = os.getenv('DIAGNOSTICO_CONCURRENTE', 'True').lower() == 'true'
+    DIAGNOSTICO_HILOS = int(os.getenv('DIAGNOSTICO_HILOS', 8))
+    DIAGNOSTICO_TIMEOUT_ETAPA = float(os.getenv('DIAGNOSTICO_TIMEOUT_ETAPA', 30))
+    DIAGNOSTICO_DEADLINE = float(os.getenv('DIAGNOSTICO_DEADLINE', 50))
+    
+    # Candidatos del catálogo en el prompt de la receta (preselección TF-IDF)
+    RECETA_TOP_PRODUCTOS = int(os.getenv('RECETA_TOP_PRODUCTOS', 8))
+    RECETA_TOP_PLANTAS = int(os.getenv('RECETA_TOP_PLANTAS', 10))
+    RECETA_TOP_REMEDIOS = int(os.getenv('RECETA_TOP_REMEDIOS', 6))
+    
+    # Presupuesto de tokens de entrada por llamada GPT (turnos antiguos -> resumen clínico)
+    PROMPT_PRESUPUESTO_TOKENS = int(os.getenv('PROMPT_PRESUPUESTO_TOKENS', 2000))
+    PROMPT_PRESUPUESTO_DIAGNOSTICO = int(os.getenv('PROMPT_PRESUPUESTO_DIAGNOSTICO', 3000))
+    PROMPT_TURNOS_RECIENTES = int(os.getenv('PROMPT_TURNOS_RECIENTES', 8))
+    
+    # Consumo de IA: tokens y costo real de cada llamada, vaciado en lote a MySQL
+    CONSUMO_IA_INTERVALO = float(os.getenv('CONSUMO_IA_INTERVALO', 60))  # segundos
+    TIPO_CAMBIO_USD_PEN = float(os.getenv('TIPO_CAMBIO_USD_PEN', 3.8))  # gasto_mes_actual va en soles
+    
+    # Gobernador de IA: topes y ritmo de llamadas GPT por proceso
+    IA_LIMITE_RPM = int(os.getenv('IA_LIMITE_RPM', 60))  # llamadas por minuto (0 = sin límite)
+    IA_PRESUPUESTO_DIARIO = float(os.getenv('IA_PRESUPUESTO_DIARIO', 0))  # soles (0 = sin tope)
+    IA_SINCRONIZACION = float(os.getenv('IA_SINCRONIZACION', 30))  # segundos entre lecturas de MySQL
+    
+    # Cliente LLM (OpenAI o stub local compatible)
+    LLM_BASE_URL = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+    LLM_MAX_CONCURRENTES = int(os.getenv('LLM_MAX_CONCURRENTES', 8))
+    LLM_POOL_CONEXIONES = int(os.getenv('LLM_POOL_CONEXIONES', 10))
+    LLM_REINTENTOS = int(os.getenv('LLM_REINTENTOS', 3))
+    LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+    
+    # Caché de respuestas GPT (primeros turnos de la conversación)
+    CACHE_RESPUESTAS_ACTIVO = os.getenv('CACHE_RESPUESTAS_ACTIVO', 'True').lower() == 'true'
+    CACHE_RESPUESTAS_MAX = int(os.getenv('CACHE_RESPUESTAS_MAX', 2000))
+    CACHE_RESPUESTAS_TTL = int(os.getenv('CACHE_RESPUESTAS_TTL', 86400))
+    CACHE_RESPUESTAS_TURNOS = int(os.getenv('CACHE_RESPUESTAS_TURNOS', 2))
+    CACHE_RESPUESTAS_SQLITE = os.getenv('CACHE_RESPUESTAS_SQLITE', '')  # vacío = solo memoria
+    
+    # Caché de diagnósticos (conocimientos_completos)
+    CACHE_DIAGNOSTICO_ACTIVO = os.getenv('CACHE_DIAGNOSTICO_ACTIVO', 'True').lower() == 'true'
+    CACHE_DIAGNOSTICO_UMBRAL = float(os.getenv('CACHE_DIAGNOSTICO_UMBRAL', 0.75))  # similitud 0-1
+    CACHE_DIAGNOSTICO_CONFIANZA = float(os.getenv('CACHE_DIAGNOSTICO_CONFIANZA', 0.7))
+    CACHE_DIAGNOSTICO_MAX_FILAS = int(os.getenv('CACHE_DIAGNOSTICO_MAX_FILAS', 5000))
+    
+    # Índice de respuestas aprendidas (similitud coseno 0-1)
+    RESPUESTAS_UMBRAL_SIMILITUD = float(os.getenv('RESPUESTAS_UMBRAL_SIMILITUD', 0.75))
+    RESPUESTAS_TOP_K = int(os.getenv('RESPUESTAS_TOP_K', 3))
+    RESPUESTAS_PROPORCION_LARGO = float(os.getenv('RESPUESTAS_PROPORCION_LARGO', 0.8))
+    
+    # Escritura diferida (conversaciones y contadores en lote)
+    ESCRITURA_DIFERIDA_ACTIVO = os.getenv('ESCRITURA_DIFERIDA_ACTIVO', 'True').lower() == 'true'
+    ESCRITURA_DIFERIDA_LOTE = int(os.getenv('ESCRITURA_DIFERIDA_LOTE', 100))
+    ESCRITURA_DIFERIDA_INTERVALO = float(os.getenv('ESCRITURA_DIFERIDA_INTERVALO', 2.0))  # segundos
+    ESCRITURA_DIFERIDA_MAX = int(os.getenv('ESCRITURA_DIFERIDA_MAX', 10000))
+    ESCRITURA_DIFERIDA_SQLITE = os.getenv(
+        'ESCRITURA_DIFERIDA_SQLITE',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'backend', 'data', 'escritura_pendiente.db')
+    )
+    
+    # Sesiones: 'memoria' (un proceso) o 'sqlite' (varios workers en el mismo equipo)
+    SESIONES_BACKEND = os.getenv('SESIONES_BACKEND', 'memoria')
+    SESIONES_SQLITE = os.getenv(
+        'SESIONES_SQLITE',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'backend', 'data', 'sesiones.db')
+    )
+    SESIONES_TTL = int(os.getenv('SESIONES_TTL', 1800))  # segundos sin actividad
+    SESIONES_MAX = int(os.getenv('SESIONES_MAX', 500))  # al superarlo sale la menos usada
+    
+    # Métricas de latencia (/api/metrics)
+    METRICAS_ACTIVO = os.getenv('METRICAS_ACTIVO', 'True').lower() == 'true'
+    METRICAS_LOG_SESION = os.getenv('METRICAS_LOG_SESION', 'False').lower() == 'true'  # resumen por petición (LOG_NIVEL=INFO)
+    
+    # Logging: WARNING salvo que se pida otro (DEBUG escribe conversaciones del paciente)
+    # Desarrollo: LOG_NIVEL=DEBUG
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'WARNING')
+    LOG_FORMATO = os.getenv('LOG_FORMATO', 'texto')  # texto | json
+    LOG_ARCHIVO = os.getenv('LOG_ARCHIVO', '')  # vacío = solo consola
+    LOG_COLA_MAX = int(os.getenv('LOG_COLA_MAX', 10000))
+    
     # Operación
     MODO_OPERACION = os.getenv('MODO_OPERACION', 'feria')
     EVENTO_NOMBRE = os.getenv('EVENTO_NOMBRE', 'Feria Salud')
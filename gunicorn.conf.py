@@ -0,0 +1,47 @@
+"""
+Configuración de gunicorn para Kairos (Linux)
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Con más de un worker las sesiones deben estar en SESIONES_BACKEND=sqlite
+(si no, no arranca)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config.settings import Config
+
+bind = f"{Config.API_HOST}:{Config.API_PORT}"
+workers = Config.API_WORKERS
+
+# Cada worker tiene su propio almacén en memoria: los turnos que caen en
+# otro worker responderían "Sesión no encontrada"
+if workers > 1 and Config.SESIONES_BACKEND != 'sqlite':
+    raise RuntimeError(
+        f"API_WORKERS={workers} requiere SESIONES_BACKEND=sqlite "
+        f"(actual: {Config.SESIONES_BACKEND}); usa API_WORKERS=1 o el backend sqlite"
+    )
+threads = Config.API_HILOS
+worker_class = 'gthread'
+
+# Un diagnóstico completo puede tardar cerca de DIAGNOSTICO_DEADLINE
+timeout = Config.API_TIMEOUT
+graceful_timeout = Config.API_APAGADO_TIMEOUT
+keepalive = 5
+
+# Sin preload: cada worker crea su propio pool MySQL, hilos de escritura y logging
+# (no sobreviven a fork). wsgi.py calienta catálogo y servicios al importarse.
+preload_app = False
+
+accesslog = None
+errorlog = '-'
+loglevel = 'warning'
+
+
+def worker_exit(server, worker):
+    """SIGTERM: gunicorn ya esperó las peticiones en curso; vaciar tareas y escrituras"""
+    from wsgi import apagar
+    apagar()
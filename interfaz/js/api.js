@@ -86,6 +86,75 @@ class KairosAPI {
         return await this.request(KairosConfig.API.MENSAJE, 'POST', data);
     }
 
+    /**
+     * Enviar mensaje con respuesta en streaming (SSE sobre POST)
+     * @param {string} mensaje
+     * @param {Object} handlers - { onFragmento(texto), onDiagnosticando() }
+     * @returns {Promise<Object>} Resultado final (mismo formato que enviarMensaje)
+     */
+    async enviarMensajeStream(mensaje, handlers = {}) {
+        const url = `${this.baseURL}${KairosConfig.API.MENSAJE_STREAM}`;
+
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sesion_id: this.sesionId, mensaje })
+        });
+
+        if (!response.ok || !response.body) {
+            // Sesión no encontrada u otro error: el backend responde JSON normal
+            return await response.json();
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder('utf-8');
+        let buffer = '';
+        let resultado = null;
+
+        const procesarEvento = (bloque) => {
+            let tipo = 'message';
+            let datos = '';
+
+            for (const linea of bloque.split('\n')) {
+                if (linea.startsWith('event:')) tipo = linea.slice(6).trim();
+                else if (linea.startsWith('data:')) datos += linea.slice(5).trim();
+            }
+
+            if (!datos) return;
+            const payload = JSON.parse(datos);
+
+            if (tipo === 'fragmento' && handlers.onFragmento) {
+                handlers.onFragmento(payload.texto);
+            } else if (tipo === 'diagnosticando' && handlers.onDiagnosticando) {
+                handlers.onDiagnosticando();
+            } else if (tipo === 'fin' || tipo === 'error') {
+                resultado = payload;
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Los eventos SSE se separan por línea en blanco
+            let corte;
+            while ((corte = buffer.indexOf('\n\n')) !== -1) {
+                procesarEvento(buffer.slice(0, corte));
+                buffer = buffer.slice(corte + 2);
+            }
+        }
+
+        if (buffer.trim()) procesarEvento(buffer);
+
+        if (KairosConfig.DEBUG) {
+            console.log(`✅ Respuesta (stream):`, resultado);
+        }
+
+        return resultado || { success: false, error: 'Stream interrumpido' };
+    }
+
     /**
      * ⭐ NUEVO: Generar diagnóstico
      */
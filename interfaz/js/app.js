@@ -201,28 +201,21 @@ class KairosApp {
     document.getElementById("escribiendo").style.display = "flex";
 
     try {
-      const result = await api.enviarMensaje(mensaje);
+      // En streaming la respuesta se muestra y se habla mientras llega
+      const streaming = KairosConfig.STREAMING;
+      const result = streaming
+        ? await this.recibirRespuestaStream(mensaje)
+        : await api.enviarMensaje(mensaje);
 
       document.getElementById("escribiendo").style.display = "none";
 
       if (result.success) {
         const res = result.resultado;
 
-        // Agregar respuesta
-        this.agregarMensajeKairos(res.respuesta);
-
-        // Voz limpia
-        if (voz && voz.vozActiva) {
-          let textoLimpio = String(res.respuesta)
-            .replace(/\{[^}]*"timestamp"[^}]*\}/gi, "")
-            .replace(/\{[^}]*"role"[^}]*\}/gi, "")
-            .replace(/timestamp.*$/gim, "")
-            .replace(/\{[^}]*\}/g, "")
-            .trim();
-
-          if (textoLimpio) {
-            voz.hablar(textoLimpio);
-          }
+        if (!streaming) {
+          // Agregar respuesta
+          this.agregarMensajeKairos(res.respuesta);
+          this.hablarRespuesta(res.respuesta);
         }
 
         // ⭐ NUEVO: Si viene con diagnóstico completo, mostrarlo
@@ -248,6 +241,66 @@ class KairosApp {
     }
   }
 
+  /**
+   * Recibir respuesta en streaming: burbuja y voz se actualizan por fragmentos
+   */
+  async recibirRespuestaStream(mensaje) {
+    let bubble = null;
+    let texto = "";
+    const container = document.getElementById("chat-mensajes");
+
+    const result = await api.enviarMensajeStream(mensaje, {
+      onFragmento: (fragmento) => {
+        if (!bubble) {
+          document.getElementById("escribiendo").style.display = "none";
+          bubble = this.agregarMensajeKairos("");
+        }
+
+        texto += fragmento;
+        bubble.textContent = texto;
+        container.scrollTop = container.scrollHeight;
+
+        if (voz && voz.vozActiva) {
+          voz.hablarFragmento(fragmento);
+        }
+      },
+      onDiagnosticando: () => {
+        // Mientras se arma el diagnóstico, volver a mostrar "escribiendo"
+        document.getElementById("escribiendo").style.display = "flex";
+      },
+    });
+
+    if (voz && voz.vozActiva) {
+      voz.finalizarHabla();
+    }
+
+    // Sin fragmentos (error temprano): mostrar la respuesta completa
+    if (!bubble && result.success && result.resultado) {
+      this.agregarMensajeKairos(result.resultado.respuesta);
+      this.hablarRespuesta(result.resultado.respuesta);
+    }
+
+    return result;
+  }
+
+  /**
+   * Voz limpia de una respuesta completa
+   */
+  hablarRespuesta(respuesta) {
+    if (!voz || !voz.vozActiva) return;
+
+    let textoLimpio = String(respuesta)
+      .replace(/\{[^}]*"timestamp"[^}]*\}/gi, "")
+      .replace(/\{[^}]*"role"[^}]*\}/gi, "")
+      .replace(/timestamp.*$/gim, "")
+      .replace(/\{[^}]*\}/g, "")
+      .trim();
+
+    if (textoLimpio) {
+      voz.hablar(textoLimpio);
+    }
+  }
+
   /**
    * ⭐ CORREGIDO: Generar diagnóstico y MOSTRAR RECETA (no cerrar)
    */
@@ -451,6 +504,8 @@ class KairosApp {
 
     container.appendChild(div);
     container.scrollTop = container.scrollHeight;
+
+    return div.querySelector(".mensaje-bubble");
   }
 
   /**
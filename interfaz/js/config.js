@@ -14,6 +14,7 @@ const KairosConfig = {
         NUEVA_SESION: '/api/sesion/nueva',
         CAPTURAR_DATOS: '/api/sesion/capturar-datos',
         MENSAJE: '/api/sesion/mensaje',
+        MENSAJE_STREAM: '/api/sesion/mensaje/stream',
         FINALIZAR: '/api/sesion/finalizar',
         ESTADO: '/api/sesion/estado',
         ESTADISTICAS: '/api/estadisticas',
@@ -21,6 +22,9 @@ const KairosConfig = {
         HEALTH: '/api/health'
     },
     
+    // Respuestas en streaming (texto y voz empiezan antes de que termine GPT)
+    STREAMING: true,
+    
     // Configuración de voz
     VOZ: {
         ACTIVA: true,
@@ -10,6 +10,7 @@ class KairosVoice {
         this.escuchando = false;
         this.vozActiva = KairosConfig.VOZ.ACTIVA;
         this.vozSeleccionada = null;
+        this.bufferHabla = null;
         
         this.inicializarReconocimiento();
         this.inicializarVozLatina();
@@ -252,10 +253,70 @@ class KairosVoice {
         }, 100);
     }
 
+    /**
+     * Hablar texto que llega por partes (streaming)
+     * Acumula fragmentos y pronuncia cada oración apenas se completa
+     */
+    hablarFragmento(fragmento) {
+        if (!this.vozActiva) return;
+
+        if (!this.bufferHabla) {
+            // Primera parte de una respuesta nueva: cortar lo que se estaba diciendo
+            this.sintesis.cancel();
+            this.bufferHabla = '';
+        }
+
+        this.bufferHabla += fragmento;
+
+        // Oración completa: termina en . ! ? seguido de espacio
+        const regex = /^([\s\S]*?[.!?])\s+/;
+        let match;
+        while ((match = this.bufferHabla.match(regex))) {
+            this.encolarOracion(match[1]);
+            this.bufferHabla = this.bufferHabla.slice(match[0].length);
+        }
+    }
+
+    /**
+     * Pronunciar lo que quede pendiente del streaming
+     */
+    finalizarHabla() {
+        if (this.bufferHabla && this.bufferHabla.trim()) {
+            this.encolarOracion(this.bufferHabla);
+        }
+        this.bufferHabla = null;
+    }
+
+    /**
+     * Encolar una oración (speechSynthesis las reproduce en orden)
+     */
+    encolarOracion(texto) {
+        const textoLimpio = this.limpiarTexto(texto);
+        if (!textoLimpio) return;
+
+        const utterance = new SpeechSynthesisUtterance(textoLimpio);
+
+        if (this.vozSeleccionada) {
+            utterance.voice = this.vozSeleccionada;
+        }
+
+        utterance.lang = 'es-MX';
+        utterance.rate = 0.95;
+        utterance.pitch = 1.0;
+        utterance.volume = 1.0;
+
+        utterance.onerror = (event) => {
+            console.error('❌ Error síntesis:', event.error);
+        };
+
+        this.sintesis.speak(utterance);
+    }
+
     /**
      * Cancelar habla
      */
     cancelarHabla() {
+        this.bufferHabla = null;
         this.sintesis.cancel();
     }
 
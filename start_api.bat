@@ -4,7 +4,8 @@ echo 🚀 Iniciando Kairos API...
 REM Activar entorno virtual
 call venv\Scripts\activate
 
-REM Iniciar API
-python backend/api/app.py
+REM Iniciar API (produccion: waitress con API_HILOS hilos)
+REM Desarrollo con recarga: python backend/api/app.py
+python wsgi.py
 
 pause
\ No newline at end of file
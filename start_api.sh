@@ -5,5 +5,6 @@ echo "🚀 Iniciando Kairos API..."
 # Activar entorno virtual
 source venv/bin/activate
 
-# Iniciar API
-python backend/api/app.py
\ No newline at end of file
+# Iniciar API (producción: workers x hilos de config/settings.py)
+# Desarrollo con recarga: python backend/api/app.py
+exec gunicorn -c gunicorn.conf.py wsgi:app
\ No newline at end of file
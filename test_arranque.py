@@ -0,0 +1,62 @@
+"""
+TEST DE ARRANQUE DE LA API
+Falla si importar backend.api.app en frío supera ARRANQUE_PRESUPUESTO_MS
+o si carga dependencias pesadas (pandas, sklearn, ...) que el chat no usa
+"""
+
+import sys
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from config.settings import Config
+from backend.core.perfil_arranque import perfilar, dentro_de_presupuesto, imprimir_perfil
+
+_perfil = None
+
+
+def _perfil_api():
+    global _perfil
+    if _perfil is None:
+        _perfil = perfilar('backend.api.app')
+    return _perfil
+
+
+def test_api_sin_dependencias_pesadas():
+    """El camino del chat no debe importar pandas / sklearn / numpy / búsqueda web"""
+    perfil = _perfil_api()
+    assert not perfil['pesados'], f"Cargadas al arrancar: {perfil['pesados']}"
+
+
+def test_arranque_dentro_de_presupuesto():
+    """Arranque en frío de la API dentro del presupuesto"""
+    perfil = _perfil_api()
+    assert dentro_de_presupuesto(perfil), (
+        f"Arranque {perfil['segundos'] * 1000:.0f} ms > {Config.ARRANQUE_PRESUPUESTO_MS:.0f} ms"
+    )
+
+
+def test_modulos_con_carga_diferida():
+    """Importar clasificador, aprendizaje e índice no debe cargar sklearn / pandas"""
+    for modulo in ('backend.core.classifier', 'backend.core.learner', 'backend.core.indice_respuestas'):
+        perfil = perfilar(modulo)
+        pesados = [m for m in perfil['pesados'] if m in ('pandas', 'sklearn', 'scipy', 'numpy')]
+        assert not pesados, f"{modulo} carga {pesados} al importarse"
+
+
+if __name__ == "__main__":
+    perfil = _perfil_api()
+    imprimir_perfil(perfil)
+
+    fallidos = 0
+    for test in (test_api_sin_dependencias_pesadas, test_arranque_dentro_de_presupuesto,
+                 test_modulos_con_carga_diferida):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            fallidos += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    sys.exit(1 if fallidos else 0)
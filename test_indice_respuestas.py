@@ -0,0 +1,58 @@
+"""
+TEST DEL ÍNDICE DE RESPUESTAS APRENDIDAS
+Un mensaje más largo o más grave que un patrón aprendido no debe recibir
+la respuesta enlatada del patrón leve
+"""
+
+import sys
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from backend.core.indice_respuestas import IndiceRespuestas
+
+PATRONES = ('tengo tos', 'tengo fiebre', 'me duele cabeza')
+
+
+def _indice() -> IndiceRespuestas:
+    indice = IndiceRespuestas(umbral=0.75, proporcion_largo=0.8)
+    indice._reconstruir([{
+        'id': i, 'patron': patron, 'intencion': 'sintoma', 'respuesta': f"respuesta {patron}",
+        'veces_usado': 0, 'calificacion': 0.0
+    } for i, patron in enumerate(PATRONES)])
+    return indice
+
+
+def test_mensaje_grave_no_usa_patron_leve():
+    """'tengo tos con sangre' no debe responder como 'tengo tos'"""
+    indice = _indice()
+    for mensaje in ('tengo tos con sangre', 'hace 3 semanas que tengo tos y bajo de peso',
+                    'tengo fiebre convulsiones'):
+        assert indice.buscar(mensaje, 'sintoma') == [], mensaje
+
+
+def test_negacion_no_coincide():
+    """'no me duele cabeza' no debe responder como 'me duele cabeza'"""
+    assert _indice().buscar('no me duele cabeza', 'sintoma') == []
+
+
+def test_variacion_pequena_coincide():
+    """Exacto y variaciones mínimas siguen encontrando su respuesta"""
+    indice = _indice()
+    assert indice.mejor('tengo tos', 'sintoma')['patron'] == 'tengo tos'
+    assert indice.mejor('me duele la cabeza', 'sintoma')['patron'] == 'me duele cabeza'
+
+
+if __name__ == "__main__":
+    fallidos = 0
+    for test in (test_mensaje_grave_no_usa_patron_leve, test_negacion_no_coincide,
+                 test_variacion_pequena_coincide):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            fallidos += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    sys.exit(1 if fallidos else 0)
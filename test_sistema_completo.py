@@ -98,7 +98,7 @@ class ValidadorSistema:
         
         try:
             db = DatabaseManager()
-            if db.conexion and db.conexion.is_connected():
+            if db.esta_conectado():
                 self.registrar_test("MySQL", True, "Conectado correctamente")
                 
                 # Test query
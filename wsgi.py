@@ -0,0 +1,104 @@
+"""
+Punto de entrada de producción (WSGI)
+✅ Calienta catálogo, servicios de diagnóstico y caché antes de aceptar tráfico
+✅ Apagado ordenado: termina diagnósticos en curso, vacía escrituras y cierra el pool
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app      (Linux: workers x hilos)
+    python wsgi.py                             (Windows / un proceso: waitress con hilos)
+"""
+
+import sys
+import os
+import signal
+import _thread
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from config.settings import Config
+from backend.api.app import app, dejar_de_aceptar
+from backend.core.session_manager import SessionManager
+from backend.core.cache_diagnosticos import obtener_cache_diagnosticos
+from backend.core.ejecutor import obtener_ejecutor
+from backend.database.escritura_diferida import obtener_escritura_diferida
+from backend.core.consumo_ia import obtener_consumo_ia
+from backend.core.gobernador_ia import obtener_gobernador_ia
+from backend.database.pool_conexiones import cerrar_pool
+from backend.core.logger import obtener_logger
+
+logger = obtener_logger(__name__)
+
+_apagado_lock = threading.Lock()
+_apagado = False
+
+
+def calentar():
+    """Cargar lo costoso antes del primer paciente (catálogo ya se carga al importar app)"""
+    SessionManager._iniciar_servicios()
+    obtener_cache_diagnosticos().cargar()
+    obtener_escritura_diferida()
+    logger.info("🔥 Worker %s listo", os.getpid())
+
+
+def apagar():
+    """Esperar peticiones y tareas en curso, vaciar escrituras y cerrar conexiones (una vez)"""
+    global _apagado
+    with _apagado_lock:
+        if _apagado:
+            return
+        _apagado = True
+
+    if not dejar_de_aceptar():
+        logger.warning("⚠️ Apagado con peticiones aún en curso")
+
+    if not obtener_ejecutor().drenar(timeout=Config.API_APAGADO_TIMEOUT):
+        logger.warning("⚠️ Apagado con tareas de fondo pendientes")
+
+    obtener_gobernador_ia().detener()
+    obtener_consumo_ia().cerrar()
+    obtener_escritura_diferida().cerrar()
+    cerrar_pool()
+    logger.info("👋 Worker %s detenido", os.getpid())
+
+
+calentar()
+
+
+if __name__ == '__main__':
+    try:
+        from waitress import create_server
+    except ImportError:
+        print("❌ waitress no instalado: pip install waitress (o usa gunicorn -c gunicorn.conf.py wsgi:app)")
+        sys.exit(1)
+
+    servidor = create_server(app, host=Config.API_HOST, port=Config.API_PORT,
+                             threads=Config.API_HILOS, channel_timeout=Config.API_TIMEOUT)
+
+    drenado = threading.Event()
+    drenando = threading.Event()
+
+    def drenar():
+        dejar_de_aceptar()
+        drenado.set()
+        _thread.interrupt_main()  # vuelve a llamar al manejador de SIGINT
+
+    def al_recibir_senal(numero, _frame):
+        # El bucle de waitress sigue enviando las respuestas en curso mientras se espera;
+        # cuando terminan se detiene con KeyboardInterrupt (run() lo captura)
+        if drenado.is_set():
+            raise KeyboardInterrupt
+        if not drenando.is_set():
+            drenando.set()
+            logger.warning("⚠️ Señal %s: apagando sin cortar diagnósticos", numero)
+            threading.Thread(target=drenar, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, al_recibir_senal)
+    signal.signal(signal.SIGINT, al_recibir_senal)
+
+    print(f"🚀 Kairos API en http://{Config.API_HOST}:{Config.API_PORT} ({Config.API_HILOS} hilos)")
+
+    servidor.run()
+    apagar()
+    servidor.close()